@@ -0,0 +1,296 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Awaitable, Callable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from database.async_crud import get_data_generation
+from database.engine import get_async_read_session_factory
+
+from .compression import compress, negotiate_encoding
+from .config import (
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_BYTES,
+    COMPRESSION_MIN_SIZE,
+    RESPONSE_VALIDATION,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the json module
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class DataGeneration:
+    """
+    This process's view of the data generation, the counter in the
+    database that every committed data change increments (see
+    `bump_data_generation`). The process's own writes hand the generation
+    they committed to `advance_to`; `refresh` reads the database and
+    catches up with changes other processes wrote (a CLI sync, another
+    worker). Everything derived from an older generation is outdated.
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._listeners: list[Callable[[int, int, bool], None]] = []
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def advance_to(self, generation: Optional[int]) -> int:
+        """
+        Follow a generation committed by a write of this process (None if
+        the write changed nothing). A concurrent `refresh` may already have
+        read it, so the value never moves backwards. It only counts as the
+        process's own change when it directly follows the known value;
+        otherwise another process wrote in between.
+        """
+        if generation is not None and generation > self._value:
+            self._advance(generation, own=generation == self._value + 1)
+            logger.info(f"Data generation advanced to {generation}")
+        return self._value
+
+    async def refresh(self, session: AsyncSession) -> int:
+        """
+        Catch up with the generation stored in the database. This process
+        never sees more increments than the database holds, so a higher
+        stored value means another process changed the data.
+        """
+        stored = await get_data_generation(session)
+        if stored > self._value:
+            self._advance(stored, own=False)
+            logger.info(f"Data generation {stored} written by another process")
+        return self._value
+
+    def _advance(self, value: int, own: bool):
+        previous, self._value = self._value, value
+        for listener in self._listeners:
+            listener(previous, value, own)
+
+    def subscribe(self, listener: Callable[[int, int, bool], None]):
+        """
+        Register a callback run with the previous generation, the new one
+        and whether the change was this process's own write.
+        """
+        self._listeners.append(listener)
+
+
+class CachedResponse:
+    """
+    A serialized response body plus its compressed variants, each
+    computed at most once per data generation.
+    """
+    __slots__ = ("body", "etag", "media_type", "variants")
+
+    def __init__(self, body: bytes, etag: str, media_type: str):
+        self.body = body
+        self.etag = etag
+        self.media_type = media_type
+        self.variants: dict[str, bytes] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(v) for v in self.variants.values())
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        """
+        Strong ETags must differ per representation, so encoded variants
+        get a suffix.
+        """
+        if encoding is None:
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of serialized GET responses, keyed by data
+    generation, path and query string. Bounded by entry count and total
+    body size.
+    """
+
+    def __init__(self, generation: DataGeneration, max_entries: int, max_bytes: int):
+        self.generation = generation
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        generation.subscribe(lambda *_: self.clear())
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def key_for(self, request: Request, extra: tuple = ()) -> tuple:
+        query = "&".join(sorted(request.url.query.split("&"))
+                         ) if request.url.query else ""
+        return (self.generation.value, request.url.path, query, *extra)
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: tuple, entry: CachedResponse):
+        entry_size = entry.size
+        if entry_size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= old.size
+        self._entries[key] = entry
+        self._size += entry_size
+        self._evict()
+
+    def add_variant(self, key: tuple, entry: CachedResponse, encoding: str, data: bytes):
+        entry.variants[encoding] = data
+        if self._entries.get(key) is entry:
+            self._size += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Strong ETag derived from the exact response bytes.
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], entry: CachedResponse) -> bool:
+    """
+    True if the client holds any representation of the cached entry.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/")
+                  for tag in if_none_match.split(",")}
+    known = {entry.etag} | {entry.variant_etag(e) for e in ("br", "gzip")}
+    return not candidates.isdisjoint(known)
+
+
+def _orjson_default(value):
+    # Postgres aggregates can come back as Decimal
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def serialize_json(content) -> bytes:
+    """
+    Compact UTF-8 JSON for the plain dicts, lists and scalars the read
+    queries build from row tuples (enums, datetimes and numpy scalars
+    included). Uses orjson when installed, which skips the generic
+    `jsonable_encoder` walk.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+_response_adapters: dict = {}
+
+
+def validate_response(request: Request, content):
+    """
+    Check `content` against the matched route's response model. Responses
+    are not validated in production; RESPONSE_VALIDATION turns this on to
+    catch producers drifting from their declared schema.
+
+    Raises:
+        pydantic.ValidationError: If the content does not match.
+    """
+    route = request.scope.get("route")
+    model = getattr(route, "response_model", None)
+    if model is None:
+        return
+    adapter = _response_adapters.get(model)
+    if adapter is None:
+        adapter = _response_adapters[model] = TypeAdapter(model)
+    adapter.validate_python(content)
+
+
+data_generation = DataGeneration()
+response_cache = ResponseCache(
+    data_generation, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES)
+
+
+async def cached_json_response(request: Request, producer: Callable[[], Awaitable],
+                               extra_key: tuple = ()) -> Response:
+    """
+    Serve a JSON GET response from the response cache, computing it with
+    `producer` on a miss. Answers `304 Not Modified` when the client's
+    If-None-Match matches the ETag. The body is sent in the negotiated
+    encoding, compressed once per entry and reused afterwards.
+
+    `extra_key` holds whatever else besides the data generation and the
+    URL the body depends on (e.g. the current date).
+    """
+    # From the replica the body is read from, so the generation never
+    # runs ahead of the data cached under it
+    async with get_async_read_session_factory()() as db:
+        await data_generation.refresh(db)
+    key = response_cache.key_for(request, extra_key)
+    entry = response_cache.get(key)
+    if entry is None:
+        content = await producer()
+        if RESPONSE_VALIDATION:
+            validate_response(request, content)
+        body = serialize_json(content)
+        entry = CachedResponse(body, make_etag(body), "application/json")
+        response_cache.put(key, entry)
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if len(entry.body) < COMPRESSION_MIN_SIZE:
+        encoding = None
+
+    headers = {
+        "ETag": entry.variant_etag(encoding),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), entry):
+        return Response(status_code=304, headers=headers)
+
+    if encoding is None:
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+    body = entry.variants.get(encoding)
+    if body is None:
+        body = await run_in_threadpool(compress, entry.body, encoding, True)
+        response_cache.add_variant(key, entry, encoding, body)
+    headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=entry.media_type, headers=headers)
@@ -0,0 +1,111 @@
+"""
+Command-line entry point for scraping and syncing outside the web server.
+
+    python -m backend.app.cli scrape [--labs MAD PR] [--concurrency 4]
+    python -m backend.app.cli sync [--labs MAD PR] [--concurrency 4] [--dry-run]
+    python -m backend.app.cli replay scrape_results/scrape_results_20241228_131101.json [--labs MAD] [--dry-run]
+
+`scrape` only scrapes and saves the results file. `sync` scrapes and
+syncs the database. `replay` syncs from a saved results file without any
+network access, e.g. to rebuild or backfill a database from archived
+results. With `--labs`, only topics of those labs are closed or renamed.
+
+Syncs here bump the data generation stored in the database, so a
+running server drops its cached responses and rebuilds its in-process
+indexes on the next request.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from typing import Optional
+
+from database.engine import dispose_engines, get_async_session_factory, init_engines
+from database.models import async_init_db
+
+from .config import SCRAPE_CONCURRENCY
+from .logging_config import configure_logging
+from .routers.insert_thesis_topic import sync_scraped_topics
+from .routers.scrape import scrape_labs
+
+
+def load_scrape_results(path: str, lab_names: Optional[list[str]] = None) -> tuple[list, list]:
+    """
+    Labs and topics from a saved results file (the `scrape_results_*.json`
+    files, or a saved `/api/scrape` response), optionally only those of
+    `lab_names`.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        scrape_result = json.load(f)
+    labs = scrape_result.get("labs", scrape_result.get("all_labs", []))
+    topics = scrape_result.get("thesis_topics", scrape_result.get("all_thesis_topics", []))
+    if lab_names is not None:
+        labs = [lab for lab in labs if lab["lab_name"] in lab_names]
+        topics = [topic for topic in topics if topic["lab_name"] in lab_names]
+    return labs, topics
+
+
+async def run_sync(labs: list, topics: list, lab_names: Optional[list[str]], dry_run: bool) -> dict:
+    init_engines()
+    try:
+        await async_init_db()
+        async with get_async_session_factory()() as db:
+            return await sync_scraped_topics(
+                db, labs, topics,
+                lab_scope=set(lab_names) if lab_names is not None else None,
+                dry_run=dry_run, update_indexes=False)
+    finally:
+        await dispose_engines()
+
+
+async def run_command(args) -> dict:
+    if args.command == "replay":
+        labs, topics = load_scrape_results(args.file, args.labs)
+        return await run_sync(labs, topics, args.labs, args.dry_run)
+
+    scrape_result = await scrape_labs(args.labs, args.concurrency)
+    if args.command == "scrape":
+        return {"summary": scrape_result["summary"],
+                "labs": len(scrape_result["all_labs"]),
+                "thesis_topics": len(scrape_result["all_thesis_topics"])}
+    return await run_sync(scrape_result["all_labs"], scrape_result["all_thesis_topics"],
+                          args.labs, args.dry_run)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.app.cli",
+        description="Scrape labs and sync thesis topics outside the web server.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scrape = commands.add_parser("scrape", help="Scrape labs and save the results file.")
+    sync = commands.add_parser("sync", help="Scrape labs and sync the database.")
+    replay = commands.add_parser("replay", help="Sync the database from a saved results file.")
+    replay.add_argument("file", help="Path of a scrape_results_*.json file.")
+
+    for command in (scrape, sync, replay):
+        command.add_argument("--labs", nargs="+", metavar="LAB",
+                             help="Only these labs (names as in config.json).")
+    for command in (scrape, sync):
+        command.add_argument("--concurrency", type=int, default=SCRAPE_CONCURRENCY,
+                             help="Labs scraped at the same time.")
+    for command in (sync, replay):
+        command.add_argument("--dry-run", action="store_true",
+                             help="Report the changes without writing them.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_logging()
+    try:
+        result = asyncio.run(run_command(args))
+    except Exception as e:
+        print(f"{args.command} failed: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import gzip
+import logging
+import zlib
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from .config import COMPRESSION_MIN_SIZE, COMPRESSION_THREAD_SIZE
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Levels for responses compressed on every request, and for cached
+# payloads that are compressed once per data generation
+DYNAMIC_GZIP_LEVEL = 6
+DYNAMIC_BROTLI_QUALITY = 4
+CACHED_GZIP_LEVEL = 9
+CACHED_BROTLI_QUALITY = 9
+
+# Formats that are already compressed (or not worth it)
+SKIPPED_MEDIA_TYPES = (
+    "application/vnd.apache.parquet",
+    "application/vnd.apache.arrow.stream",
+    "text/event-stream",
+    "image/",
+)
+
+
+def supported_encodings() -> list[str]:
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the preferred encoding the client accepts: brotli (when
+    installed), then gzip. Honours q-values, including q=0 exclusions.
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    candidates = [
+        (accepted.get(encoding, accepted.get("*", 0.0)), -rank, encoding)
+        for rank, encoding in enumerate(supported_encodings())
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def compress(data: bytes, encoding: str, cached: bool = False) -> bytes:
+    """
+    Compress a whole body; `cached` selects the slower, denser levels used
+    for payloads that are compressed once and served many times.
+    """
+    if encoding == "br":
+        quality = CACHED_BROTLI_QUALITY if cached else DYNAMIC_BROTLI_QUALITY
+        return brotli.compress(data, quality=quality)
+    level = CACHED_GZIP_LEVEL if cached else DYNAMIC_GZIP_LEVEL
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+class _StreamCompressor:
+    """
+    Incremental compressor that flushes after every chunk, so streamed
+    responses stay incremental for the client.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(
+                quality=DYNAMIC_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(
+                DYNAMIC_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with the negotiated encoding
+    (brotli or gzip), including streamed ones. Responses that already carry
+    a Content-Encoding, such as precompressed cached payloads, pass through.
+    Bodies and streamed chunks of at least `thread_size` bytes are
+    compressed in a worker thread, so large exports do not stall other
+    requests.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 thread_size: int = COMPRESSION_THREAD_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(
+            send, encoding, self.minimum_size, self.thread_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+
+    def __init__(self, send, encoding: str, minimum_size: int, thread_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+        self._start_message = None
+        self._passthrough = False
+        self._compressor: Optional[_StreamCompressor] = None
+
+    async def send(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "")
+            self._passthrough = (
+                "content-encoding" in headers
+                or message["status"] < 200 or message["status"] in (204, 304)
+                or any(media_type.startswith(skipped) for skipped in SKIPPED_MEDIA_TYPES)
+            )
+            if self._passthrough:
+                await self._send(message)
+            else:
+                self._start_message = message
+            return
+
+        if message_type != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._start_message is not None:
+            start, self._start_message = self._start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                # Whole body in one message
+                if len(body) < self.minimum_size:
+                    self._passthrough = True
+                    await self._send(start)
+                    await self._send(message)
+                    return
+                if len(body) >= self.thread_size:
+                    compressed = await run_in_threadpool(compress, body, self.encoding)
+                else:
+                    compressed = compress(body, self.encoding)
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streamed body
+            self._compressor = _StreamCompressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self._send(start)
+
+        if len(body) >= self.thread_size:
+            data = await run_in_threadpool(self._compressor.chunk, body)
+        else:
+            data = self._compressor.chunk(body) if body else b""
+        if not more_body:
+            data += self._compressor.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
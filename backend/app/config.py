@@ -11,3 +11,68 @@ CONFIG_PATH = BASE_DIR / "config.json"
 
 with open(CONFIG_PATH, "r", encoding="utf-8") as f:
     LAB_LINKS = json.load(f)
+
+
+# In-process response cache for the read endpoints
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Check read responses against their declared response models before
+# caching them (for development; off by default)
+RESPONSE_VALIDATION = os.getenv("RESPONSE_VALIDATION", "").strip().lower() in ("1", "true", "yes", "on")
+
+# Responses smaller than this are sent uncompressed; uncached ones of at
+# least COMPRESSION_THREAD_SIZE bytes are compressed in a worker thread
+# instead of on the event loop
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+COMPRESSION_THREAD_SIZE = int(os.getenv("COMPRESSION_THREAD_SIZE", str(64 * 1024)))
+
+# Server-sent topic events: events kept for resuming, per-subscriber
+# buffer (in published batches, one per sync) before a slow client is
+# dropped, and keep-alive interval
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+EVENT_SUBSCRIBER_BUFFER = int(os.getenv("EVENT_SUBSCRIBER_BUFFER", "256"))
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+
+# Sync: minimum shingle similarity for an unmatched scraped title to be
+# treated as a rename of an existing topic in the same lab
+RENAME_SIMILARITY_THRESHOLD = float(
+    os.getenv("RENAME_SIMILARITY_THRESHOLD", "0.7"))
+# Minimum similarity for a pair that shares a unique URL, so unrelated
+# titles reusing a freed-up URL are not taken for renames
+RENAME_URL_MIN_SIMILARITY = float(
+    os.getenv("RENAME_URL_MIN_SIMILARITY", "0.3"))
+
+# Logging: level of the root logger, and "text" or "json" (one object
+# per line) output
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
+# Requests running more database statements than this are logged as
+# likely N+1 query patterns
+REQUEST_QUERY_WARNING = int(os.getenv("REQUEST_QUERY_WARNING", "50"))
+
+# Opt-in profiling: requests carrying PROFILE_TOKEN (X-Profile header or
+# profile query parameter) are profiled, as is every sync with
+# PROFILE_SYNC set. Profiles are written to PROFILE_DIR; "sample" writes
+# collapsed stacks for flame graphs, "cprofile" a pstats file. The same
+# token guards /api/metrics, which is disabled without it.
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN") or None
+PROFILE_SYNC = os.getenv("PROFILE_SYNC", "").strip().lower() in ("1", "true", "yes", "on")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MODE = os.getenv("PROFILE_MODE", "sample").lower()
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+# Outbound fetches (link checks and crawls): labs scraped at the same
+# time, and per host at most SCRAPE_HOST_CONCURRENCY requests in flight,
+# started at least SCRAPE_HOST_DELAY seconds apart. A longer robots.txt
+# Crawl-delay is honoured up to SCRAPE_MAX_CRAWL_DELAY seconds; robots.txt
+# files are cached for ROBOTS_TXT_TTL seconds.
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+SCRAPE_HOST_CONCURRENCY = int(os.getenv("SCRAPE_HOST_CONCURRENCY", "1"))
+SCRAPE_HOST_DELAY = float(os.getenv("SCRAPE_HOST_DELAY", "1.0"))
+SCRAPE_MAX_CRAWL_DELAY = float(os.getenv("SCRAPE_MAX_CRAWL_DELAY", "30"))
+ROBOTS_TXT_ENABLED = os.getenv("ROBOTS_TXT_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+ROBOTS_TXT_TTL = float(os.getenv("ROBOTS_TXT_TTL", "3600"))
+ROBOTS_USER_AGENT = os.getenv("ROBOTS_USER_AGENT", "*")
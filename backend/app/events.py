@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Optional
+
+from .config import EVENT_HISTORY_SIZE, EVENT_SUBSCRIBER_BUFFER
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    One subscriber's bounded event buffer. Queue items are batches (lists
+    of events, one per publish). A subscriber that falls more than
+    `buffer_size` batches behind is marked overflowed and dropped; it
+    resumes by reconnecting with its last event ID.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def offer(self, events: list[dict]) -> bool:
+        try:
+            self.queue.put_nowait(events)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            # Wake the consumer so it notices the overflow
+            self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+
+class BroadcastHub:
+    """
+    In-process fan-out of topic change events to subscribers, with a
+    bounded history for resuming from a last event ID. Event IDs are the
+    topics' change feed sequence numbers.
+    """
+
+    def __init__(self, history_size: int, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._subscribers: set[Subscription] = set()
+        self._history: deque = deque(maxlen=history_size)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, events: list[dict]):
+        """
+        Broadcast events as one batch. Publishing runs without yielding to
+        the subscribers, so a sync's changes go out together: a batch takes
+        one buffer slot however many changes it holds.
+        """
+        if not events:
+            return
+        self._history.extend(events)
+        for subscription in list(self._subscribers):
+            if not subscription.offer(events):
+                logger.warning(
+                    "Dropping slow event subscriber after buffer overflow.")
+                self._subscribers.discard(subscription)
+
+    def replay_since(self, last_event_id: int, latest_seq: int) -> Optional[list[dict]]:
+        """
+        Events after `last_event_id` from the history, or None when the
+        history misses some of the changes up to `latest_seq`, the
+        database's highest change_seq. Sequence numbers are handed out
+        without gaps, so that covers history that does not reach back far
+        enough as well as changes another process (a CLI sync, another
+        worker) wrote and this one never published.
+        """
+        if last_event_id >= latest_seq:
+            # Current; anything newer is published to the subscription
+            return []
+        missed = sum(1 for event in self._history
+                     if last_event_id < event["id"] <= latest_seq)
+        if missed != latest_seq - last_event_id:
+            return None
+        return [event for event in self._history if event["id"] > last_event_id]
+
+
+topic_events = BroadcastHub(EVENT_HISTORY_SIZE, EVENT_SUBSCRIBER_BUFFER)
+
+
+def topic_event(change_type: str, topic, lab_name: str) -> dict:
+    return {
+        "id": topic.change_seq,
+        "event": change_type,
+        "data": {
+            "seq": topic.change_seq,
+            "topic_id": topic.topic_id,
+            "title": topic.mt_title,
+            "url": topic.mt_url,
+            "status": topic.status.value,
+            "lab_name": lab_name,
+        },
+    }
+
+
+def publish_topic_changes(changes: list[tuple]):
+    """
+    Sync hook: broadcast a sync's inserted, renamed, closed and reopened
+    topics, given as (change_type, topic, lab_name) tuples in event ID
+    order, as one batch.
+    """
+    topic_events.publish([topic_event(*change) for change in changes])
+
+
+def format_sse(event: dict) -> str:
+    data = json.dumps(event["data"], ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
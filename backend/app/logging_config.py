@@ -0,0 +1,126 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from .config import LOG_FORMAT, LOG_LEVEL
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord(
+    "", logging.INFO, "", 0, "", None, None)).keys()) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with the fields passed via `extra=` kept as
+    top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Only merges the message arguments on the calling thread; formatting
+    and all I/O happen on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging():
+    """
+    Configures logging to log messages to both the console and a rotating log file.
+
+    Records go through a queue to a background listener thread that does
+    the formatting and writing, so request handlers never wait on log I/O.
+    Set LOG_FORMAT=json for structured output and LOG_LEVEL to change the
+    level. Calling this again (e.g. from a second `create_app`) is a no-op.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_dir = os.getenv("LOG_DIR", "logs")
+
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+        print(f"Log directory created: {log_dir}")
+
+    log_file = os.path.join(
+        log_dir, f"MTA_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+
+    # Formatter for log messages
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+
+    # Rotating file handler
+    rotating_file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=5 * 1024 * 1024,
+        backupCount=5,
+    )
+    rotating_file_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(
+        log_queue, console_handler, rotating_file_handler, respect_handler_level=True)
+    _listener.start()
+
+    logger = logging.getLogger()
+    logger.setLevel(LOG_LEVEL)
+    _queue_handler = _QueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+    logger.info(f"Logging initialized. Logs are being written to {log_file}")
+
+
+def shutdown_logging():
+    """
+    Detach the queue handler, then stop the listener once it has written
+    what is still queued and close its handlers. Runs at exit; afterwards
+    `configure_logging` sets logging up anew.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = _queue_handler = None
+
+
+# Flush what is still queued when the process exits
+atexit.register(shutdown_logging)
@@ -1,59 +1,49 @@
-from datetime import datetime
-import logging
-import sys
-import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from logging.handlers import RotatingFileHandler
+
+from database.engine import init_engines, dispose_engines
+from database.models import async_init_db
 
 from .routers.scrape import router as scrape_router
 from .routers.insert_thesis_topic import router as insert_thesis_topic_router
 from .routers.insert_lab import router as insert_lab_router
 from .routers.insights import router as insights_router
 from .routers.thesis_topics_with_lab import router as thesis_topics_with_lab_router
-
-
-def configure_logging():
+from .routers.search import router as search_router
+from .routers.export import router as export_router
+from .routers.events import router as events_router
+from .routers.metrics import router as metrics_router
+from .compression import CompressionMiddleware
+from .logging_config import configure_logging
+from .metrics import InstrumentationMiddleware
+from .profiling import ProfilingMiddleware
+from .config import PROFILE_TOKEN
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     """
-    Configures logging to log messages to both the console and a rotating log file.
+    Create the database engines and the schema (tables, upgrades and
+    backfills) at startup, and dispose the engines on shutdown.
     """
-
-    log_dir = os.getenv("LOG_DIR", "logs")
-
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-        print(f"Log directory created: {log_dir}")
-
-    log_file = os.path.join(
-        log_dir, f"MTA_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-
-    logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-
-    # Formatter for log messages
-    log_format = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-    formatter = logging.Formatter(log_format)
-
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    # Rotating file handler
-    rotating_file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=5 * 1024 * 1024,
-        backupCount=5,
-    )
-    rotating_file_handler.setLevel(logging.INFO)
-    rotating_file_handler.setFormatter(formatter)
-    logger.addHandler(rotating_file_handler)
-    logger.info(f"Logging initialized. Logs are being written to {log_file}")
+    init_engines()
+    await async_init_db()
+    yield
+    await dispose_engines()
 
 
 def create_app():
     configure_logging()
 
-    app = FastAPI(title="Master Thesis Topics from Different Labs",)
+    app = FastAPI(title="Master Thesis Topics from Different Labs",
+                  lifespan=lifespan)
+
+    if PROFILE_TOKEN:
+        # Innermost, so profiles cover the handler and little else
+        app.add_middleware(ProfilingMiddleware)
+    app.add_middleware(CompressionMiddleware)
+    # Outermost, so it measures compression and the bytes actually sent
+    app.add_middleware(InstrumentationMiddleware)
 
     app.include_router(scrape_router, prefix="/api", tags=["scrape"])
     app.include_router(insert_thesis_topic_router,
@@ -62,6 +52,10 @@ def create_app():
     app.include_router(insights_router, prefix="/api", tags=["insights"])
     app.include_router(
         thesis_topics_with_lab_router, prefix="/api", tags=["thesis_topics_with_lab"])
+    app.include_router(search_router, prefix="/api", tags=["search"])
+    app.include_router(export_router, prefix="/api", tags=["export"])
+    app.include_router(events_router, prefix="/api", tags=["events"])
+    app.include_router(metrics_router, prefix="/api", tags=["metrics"])
 
     @app.get("/")
     def root():
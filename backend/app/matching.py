@@ -0,0 +1,195 @@
+import logging
+import re
+import zlib
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .config import RENAME_SIMILARITY_THRESHOLD, RENAME_URL_MIN_SIMILARITY
+from .search import fold
+
+logger = logging.getLogger(__name__)
+
+PUNCTUATION_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+# Character shingles compared between titles
+SHINGLE_SIZE = 4
+
+# MinHash signature of 64 hashes, split into 16 LSH bands of 4 rows: titles
+# with Jaccard similarity 0.7 share a band with probability ~0.99
+NUM_HASHES = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // BANDS
+
+# Hashes are 31-bit so (a * h + b) fits in uint64
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(1936)
+_A = _rng.integers(1, int(_PRIME), size=NUM_HASHES, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), size=NUM_HASHES, dtype=np.uint64)
+
+
+def normalize_title(title: str) -> str:
+    """
+    Fold case and diacritics and collapse punctuation and whitespace, so
+    "Prüfung  von X." and "Prufung von X" compare equal.
+    """
+    return " ".join(PUNCTUATION_PATTERN.sub(" ", fold(title)).split())
+
+
+def shingles(normalized: str) -> set[str]:
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + SHINGLE_SIZE]
+            for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def minhash(shingle_set: set[str]) -> np.ndarray:
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) & 0x7FFFFFFF for s in shingle_set),
+        dtype=np.uint64, count=len(shingle_set))
+    return ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class _Title:
+    __slots__ = ("item", "title", "url", "normalized", "_shingles")
+
+    def __init__(self, item, title: str, url: str):
+        self.item = item
+        self.title = title
+        self.url = url
+        self.normalized = normalize_title(title)
+        self._shingles = None
+
+    @property
+    def shingles(self) -> set[str]:
+        if self._shingles is None:
+            self._shingles = shingles(self.normalized)
+        return self._shingles
+
+
+def _unique_by_url(titles: list[_Title], url_counts: Counter) -> dict[str, _Title]:
+    """
+    Titles by URL, for the URLs used by exactly one topic in `url_counts`
+    (all of the lab's topics on that side, not only the unmatched ones).
+    """
+    return {title.url: title for title in titles if url_counts[title.url] == 1}
+
+
+def _similar_pairs(scraped: list[_Title], existing: list[_Title],
+                   threshold: float) -> list[tuple[float, int, int]]:
+    """
+    Candidate pairs from MinHash LSH buckets, verified with the exact
+    shingle Jaccard similarity, best first.
+    """
+    buckets = defaultdict(list)
+    for j, title in enumerate(existing):
+        signature = minhash(title.shingles)
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes())
+            buckets[key].append(j)
+
+    pairs = []
+    for i, title in enumerate(scraped):
+        signature = minhash(title.shingles)
+        candidates = set()
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes())
+            candidates.update(buckets.get(key, ()))
+        for j in candidates:
+            score = jaccard(title.shingles, existing[j].shingles)
+            if score >= threshold:
+                pairs.append((score, i, j))
+    pairs.sort(key=lambda pair: -pair[0])
+    return pairs
+
+
+def match_renames(scraped: list[tuple], existing: list[tuple],
+                  threshold: Optional[float] = None,
+                  scraped_urls: Optional[Iterable[str]] = None,
+                  existing_urls: Optional[Iterable[str]] = None) -> list[tuple]:
+    """
+    Pair scraped topics without an exact title match with existing topics
+    of the same lab that were not scraped, so the sync can update those
+    rows instead of closing them and inserting duplicates.
+
+    Stages, each on what the previous left unmatched:
+    1. Equal normalized titles (case, diacritics, punctuation, whitespace).
+    2. Equal URL, when the URL is unique among all of the lab's scraped
+       and all of its existing topics (labs that list every topic under
+       one page URL are not matched this way), and the titles are at
+       least RENAME_URL_MIN_SIMILARITY similar.
+    3. Shingle similarity of at least `threshold`, with MinHash LSH
+       limiting the comparisons to likely pairs.
+
+    Args:
+        scraped (list[tuple]): (item, title, url) of the unmatched scraped topics.
+        existing (list[tuple]): (item, title, url) of the unscraped existing topics.
+        threshold (float, optional): Minimum Jaccard similarity for stage 3.
+        scraped_urls (Iterable[str], optional): URLs of all of the lab's
+            scraped topics, matched or not. Defaults to those in `scraped`.
+        existing_urls (Iterable[str], optional): URLs of all of the lab's
+            existing topics. Defaults to those in `existing`.
+
+    Returns:
+        list[tuple]: (scraped item, existing item, stage) per match, with
+        stage one of "normalized", "url" or "similar".
+    """
+    if not scraped or not existing:
+        return []
+    if threshold is None:
+        threshold = RENAME_SIMILARITY_THRESHOLD
+
+    scraped_titles = [_Title(*entry) for entry in scraped]
+    existing_titles = [_Title(*entry) for entry in existing]
+    matches = []
+    matched_ids = set()
+
+    def take(scraped_title, existing_title, stage):
+        matches.append((scraped_title.item, existing_title.item, stage))
+        matched_ids.add(id(scraped_title))
+        matched_ids.add(id(existing_title))
+
+    def unmatched(titles: list[_Title]) -> list[_Title]:
+        return [title for title in titles if id(title) not in matched_ids]
+
+    by_normalized = defaultdict(list)
+    for title in existing_titles:
+        by_normalized[title.normalized].append(title)
+    for title in scraped_titles:
+        group = by_normalized.get(title.normalized)
+        if group:
+            take(title, group.pop(0), "normalized")
+    scraped_titles = unmatched(scraped_titles)
+    existing_titles = unmatched(existing_titles)
+
+    scraped_url_counts = Counter(
+        scraped_urls if scraped_urls is not None else (title.url for title in scraped_titles))
+    existing_url_counts = Counter(
+        existing_urls if existing_urls is not None else (title.url for title in existing_titles))
+    existing_by_url = _unique_by_url(existing_titles, existing_url_counts)
+    for url, title in _unique_by_url(scraped_titles, scraped_url_counts).items():
+        match = existing_by_url.get(url)
+        if match is not None and jaccard(title.shingles, match.shingles) >= RENAME_URL_MIN_SIMILARITY:
+            take(title, match, "url")
+    scraped_titles = unmatched(scraped_titles)
+    existing_titles = unmatched(existing_titles)
+
+    if scraped_titles and existing_titles:
+        used_scraped, used_existing = set(), set()
+        pairs = _similar_pairs(scraped_titles, existing_titles, threshold)
+        for score, i, j in pairs:
+            if i in used_scraped or j in used_existing:
+                continue
+            used_scraped.add(i)
+            used_existing.add(j)
+            matches.append(
+                (scraped_titles[i].item, existing_titles[j].item, "similar"))
+
+    return matches
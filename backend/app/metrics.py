@@ -0,0 +1,192 @@
+import bisect
+import logging
+import time
+from dataclasses import dataclass, field
+
+from starlette.datastructures import MutableHeaders
+
+from database.instrumentation import QueryStats, current_query_stats
+
+from .config import REQUEST_QUERY_WARNING
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, in seconds and in bytes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Route label for requests that matched no route, so stray URLs do not
+# create a label each
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus layout.
+    """
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total, result = 0, []
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            result.append((str(bound), total))
+        return result
+
+
+@dataclass
+class RouteMetrics:
+    latency: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS))
+    response_size: Histogram = field(default_factory=lambda: Histogram(SIZE_BUCKETS))
+    statuses: dict = field(default_factory=dict)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics, per method and route template. Only
+    updated from the event loop, so it needs no locking.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float,
+               size: int, query_stats: QueryStats):
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(seconds)
+        metrics.response_size.observe(size)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.db_queries += query_stats.queries
+        metrics.db_seconds += query_stats.seconds
+
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        routes = sorted(self.routes.items())
+
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(
+                    f'http_requests_total{{{_labels(method, route)},status="{status}"}} {count}')
+
+        for name, attribute in (("http_request_duration_seconds", "latency"),
+                                ("http_response_size_bytes", "response_size")):
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), metrics in routes:
+                histogram = getattr(metrics, attribute)
+                labels = _labels(method, route)
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        lines.append("# TYPE db_queries_total counter")
+        for (method, route), metrics in routes:
+            lines.append(f"db_queries_total{{{_labels(method, route)}}} {metrics.db_queries}")
+        lines.append("# TYPE db_query_duration_seconds_total counter")
+        for (method, route), metrics in routes:
+            lines.append(
+                f"db_query_duration_seconds_total{{{_labels(method, route)}}} {metrics.db_seconds}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method: str, route: str) -> str:
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}"'
+
+
+request_metrics = MetricsRegistry()
+
+
+def _is_streamed(status: int, headers: MutableHeaders) -> bool:
+    """
+    Whether the body follows the headers in pieces (no Content-Length),
+    as for server-sent events and exports; bodiless statuses are not.
+    """
+    return "content-length" not in headers and status not in (204, 304)
+
+
+def server_timing(total_seconds: float, query_stats: QueryStats) -> str:
+    return (f'db;dur={query_stats.seconds * 1000:.1f};desc="{query_stats.queries} queries", '
+            f"app;dur={total_seconds * 1000:.1f}")
+
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware recording latency, response size and database
+    statements per route, and reporting the request's database time and
+    query count in a Server-Timing header. Add it last so it is outermost
+    and sees the bytes actually sent.
+
+    The header goes out before the body, so streamed responses (events,
+    exports), which query while they send, get none; their database time
+    is only in the metrics.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = request_metrics,
+                 query_warning: int = REQUEST_QUERY_WARNING):
+        self.app = app
+        self.registry = registry
+        self.query_warning = query_warning
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        query_stats = QueryStats()
+        token = current_query_stats.set(query_stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def instrumented_send(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                if not _is_streamed(status, headers):
+                    headers.append("Server-Timing", server_timing(
+                        time.perf_counter() - started, query_stats))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.registry.in_flight += 1
+        try:
+            await self.app(scope, receive, instrumented_send)
+        finally:
+            self.registry.in_flight -= 1
+            current_query_stats.reset(token)
+            seconds = time.perf_counter() - started
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            self.registry.record(
+                scope["method"], route_path, status, seconds, size, query_stats)
+            if query_stats.queries > self.query_warning:
+                logger.warning(
+                    "%s %s ran %d database queries (%.1f ms).", scope["method"],
+                    route_path, query_stats.queries, query_stats.seconds * 1000)
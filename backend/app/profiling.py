@@ -0,0 +1,194 @@
+import cProfile
+import hmac
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from .config import PROFILE_DIR, PROFILE_MODE, PROFILE_SAMPLE_INTERVAL, PROFILE_TOKEN
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sample", "cprofile")
+
+# Leaf frames of threads parked waiting for work; left out of the
+# samples of threads other than the profiled one
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+# One profile at a time; the profilers see the whole process, so
+# overlapping runs would record each other
+_active_lock = threading.Lock()
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of all threads from a background thread and
+    counts them in the collapsed format (`frame;frame;frame count`) that
+    flamegraph.pl, speedscope and similar tools read. The profiled code
+    runs unmodified, so the overhead is the sampling thread only.
+    """
+
+    def __init__(self, interval: float, main_thread_id: int):
+        self.interval = interval
+        self.main_thread_id = main_thread_id
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if (thread_id != self.main_thread_id
+                        and os.path.basename(frame.f_code.co_filename) in _IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileRun:
+    """
+    One profiling session: a stack sampler (`sample`, collapsed stacks)
+    or cProfile (`cprofile`, a pstats file for snakeviz or flameprof).
+    """
+
+    def __init__(self, label: str, mode: str):
+        self.mode = mode
+        extension = "collapsed" if mode == "sample" else "prof"
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_") or "profile"
+        self.path = os.path.join(
+            PROFILE_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{name}.{extension}")
+        self._sampler: Optional[StackSampler] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._started = 0.0
+
+    def start(self):
+        self._started = time.perf_counter()
+        if self.mode == "sample":
+            self._sampler = StackSampler(
+                PROFILE_SAMPLE_INTERVAL, threading.get_ident())
+            self._sampler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self):
+        if self._sampler is not None:
+            self._sampler.stop()
+        else:
+            self._profiler.disable()
+
+    def write(self):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if self._sampler is not None:
+            self._sampler.write(self.path)
+        else:
+            self._profiler.dump_stats(self.path)
+        logger.info(
+            f"Profile written to {self.path} ({time.perf_counter() - self._started:.2f} s profiled).")
+
+
+@asynccontextmanager
+async def profiling(label: str, mode: Optional[str] = None):
+    """
+    Profile the enclosed block. Yields the run (its `path` is known up
+    front), or None when another profile is already running.
+    """
+    mode = mode if mode in PROFILE_MODES else PROFILE_MODE
+    if not _active_lock.acquire(blocking=False):
+        logger.warning(f"Profile of {label} skipped, another profile is running.")
+        yield None
+        return
+    run = ProfileRun(label, mode)
+    try:
+        run.start()
+        try:
+            yield run
+        finally:
+            run.stop()
+            # Also when the block raised: that profile is often the one wanted
+            try:
+                await run_in_threadpool(run.write)
+            except Exception:
+                logger.exception(f"Could not write the profile to {run.path}.")
+    finally:
+        _active_lock.release()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that carry the admin token, in an `X-Profile`
+    header or a `profile` query parameter. The mode defaults to
+    PROFILE_MODE and can be chosen per request with `X-Profile-Mode` or
+    `profile_mode`. The written file is named in the `X-Profile-File`
+    response header. Only installed when PROFILE_TOKEN is set.
+    """
+
+    def __init__(self, app, token: str = PROFILE_TOKEN):
+        self.app = app
+        self.token = token.encode()
+
+    def _requested_mode(self, scope) -> Optional[str]:
+        headers = Headers(scope=scope)
+        supplied, mode = headers.get("x-profile"), headers.get("x-profile-mode")
+        if supplied is None and b"profile" in scope["query_string"]:
+            query = parse_qs(scope["query_string"].decode("latin-1"))
+            supplied = query.get("profile", [None])[0]
+            mode = query.get("profile_mode", [mode])[0]
+        if supplied is None or not hmac.compare_digest(supplied.encode(), self.token):
+            return None
+        return mode or PROFILE_MODE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = self._requested_mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        async with profiling(f"{scope['method']}_{scope['path']}", mode) as run:
+            if run is None:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_profile(message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(raw=message["headers"]).append(
+                        "X-Profile-File", os.path.basename(run.path))
+                await send(message)
+
+            await self.app(scope, receive, send_with_profile)
@@ -0,0 +1,120 @@
+from typing import Optional
+import asyncio
+import logging
+from fastapi import APIRouter, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from database.engine import get_async_session_factory
+from database.async_crud import get_max_change_seq, get_topic_changes
+from ..config import EVENT_KEEPALIVE_SECONDS
+from ..events import topic_events, format_sse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+REPLAY_PAGE_SIZE = 500
+
+
+async def _replay_from_database(last_event_id: int):
+    """
+    Replay changes the in-memory history no longer holds from the change
+    feed, as SSE events. Read from the primary, like the latest change_seq
+    the history was checked against: a lagging replica would leave out
+    changes the live stream then skips as already sent.
+    """
+    async with get_async_session_factory()() as db:
+        since = last_event_id
+        while True:
+            page = await get_topic_changes(db, since, REPLAY_PAGE_SIZE)
+            for change in page["changes"]:
+                yield {
+                    "id": change["seq"],
+                    "event": change["change"],
+                    "data": {
+                        "seq": change["seq"],
+                        "topic_id": change["topic_id"],
+                        "title": change["title"],
+                        "url": change["url"],
+                        "status": change["status"].value,
+                        "lab_name": change["lab_name"],
+                    },
+                }
+            since = page["next_cursor"]
+            if not page["has_more"]:
+                break
+
+
+async def _event_stream(request: Request, last_event_id: Optional[int]):
+    # Subscribe before replaying so nothing published meanwhile is lost
+    subscription = topic_events.subscribe()
+    sent_up_to = last_event_id or 0
+    try:
+        yield "retry: 3000\n\n"
+
+        if last_event_id is not None:
+            # The primary, so a lagging replica cannot hide missed changes
+            async with get_async_session_factory()() as db:
+                latest_seq = await get_max_change_seq(db)
+            backlog = topic_events.replay_since(last_event_id, latest_seq)
+            if backlog is None:
+                async for event in _replay_from_database(last_event_id):
+                    yield format_sse(event)
+                    sent_up_to = max(sent_up_to, event["id"])
+            else:
+                for event in backlog:
+                    yield format_sse(event)
+                    sent_up_to = max(sent_up_to, event["id"])
+
+        while True:
+            try:
+                batch = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=EVENT_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+
+            if batch is None or subscription.overflowed:
+                # Too slow: end the stream, the client resumes from its last ID
+                break
+            for event in batch:
+                if event["id"] <= sent_up_to:
+                    continue
+                sent_up_to = event["id"]
+                yield format_sse(event)
+    finally:
+        topic_events.unsubscribe(subscription)
+
+
+@router.get("/events/topics", summary="Stream topic changes as server-sent events")
+async def stream_topic_events(
+    request: Request,
+    last_event_id: Optional[int] = Query(
+        None, ge=0, description="Resume after this event ID (same as the Last-Event-ID header)."),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Push inserted, closed and reopened topics to the client as they are
+    synced, instead of having dashboards poll /api/thesis_topics.
+
+    Event IDs are change feed sequence numbers. A reconnecting client
+    (EventSource does this on its own) sends Last-Event-ID and gets the
+    events it missed, from memory or, if those are too old, from the
+    change feed. Each subscriber has a bounded buffer; one that falls
+    behind is disconnected and resumes the same way.
+
+    Args:
+        request (Request): Incoming request, used to detect disconnects.
+        last_event_id (int, optional): Resume point as a query parameter.
+        last_event_id_header (int, optional): Resume point from the Last-Event-ID header.
+
+    Returns:
+        StreamingResponse: A text/event-stream of topic change events.
+    """
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+    return StreamingResponse(
+        _event_stream(request, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
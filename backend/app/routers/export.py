@@ -0,0 +1,193 @@
+from datetime import datetime
+from typing import Literal, Optional
+import csv
+import io
+import logging
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from database.engine import get_async_read_session_factory
+from database.models import TopicStatus
+from database.listing import topics_export_query, labs_export_query
+from database.async_crud import stream_query_rows
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Rows read from the database (and written as one CSV chunk or one
+# columnar record batch) at a time
+EXPORT_BATCH_SIZE = 5000
+
+ExportFormat = Literal["csv", "parquet", "arrow"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+LAB_COLUMNS = ["lab_id", "lab_name", "lab_url"]
+TOPIC_COLUMNS = ["topic_id", "lab_id", "lab_name",
+                 "title", "url", "status", "added_date"]
+
+
+def _cell(value):
+    if isinstance(value, TopicStatus):
+        return value.value
+    return value
+
+
+async def _row_batches(query):
+    async with get_async_read_session_factory()() as db:
+        async for rows in stream_query_rows(db, query, EXPORT_BATCH_SIZE):
+            yield [[_cell(value) for value in row] for row in rows]
+
+
+async def _csv_chunks(query, columns: list[str]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in _row_batches(query):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object collecting what pyarrow writes so it can be
+    handed out chunk by chunk, while reporting the total position pyarrow
+    needs for Parquet footers.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(pa, columns: list[str]):
+    types = {
+        "lab_id": pa.int64(),
+        "topic_id": pa.int64(),
+        "added_date": pa.timestamp("us"),
+    }
+    return pa.schema([(name, types.get(name, pa.string())) for name in columns])
+
+
+async def _columnar_chunks(query, columns: list[str], export_format: str):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(pa, columns)
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(
+            pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(
+            pa.PythonFile(sink, mode="w"), schema,
+            options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    async for rows in _row_batches(query):
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array([row[i] for row in rows], type=field.type)
+             for i, field in enumerate(schema)],
+            schema=schema)
+        writer.write_batch(batch)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def _export_response(query, columns: list[str], export_format: str, name: str):
+    if export_format == "csv":
+        chunks = _csv_chunks(query, columns)
+    else:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=501, detail="Columnar export requires pyarrow.")
+        chunks = _columnar_chunks(query, columns, export_format)
+
+    extension = {"csv": "csv", "parquet": "parquet",
+                 "arrow": "arrows"}[export_format]
+    filename = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export/labs", summary="Export labs")
+async def export_labs(
+    format: ExportFormat = Query("csv"),
+    lab: Optional[list[str]] = Query(
+        None, description="Only these labs (repeatable)."),
+):
+    """
+    Stream all labs as CSV, Parquet or Arrow IPC.
+
+    Args:
+        format (str): `csv`, `parquet` or `arrow` (IPC stream, zstd-compressed).
+        lab (list[str], optional): Lab name filter.
+
+    Returns:
+        StreamingResponse: The exported file.
+    """
+    return _export_response(labs_export_query(lab), LAB_COLUMNS, format, "labs")
+
+
+@router.get("/export/topics", summary="Export thesis topics")
+async def export_topics(
+    format: ExportFormat = Query("csv"),
+    status: Optional[TopicStatus] = Query(
+        None, description="Only topics with this status."),
+    lab: Optional[list[str]] = Query(
+        None, description="Only topics of these labs (repeatable)."),
+    added_after: Optional[datetime] = Query(
+        None, description="Only topics added after this date."),
+    added_before: Optional[datetime] = Query(
+        None, description="Only topics added before this date."),
+    tag: Optional[list[str]] = Query(
+        None, description="Only topics with any of these tags (repeatable)."),
+):
+    """
+    Stream thesis topics as CSV, Parquet or Arrow IPC, read from the
+    database in chunks so memory stays bounded for a full catalog export.
+
+    Args:
+        format (str): `csv`, `parquet` or `arrow` (IPC stream, zstd-compressed).
+        status (TopicStatus, optional): Topic status filter.
+        lab (list[str], optional): Lab name filter.
+        added_after (datetime, optional): Lower added-date bound.
+        added_before (datetime, optional): Upper added-date bound.
+        tag (list[str], optional): Tag filter.
+
+    Returns:
+        StreamingResponse: The exported file.
+    """
+    query = topics_export_query(status, lab, added_after, added_before, tag)
+    return _export_response(query, TOPIC_COLUMNS, format, "thesis_topics")
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from database.database import get_db
-from database.models import init_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_async_db
 from database.schemas import LabCreate
-from database.crud import lab_exists, add_new_lab
+from database.async_crud import get_all_labs, add_new_labs
+from ..cache import data_generation
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,43 +12,56 @@ router = APIRouter()
 
 
 @router.post("/insert_lab")
-def insert_lab(labs: list[LabCreate], db: Session = Depends(get_db)):
+async def insert_lab(labs: list[LabCreate], db: AsyncSession = Depends(get_async_db)):
     """
     Insert a list of labs into the database, ensuring no duplicates.
-    Initializes the database if necessary.
 
     Args:
         labs (list[LabCreate]): List of labs to insert.
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
 
     Returns:
         dict: Summary of inserted and skipped labs.
     """
     try:
-        # Initialize the database to ensure tables exist
-        init_db()
-        logger.info("Database initialized successfully.")
-
         inserted_count = 0
         skipped_count = 0
 
-        for lab_data in labs:
-            try:
-                # Check if the lab exists
-                if lab_exists(db, lab_data.lab_name, str(lab_data.lab_url)):
-                    logger.info(f"Skipped existing lab: {lab_data.lab_name}")
-                    skipped_count += 1
-                    continue
-
-                # Add the new lab
-                add_new_lab(db, lab_data)
-                inserted_count += 1
-                logger.info(f"Inserted new lab: {lab_data.lab_name}")
+        # Compare against all existing labs at once and insert the new
+        # ones in one batch
+        existing_labs = await get_all_labs(db)
+        existing_keys = {(lab.lab_name, lab.lab_url) for lab in existing_labs}
+        taken_names = {lab.lab_name for lab in existing_labs}
+        taken_urls = {lab.lab_url for lab in existing_labs}
+        new_labs = []
 
-            except Exception as e:
+        for lab_data in labs:
+            lab_url = str(lab_data.lab_url)
+            if (lab_data.lab_name, lab_url) in existing_keys:
+                logger.debug("Skipped existing lab: %s", lab_data.lab_name)
+                skipped_count += 1
+                continue
+            if lab_data.lab_name in taken_names or lab_url in taken_urls:
                 logger.error(
-                    f"Error processing lab: {lab_data.lab_name}. Error: {e}")
+                    f"Error processing lab: {lab_data.lab_name}. Name or URL already used by another lab.")
                 continue
+            new_labs.append(lab_data)
+            existing_keys.add((lab_data.lab_name, lab_url))
+            taken_names.add(lab_data.lab_name)
+            taken_urls.add(lab_url)
+
+        # Add the new labs; one taken concurrently by another request is
+        # skipped without failing the rest
+        inserted, generation = await add_new_labs(db, new_labs)
+        data_generation.advance_to(generation)
+        inserted_names = set(inserted)
+        inserted_count = len(inserted_names)
+        for lab_data in new_labs:
+            if lab_data.lab_name in inserted_names:
+                logger.info(f"Inserted new lab: {lab_data.lab_name}")
+            else:
+                logger.error(
+                    f"Error processing lab: {lab_data.lab_name}. Name or URL already used by another lab.")
 
         logger.info(
             f"Insert operation completed: {inserted_count} labs inserted, {skipped_count} labs skipped."
@@ -1,12 +1,32 @@
-import json
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database.database import get_db
-from database.models import Lab, init_db, TopicStatus
+from collections import defaultdict
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.engine import get_async_session_factory
+from database.locks import writer_lock
+from database.models import Lab, TopicStatus
 from ..routers.scrape import scrape_all
 from ..routers.insert_lab import insert_lab
 from database.schemas import LabCreate
-from database.crud import get_all_topics, add_new_thesis_topic, get_lab_id_mapping, update_topic_status
+from database.async_crud import (
+    get_all_topics,
+    get_lab_id_mapping,
+    apply_topic_changes,
+    get_max_change_seq,
+    get_search_rows,
+    get_tagging_rows,
+    update_topic_tags,
+)
+from ..cache import data_generation
+from ..search import index_new_topic, index_status_change, index_rename
+from ..matching import match_renames
+from ..similar import similar_index, similar_topic_changed
+from ..tagging import extract_topic_tags
+from ..events import publish_topic_changes
+from ..profiling import profiling
+from ..singleflight import single_flight
+from ..config import PROFILE_SYNC
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,63 +35,144 @@ router = APIRouter()
 
 
 @router.post("/insert_thesis_topic")
-async def sync_thesis_topics(db: Session = Depends(get_db)):
+async def sync_thesis_topics():
     """
-    Synchronize thesis topics:
-    - Initialize the database.
-    - Scrape data to get labs and thesis topics.
+    Run the sync (see `run_sync`), profiled end to end when PROFILE_SYNC
+    is set. Requests arriving while a sync runs join it and get its
+    summary instead of starting another scrape.
+
+    The sync uses a session of its own rather than a request dependency,
+    since it outlives the request that started it when that client
+    disconnects.
+    """
+    return await single_flight.run("sync", _run_sync_in_session)
+
+
+async def _run_sync_in_session():
+    async with get_async_session_factory()() as db:
+        if not PROFILE_SYNC:
+            return await run_sync(db)
+        async with profiling("sync_thesis_topics"):
+            return await run_sync(db)
+
+
+async def run_sync(db: AsyncSession):
+    """
+    Scrape all labs and synchronize the thesis topics with the results
+    (see `sync_scraped_topics`).
+
+    Args:
+        db (AsyncSession): Database session.
+
+    Returns:
+        dict: Summary of inserted, skipped, and closed thesis topics.
+    """
+    try:
+        logger.info("Starting the scraping process.")
+        scrape_result = await scrape_all()
+        return await sync_scraped_topics(
+            db, scrape_result["all_labs"], scrape_result["all_thesis_topics"])
+    except Exception as e:
+        logger.exception("Error running the scrape and sync.")
+        raise HTTPException(
+            status_code=500, detail="Failed to synchronize thesis topics."
+        ) from e
+
+
+async def sync_scraped_topics(db: AsyncSession, labs: list[dict], topics: list[dict],
+                              lab_scope: Optional[set[str]] = None,
+                              dry_run: bool = False,
+                              update_indexes: bool = True):
+    """
+    Synchronize thesis topics with scraped results (see `_sync_topics`)
+    while holding the sync writer lock, so syncs from other processes
+    (e.g. the CLI next to the server) wait instead of planning against
+    data that is about to change. Dry runs write nothing and take no lock.
+    """
+    if dry_run:
+        return await _sync_topics(db, labs, topics, lab_scope, dry_run, update_indexes)
+    async with writer_lock(db.bind, "sync"):
+        return await _sync_topics(db, labs, topics, lab_scope, dry_run, update_indexes)
+
+
+async def _sync_topics(db: AsyncSession, labs: list[dict], topics: list[dict],
+                       lab_scope: Optional[set[str]] = None,
+                       dry_run: bool = False,
+                       update_indexes: bool = True):
+    """
+    Synchronize thesis topics with scraped (or replayed) results:
     - Insert new labs.
     - Insert thesis topics for each Lab.
+    - Update topics the lab renamed in place (see matching.py).
     - Set topics missing from the scraped data to "closed".
 
+    All topic changes are planned first and then written in one
+    transaction with bulk statements. The schema must already exist
+    (`async_init_db`, run at startup).
+
     Args:
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session.
+        labs (list[dict]): Scraped labs (lab_name, lab_url).
+        topics (list[dict]): Scraped topics (lab_name, thesis_title, thesis_url).
+        lab_scope (set[str], optional): Only close or rename topics of these
+            labs, for syncing a subset of labs. Defaults to all labs.
+        dry_run (bool): Only compute the summary, write nothing.
+        update_indexes (bool): Update the in-process search and similarity
+            indexes and publish change events (off outside the web server).
 
     Returns:
         dict: Summary of inserted, skipped, and closed thesis topics.
     """
+    inserted_count = 0
+    skipped_count = 0
+    closed_count = 0
+    reopened_count = 0
+    renamed_count = 0
+
     try:
-        # Step 1: Initialize the database
-        logger.info("Initializing the database.")
-        init_db()
+        # Step 1: Insert labs
+        lab_id_mapping = await get_lab_id_mapping(db)
+        if dry_run:
+            # Labs that would be inserted get placeholder IDs
+            for lab in labs:
+                lab_id_mapping.setdefault(lab["lab_name"], -len(lab_id_mapping) - 1)
+        else:
+            logger.info("Inserting labs into the database.")
+            lab_create_list = [
+                LabCreate(lab_name=lab["lab_name"], lab_url=lab["lab_url"])
+                for lab in labs
+            ]
+            await insert_lab(lab_create_list, db)
 
-        # Step 2: Scrape data
-        logger.info("Starting the scraping process.")
-        scrape_result = await scrape_all()
-        labs = scrape_result["all_labs"]
-        topics = scrape_result["all_thesis_topics"]
-        # with open("scrape_results_20241228_131101.json", "r", encoding="utf-8") as f:
-        #     scrape_result = json.load(f)
-
-        # labs = scrape_result["labs"]
-        # topics = scrape_result["thesis_topics"]
-
-        # Step 3: Insert labs
-        logger.info("Inserting labs into the database.")
-        lab_create_list = [
-            LabCreate(lab_name=lab["lab_name"], lab_url=lab["lab_url"])
-            for lab in labs
-        ]
-        insert_lab(lab_create_list, db)
-
-        # Fetch lab IDs for mapping
-        lab_id_mapping = lab_id_mapping = get_lab_id_mapping(db)
-
-        # Step 4: Process thesis topics
+            # Fetch lab IDs for mapping
+            lab_id_mapping = await get_lab_id_mapping(db)
+        lab_names_by_id = {lab_id: name for name,
+                           lab_id in lab_id_mapping.items()}
+        scope_lab_ids = None
+        if lab_scope is not None:
+            scope_lab_ids = {lab_id_mapping[name]
+                             for name in lab_scope if name in lab_id_mapping}
+
+        # Step 2: Process thesis topics
         logger.info("Processing thesis topics.")
-        inserted_count = 0
-        skipped_count = 0
-        closed_count = 0
-        reopened_count = 0
 
         # Existing topics in the database
-        existing_topics = get_all_topics(db)
+        existing_topics = await get_all_topics(db)
         existing_topic_map = {
             (t.mt_title, t.lab_id): t for t in existing_topics
         }
 
         # Scraped topics to compare
         scraped_topic_keys = set()
+        # URLs of all scraped topics, per lab, for rename matching
+        scraped_urls = defaultdict(list)
+        # Scraped topics without an exact match, per lab
+        unmatched_topics = defaultdict(list)
+        # Planned changes
+        reopened_topics = []
+        renamed_topics = []
+        new_topics = []
+        closed_topics = []
 
         for topic in topics:
             lab_id = lab_id_mapping.get(topic["lab_name"])
@@ -83,56 +184,178 @@ async def sync_thesis_topics(db: Session = Depends(get_db)):
 
             topic_key = (topic["thesis_title"], lab_id)
             scraped_topic_keys.add(topic_key)
+            scraped_urls[lab_id].append(topic["thesis_url"])
 
-            # Check if the topic already exists
-            # if topic_key not in existing_topic_map:
-            #     add_new_thesis_topic(db, topic["thesis_title"],
-            #                          topic["thesis_url"], lab_id)
-            #     inserted_count += 1
-            # else:
-            #     skipped_count += 1
-            #     logger.info(
-            #         f"Skipped existing thesis topic: {topic['thesis_title']}")
             existing_topic = existing_topic_map.get(topic_key)
             if existing_topic:
                 if existing_topic.status == TopicStatus.CLOSED:
                     # Reopen the closed topic
-                    update_topic_status(db, existing_topic, TopicStatus.OPEN)
-                    reopened_count += 1
-                    logger.info(
-                        f"Reopened closed thesis topic: {topic['thesis_title']}")
+                    reopened_topics.append((existing_topic, topic["lab_name"]))
+                    logger.debug(
+                        "Reopened closed thesis topic: %s", topic['thesis_title'])
                 else:
                     skipped_count += 1
-                    logger.info(
-                        f"Skipped existing open thesis topic: {topic['thesis_title']}")
+                    logger.debug(
+                        "Skipped existing open thesis topic: %s", topic['thesis_title'])
             else:
-                # Add new topic
-                add_new_thesis_topic(db, topic["thesis_title"],
-                                     topic["thesis_url"], lab_id)
-                inserted_count += 1
+                unmatched_topics[lab_id].append(topic)
 
-        # Step 5: Close topics missing in scraped results
+        # Existing topics missing from the scraped results, per lab
+        unscraped_topics = defaultdict(list)
         for topic_key, topic_obj in existing_topic_map.items():
-            if topic_key not in scraped_topic_keys and topic_obj.status == TopicStatus.OPEN:
-                update_topic_status(db, topic_obj, TopicStatus.CLOSED)
-                closed_count += 1
-                logger.info(f"Set topic to closed: {topic_obj.mt_title}")
+            if topic_key not in scraped_topic_keys and (
+                    scope_lab_ids is None or topic_obj.lab_id in scope_lab_ids):
+                unscraped_topics[topic_obj.lab_id].append(topic_obj)
+
+        # Step 3: Update renamed topics in place instead of closing the old
+        # title and inserting the new one; insert the rest
+        renamed_topic_ids = set()
+        existing_urls = defaultdict(list)
+        for topic_obj in existing_topics:
+            existing_urls[topic_obj.lab_id].append(topic_obj.mt_url)
+        for lab_id, lab_topics in unmatched_topics.items():
+            # Only open topics can be renamed: a closed topic was already
+            # taken down, and a new title that resembles it is a new topic
+            candidates = [t for t in unscraped_topics.get(lab_id, ())
+                          if t.status == TopicStatus.OPEN]
+            renames = match_renames(
+                [(id(t), t["thesis_title"], t["thesis_url"]) for t in lab_topics],
+                [(t, t.mt_title, t.mt_url) for t in candidates],
+                scraped_urls=scraped_urls[lab_id],
+                existing_urls=existing_urls[lab_id],
+            )
+            renamed_to = {scraped_id: (topic_obj, stage)
+                          for scraped_id, topic_obj, stage in renames}
+
+            for topic in lab_topics:
+                match = renamed_to.get(id(topic))
+                if match:
+                    topic_obj, stage = match
+                    renamed_topics.append((topic_obj, topic))
+                    renamed_topic_ids.add(topic_obj.topic_id)
+                    logger.debug(
+                        "Matched renamed thesis topic (%s): %s", stage, topic['thesis_title'])
+                    continue
+
+                # Add new topic
+                new_topics.append((topic, lab_id))
+
+        # Step 4: Close topics missing in scraped results
+        for lab_topics in unscraped_topics.values():
+            for topic_obj in lab_topics:
+                if topic_obj.topic_id in renamed_topic_ids or topic_obj.status != TopicStatus.OPEN:
+                    continue
+                closed_topics.append(topic_obj)
+                logger.debug("Set topic to closed: %s", topic_obj.mt_title)
+
+        if dry_run:
+            summary = {
+                "status": "dry_run",
+                "inserted": len(new_topics),
+                "skipped": skipped_count,
+                "reopened": len(reopened_topics),
+                "renamed": len(renamed_topics),
+                "closed": len(closed_topics),
+            }
+            logger.info(f"Sync dry run completed: {summary}")
+            return summary
+
+        # Step 5: Write all topic changes at once; every change gets the
+        # next change feed sequence number. Sequence numbers are handed
+        # out in the order the changes are published below (reopened,
+        # renamed, inserted, closed): event IDs must only grow, since
+        # subscribers skip IDs at or below the last one they received.
+        # The per-lab (open_delta, closed_delta) for the lab_stats table
+        # are written in the same transaction.
+        change_seq = await get_max_change_seq(db)
+        status_changes, renames, inserts = [], [], []
+        stats_deltas = defaultdict(lambda: [0, 0])
+        for topic_obj, _ in reopened_topics:
+            change_seq += 1
+            status_changes.append((topic_obj, TopicStatus.OPEN, change_seq))
+            stats_deltas[topic_obj.lab_id][0] += 1
+            stats_deltas[topic_obj.lab_id][1] -= 1
+        for topic_obj, topic in renamed_topics:
+            change_seq += 1
+            renames.append((topic_obj, topic["thesis_title"], topic["thesis_url"], change_seq))
+        for topic, lab_id in new_topics:
+            change_seq += 1
+            inserts.append((topic["thesis_title"], topic["thesis_url"], lab_id, change_seq))
+            stats_deltas[lab_id][0] += 1
+        for topic_obj in closed_topics:
+            change_seq += 1
+            status_changes.append((topic_obj, TopicStatus.CLOSED, change_seq))
+            stats_deltas[topic_obj.lab_id][0] -= 1
+            stats_deltas[topic_obj.lab_id][1] += 1
+
+        inserted_topics, generation = await apply_topic_changes(
+            db, status_changes, renames, inserts, stats_deltas)
+        reopened_count = len(reopened_topics)
+        closed_count = len(closed_topics)
+        renamed_count = len(renamed_topics)
+        inserted_count = len(inserted_topics)
+        # Before the events go out, so clients that refetch on an event do
+        # not get the cached pre-sync body (or a 304 for it)
+        data_generation.advance_to(generation)
+
+        changes = []
+        for topic_obj, lab_name in reopened_topics:
+            if update_indexes:
+                index_status_change(topic_obj)
+                similar_topic_changed(topic_obj, lab_name)
+                changes.append(("reopened", topic_obj, lab_name))
+        for topic_obj, topic in renamed_topics:
+            if update_indexes:
+                index_rename(topic_obj, topic["lab_name"])
+                similar_topic_changed(topic_obj, topic["lab_name"])
+                changes.append(("renamed", topic_obj, topic["lab_name"]))
+        for new_topic, (topic, _) in zip(inserted_topics, new_topics):
+            if update_indexes:
+                index_new_topic(new_topic, topic["lab_name"])
+                similar_topic_changed(new_topic, topic["lab_name"])
+                changes.append(("inserted", new_topic, topic["lab_name"]))
+        for topic_obj in closed_topics:
+            if update_indexes:
+                index_status_change(topic_obj)
+                similar_topic_changed(topic_obj)
+                changes.append(
+                    ("closed", topic_obj, lab_names_by_id.get(topic_obj.lab_id)))
+        # One batch per sync, so a sync of any size takes a single slot
+        # in each subscriber's buffer
+        publish_topic_changes(changes)
+
+        # Step 6: Tag all topics with research areas in one batch and
+        # write only the (topic, tag) rows that changed
+        try:
+            topic_tags = await run_in_threadpool(
+                extract_topic_tags, await get_tagging_rows(db))
+            _, generation = await update_topic_tags(db, topic_tags)
+            data_generation.advance_to(generation)
+        except Exception:
+            logger.exception("Failed to update topic tags.")
+
+        # Step 7: Precompute similar-topic lists (full build when missing
+        # or when incremental updates have drifted too far)
+        if update_indexes:
+            try:
+                await similar_index.refresh(lambda: get_search_rows(db), data_generation.value)
+            except Exception:
+                logger.exception("Failed to build the similar topics index.")
 
         # Summary
         logger.info(
-            f"Sync operation completed: {inserted_count} thesis topics inserted, {skipped_count} thesis topics skipped, {closed_count} thesis topics closed."
+            f"Sync operation completed: {inserted_count} thesis topics inserted, {skipped_count} thesis topics skipped, {reopened_count} thesis topics reopened, {renamed_count} thesis topics renamed, {closed_count} thesis topics closed."
         )
         return {
             "status": "success",
             "inserted": inserted_count,
             "skipped": skipped_count,
             "reopened": reopened_count,
+            "renamed": renamed_count,
             "closed": closed_count
         }
 
     except Exception as e:
-        db.rollback()  # Rollback changes on error
+        await db.rollback()  # Rollback changes on error
         logger.exception("Error synchronizing thesis topics.")
-        raise HTTPException(
-            status_code=500, detail="Failed to synchronize thesis topics."
-        )
+        raise
@@ -1,66 +1,148 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database.database import get_db
-from database.crud import (
+from datetime import date, datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_async_read_db
+from database.async_crud import (
     get_total_labs,
     get_total_open_thesis,
     get_total_closed_thesis,
     get_thesis_per_lab,
+    get_insights_summary,
+    get_topics_added_series,
+    get_median_time_open,
+    get_posting_velocity,
 )
+from database.schemas import InsightsSummary, MedianTimeOpen, PostingVelocity, TopicsAddedSeries
+from ..cache import cached_json_response
 
 router = APIRouter()
 
 
-@router.get("/insights/total_labs")
-def fetch_total_labs(db: Session = Depends(get_db)):
+@router.get("/insights/total_labs", response_model=int)
+async def fetch_total_labs(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """
     API endpoint to get the total number of labs.
     """
     try:
-        total_labs = get_total_labs(db)
-        return total_labs
+        return await cached_json_response(request, lambda: get_total_labs(db))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail="Failed to fetch total labs.")
 
 
-@router.get("/insights/total_open_thesis")
-def fetch_total_open_thesis(db: Session = Depends(get_db)):
+@router.get("/insights/total_open_thesis", response_model=int)
+async def fetch_total_open_thesis(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """
     API endpoint to get the total number of open thesis topics.
     """
     try:
-        total_open_thesis = get_total_open_thesis(db)
-        return total_open_thesis
+        return await cached_json_response(request, lambda: get_total_open_thesis(db))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail="Failed to fetch total open thesis topics."
         )
 
 
-@router.get("/insights/total_closed_thesis")
-def fetch_total_closed_thesis(db: Session = Depends(get_db)):
+@router.get("/insights/total_closed_thesis", response_model=int)
+async def fetch_total_closed_thesis(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """
     API endpoint to get the total number of closed thesis topics.
     """
     try:
-        total_closed_thesis = get_total_closed_thesis(db)
-        return total_closed_thesis
+        return await cached_json_response(request, lambda: get_total_closed_thesis(db))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail="Failed to fetch total closed thesis topics."
         )
 
 
-@router.get("/insights/thesis_per_lab")
-def fetch_thesis_per_lab(db: Session = Depends(get_db)):
+@router.get("/insights/thesis_per_lab", response_model=dict[str, int])
+async def fetch_thesis_per_lab(request: Request, db: AsyncSession = Depends(get_async_read_db)):
     """
     API endpoint to get the number of thesis topics per lab.
     """
     try:
-        thesis_per_lab = get_thesis_per_lab(db)
-        return thesis_per_lab
+        return await cached_json_response(request, lambda: get_thesis_per_lab(db))
     except Exception as e:
         raise HTTPException(
             status_code=500, detail="Failed to fetch thesis topics per lab."
         )
+
+
+@router.get("/insights/summary", response_model=InsightsSummary)
+async def fetch_insights_summary(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    API endpoint to get all insights in one response: total labs, open and
+    closed topics, topics per lab and per-lab open/closed splits.
+    Read from the lab_stats table the sync maintains.
+    """
+    try:
+        return await cached_json_response(request, lambda: get_insights_summary(db))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail="Failed to fetch insights summary."
+        )
+
+
+@router.get("/insights/topics_added", response_model=TopicsAddedSeries)
+async def fetch_topics_added(
+    request: Request,
+    period: Literal["week", "month"] = Query(
+        "week", description="Bucket size: `week` (starting Monday) or `month`."),
+    lab: Optional[list[str]] = Query(
+        None, description="Only these labs (repeatable)."),
+    added_after: Optional[datetime] = Query(
+        None, description="Only topics added after this date."),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    API endpoint to get the number of topics added per week or month for
+    each lab, with a running total per lab.
+    Computed once per data generation and then served from the cache.
+    """
+    try:
+        return await cached_json_response(
+            request, lambda: get_topics_added_series(db, period, lab, added_after))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail="Failed to fetch topics added per period."
+        )
+
+
+@router.get("/insights/time_open", response_model=MedianTimeOpen)
+async def fetch_time_open(request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    API endpoint to get the median number of days topics stay open before
+    they are closed, overall and per lab.
+    Computed once per data generation and then served from the cache.
+    """
+    try:
+        return await cached_json_response(request, lambda: get_median_time_open(db))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail="Failed to fetch median time open."
+        )
+
+
+@router.get("/insights/velocity", response_model=PostingVelocity)
+async def fetch_posting_velocity(
+    request: Request,
+    days: int = Query(90, ge=1, le=3650,
+                      description="Window length in days."),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    API endpoint to get each lab's posting velocity: topics added in the
+    last `days` days, per week, and against the preceding window.
+    Computed once per data generation and day and then served from the
+    cache; the window ends with today.
+    """
+    today = date.today()
+    try:
+        return await cached_json_response(
+            request, lambda: get_posting_velocity(db, days, today), extra_key=(today,))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail="Failed to fetch posting velocity."
+        )
@@ -0,0 +1,37 @@
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ..config import PROFILE_TOKEN
+from ..metrics import request_metrics
+
+router = APIRouter()
+
+
+def require_admin_token(
+    authorization: Optional[str] = Header(None),
+    x_profile: Optional[str] = Header(None),
+):
+    """
+    Admit requests carrying PROFILE_TOKEN, the admin token profiling uses,
+    as a bearer token (what Prometheus sends) or in an `X-Profile`
+    header. Without PROFILE_TOKEN the endpoint is disabled.
+    """
+    if PROFILE_TOKEN is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    supplied = x_profile
+    if authorization is not None and authorization[:7].lower() == "bearer ":
+        supplied = authorization[7:].strip()
+    if supplied is None or not hmac.compare_digest(supplied.encode(), PROFILE_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Admin token required.",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+@router.get("/metrics", response_class=PlainTextResponse,
+            summary="Request and database metrics in the Prometheus text format",
+            dependencies=[Depends(require_admin_token)])
+def get_metrics():
+    return PlainTextResponse(request_metrics.render(),
+                             media_type="text/plain; version=0.0.4")
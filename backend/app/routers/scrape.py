@@ -1,12 +1,16 @@
+from typing import Optional
 from fastapi import APIRouter
+import asyncio
 import requests
 import logging
 import json
 import os
 from datetime import datetime
 
-from ..config import LAB_LINKS
+from ..config import LAB_LINKS, SCRAPE_CONCURRENCY
+from ..scrapers.politeness import polite_fetch
 from ..scrapers.registry import get_scraper_func
+from ..singleflight import single_flight
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -30,6 +34,44 @@ def validate_link(url: str) -> bool:
         return False
 
 
+async def _scrape_lab(lab_name: str, url: str):
+    """
+    Validate and scrape one lab.
+
+    Returns:
+        tuple: (lab_name, url, summary message, scraped items or None).
+    """
+    logger.info(f"Processing lab '{lab_name}' => {url}")
+
+    # Validate link (a blocking request, so off the event loop)
+    async with polite_fetch(url):
+        valid = await asyncio.to_thread(validate_link, url)
+    if not valid:
+        msg = f"Skipping lab '{lab_name}', invalid link: {url}"
+        logger.warning(msg)
+        return lab_name, url, msg, None
+
+    # Retrieve function from registry
+    scraper_func = get_scraper_func(lab_name)
+    if not scraper_func:
+        msg = f"No registered function for '{lab_name}', skipping."
+        logger.warning(msg)
+        return lab_name, url, msg, None
+
+    # Attempt to scrape
+    try:
+        logger.info(f"Running scraper for '{lab_name}'...")
+        data = await scraper_func(url)
+        logger.info(
+            f"Scraper for '{lab_name}' succeeded, got {len(data)} items."
+        )
+        return lab_name, url, f"{lab_name}: extracted {len(data)} items.", data
+
+    except Exception as e:
+        logger.exception(f"Error scraping '{lab_name}': {e}")
+        return lab_name, url, f"Error scraping {lab_name}", None
+
+
 @router.post("/scrape")
 async def scrape_all():
     """
@@ -40,57 +82,63 @@ async def scrape_all():
       - Collect lab info in all_labs.
       - Collect thesis topics in all_thesis_topics.
       - Write the results to a JSON file on disk.
+
+    Calls arriving while a scrape runs (including the sync's) join it
+    and share its result instead of launching the browsers again.
     """
-    summary = []
-    all_labs = []
-    all_thesis_topics = []
-    results_by_lab = {}  # Store each lab's data here
+    return await single_flight.run(
+        "scrape", lambda: scrape_labs(concurrency=SCRAPE_CONCURRENCY))
 
-    for lab_name, url in LAB_LINKS.items():
-        logger.info(f"Processing lab '{lab_name}' => {url}")
 
-        # Validate link
-        if not validate_link(url):
-            msg = f"Skipping lab '{lab_name}', invalid link: {url}"
-            logger.warning(msg)
-            summary.append(msg)
-            continue
+async def scrape_labs(lab_names: Optional[list[str]] = None, concurrency: int = 1):
+    """
+    Scrape the given labs from config.json (all of them by default),
+    running up to `concurrency` labs at a time. Requests to one host are
+    still limited and spaced by the politeness scheduler, so labs on a
+    shared server do not hit it at once. Results keep the order of
+    config.json and are written to a JSON file like `scrape_all`'s.
+
+    Args:
+        lab_names (list[str], optional): Only scrape these labs.
+        concurrency (int): Labs scraped at the same time.
+
+    Returns:
+        dict: Summary messages, all_labs and all_thesis_topics.
+    """
+    lab_links = LAB_LINKS
+    if lab_names is not None:
+        for lab_name in set(lab_names) - set(LAB_LINKS):
+            logger.warning(f"Lab '{lab_name}' is not in config.json, skipping.")
+        lab_links = {name: url for name, url in LAB_LINKS.items() if name in lab_names}
+
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
 
-        # Retrieve function from registry
-        scraper_func = get_scraper_func(lab_name)
-        if not scraper_func:
-            msg = f"No registered function for '{lab_name}', skipping."
-            logger.warning(msg)
-            summary.append(msg)
+    async def scrape_lab(lab_name: str, url: str):
+        async with semaphore:
+            return await _scrape_lab(lab_name, url)
+
+    results = await asyncio.gather(
+        *(scrape_lab(lab_name, url) for lab_name, url in lab_links.items()))
+
+    summary = []
+    all_labs = []
+    all_thesis_topics = []
+    for lab_name, url, message, data in results:
+        summary.append(message)
+        if data is None:
             continue
 
-        # Attempt to scrape
-        try:
-            logger.info(f"Running scraper for '{lab_name}'...")
-            data = await scraper_func(url)
-            logger.info(
-                f"Scraper for '{lab_name}' succeeded, got {len(data)} items."
-            )
-            summary.append(f"{lab_name}: extracted {len(data)} items.")
-
-            # Add lab info to all_labs
-            all_labs.append({"lab_name": lab_name, "lab_url": url})
-
-            # Add thesis topics to all_thesis_topics
-            for item in data:
-                all_thesis_topics.append({
-                    "lab_name": lab_name,
-                    "lab_url": url,
-                    "thesis_title": item.get("title"),
-                    "thesis_url": item.get("link")
-                })
-
-            # Put this lab's data into our dictionary
-            results_by_lab[lab_name] = data
-
-        except Exception as e:
-            logger.exception(f"Error scraping '{lab_name}': {e}")
-            summary.append(f"Error scraping {lab_name}")
+        # Add lab info to all_labs
+        all_labs.append({"lab_name": lab_name, "lab_url": url})
+
+        # Add thesis topics to all_thesis_topics
+        for item in data:
+            all_thesis_topics.append({
+                "lab_name": lab_name,
+                "lab_url": url,
+                "thesis_title": item.get("title"),
+                "thesis_url": item.get("link")
+            })
 
     # ---- After scraping all labs, write the results to a JSON file ----
     output_folder = "scrape_results"
@@ -0,0 +1,71 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_async_read_db
+from database.models import TopicStatus
+from database.async_crud import get_search_rows, search_topics_fulltext, search_topics_trigram
+from database.schemas import SearchResults
+from ..cache import cached_json_response, data_generation
+from ..search import search_index, build_tsquery
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def run_search(db: AsyncSession, q: str, limit: int,
+                     status: Optional[TopicStatus], lab: Optional[list[str]]) -> list[dict]:
+    """
+    Search with Postgres full-text search (falling back to trigram
+    similarity for typos), or with the in-process index on other backends.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        tsquery = build_tsquery(q)
+        results = []
+        if tsquery:
+            results = await search_topics_fulltext(db, tsquery, limit, status, lab)
+        if not results:
+            results = await search_topics_trigram(db, q, limit, status, lab)
+        return results
+
+    await search_index.ensure_loaded(lambda: get_search_rows(db), data_generation.value)
+    return search_index.search(q, limit, status, lab)
+
+
+@router.get("/search", response_model=SearchResults, summary="Search thesis topics by title")
+async def search_topics(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200,
+                   description="Search text; prefixes and small typos match."),
+    status: Optional[TopicStatus] = Query(
+        None, description="Only topics with this status."),
+    lab: Optional[list[str]] = Query(
+        None, description="Only topics of these labs (repeatable)."),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Ranked search over thesis titles with German/English stemming,
+    prefix matching and typo tolerance.
+
+    Args:
+        request (Request): Incoming request, used for caching.
+        q (str): Search text.
+        status (TopicStatus, optional): Topic status filter.
+        lab (list[str], optional): Lab name filter.
+        limit (int): Maximum number of results.
+        db (AsyncSession): Read-only database session dependency.
+
+    Returns:
+        dict: The query and its ranked results.
+    """
+    async def produce():
+        return {"query": q, "results": await run_search(db, q, limit, status, lab)}
+
+    try:
+        return await cached_json_response(request, produce)
+    except Exception as e:
+        logger.exception("Error searching thesis topics.")
+        raise HTTPException(
+            status_code=500, detail="Failed to search thesis topics.")
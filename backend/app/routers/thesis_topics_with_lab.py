@@ -1,25 +1,289 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database.database import get_db
-from database.crud import get_labs_with_topics
+from datetime import datetime
+from typing import Literal, Optional, Union
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import get_async_read_db
+from database.engine import get_async_read_session_factory
+from database.models import TopicStatus
+from database.async_crud import get_labs_with_topics, get_topics_page, stream_topic_rows, get_topic_changes, get_search_rows, get_facet_counts
+from database.schemas import FacetCounts, LabWithTopics, SimilarTopics, TopicChanges, TopicsPage
+from ..cache import cached_json_response, data_generation, serialize_json
+from ..similar import similar_index
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 500
+
+# Rows fetched from the server-side cursor per streamed chunk
+STREAM_BATCH_SIZE = 1000
+
+
+class TopicNotFound(Exception):
+    """
+    The requested topic does not exist or is not open.
+    """
 
-@router.get("/thesis_topics", summary="Get all labs with their thesis topics")
-def fetch_labs_with_topics(db: Session = Depends(get_db)):
+
+@router.get("/thesis_topics", response_model=Union[list[LabWithTopics], TopicsPage],
+            summary="Get all labs with their thesis topics")
+async def fetch_labs_with_topics(
+    request: Request,
+    status: Optional[TopicStatus] = Query(
+        None, description="Only topics with this status."),
+    lab: Optional[list[str]] = Query(
+        None, description="Only topics of these labs (repeatable)."),
+    added_after: Optional[datetime] = Query(
+        None, description="Only topics added after this date."),
+    tag: Optional[list[str]] = Query(
+        None, description="Only topics with any of these tags (repeatable)."),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE,
+        description="Page size; enables keyset pagination."),
+    cursor: Optional[str] = Query(
+        None, description="`next_cursor` of the previous page."),
+    db: AsyncSession = Depends(get_async_read_db),
+):
     """
     Fetch all labs along with their associated thesis topics.
 
+    Without `limit`/`cursor`, returns the full list of labs with their
+    (filtered) topics. With them, returns one page of at most `limit`
+    topics as {"labs": [...], "next_cursor": ...}; pass `next_cursor`
+    back as `cursor` to get the following page.
+
+    Responses are cached per data generation and carry an ETag, so
+    polling clients get `304 Not Modified` until the next sync.
+
     Args:
-        db (Session): Database session dependency.
+        request (Request): Incoming request, used for caching.
+        status (TopicStatus, optional): Topic status filter.
+        lab (list[str], optional): Lab name filter.
+        added_after (datetime, optional): Added-date filter.
+        tag (list[str], optional): Tag filter.
+        limit (int, optional): Page size.
+        cursor (str, optional): Pagination cursor.
+        db (AsyncSession): Read-only database session dependency.
 
     Returns:
-        list: A list of labs with their thesis topics.
+        list | dict: A list of labs with their thesis topics, or one page of them.
     """
+    if limit is None and cursor is None:
+        try:
+            return await cached_json_response(
+                request, lambda: get_labs_with_topics(db, status, lab, added_after, tag))
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail="Failed to fetch labs and topics")
+
     try:
-        labs = get_labs_with_topics(db)
-        return labs
+        return await cached_json_response(request, lambda: get_topics_page(
+            db, limit or MAX_PAGE_SIZE, cursor, status, lab, added_after, tag))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail="Failed to fetch labs and topics")
+
+
+@router.get("/thesis_topics/changes", response_model=TopicChanges,
+            summary="Get thesis topics changed since a cursor")
+async def fetch_topic_changes(
+    request: Request,
+    since: int = Query(
+        0, ge=0, description="`next_cursor` of the previous call; 0 for all changes."),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Fetch the topics inserted, closed or reopened after `since`, so
+    consumers can pull incrementally instead of re-downloading everything.
+    A topic changed several times appears once, with its latest change.
+
+    Args:
+        request (Request): Incoming request, used for caching.
+        since (int): Change cursor.
+        limit (int): Maximum number of changes.
+        db (AsyncSession): Read-only database session dependency.
+
+    Returns:
+        dict: The changes, the cursor for the next call and whether more
+        changes are waiting.
+    """
+    try:
+        return await cached_json_response(request, lambda: get_topic_changes(db, since, limit))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail="Failed to fetch topic changes")
+
+
+@router.get("/thesis_topics/facets", response_model=FacetCounts,
+            summary="Get topic counts per tag, lab and status")
+async def fetch_topic_facets(
+    request: Request,
+    status: Optional[TopicStatus] = Query(
+        None, description="Only topics with this status."),
+    lab: Optional[list[str]] = Query(
+        None, description="Only topics of these labs (repeatable)."),
+    tag: Optional[list[str]] = Query(
+        None, description="Only topics with any of these tags (repeatable)."),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Fetch the number of matching topics and the counts per research-area
+    tag, lab and status, so the frontend can offer filters without
+    downloading the catalog. Each facet is counted under the other
+    facets' filters, not its own.
+
+    Args:
+        request (Request): Incoming request, used for caching.
+        status (TopicStatus, optional): Topic status filter.
+        lab (list[str], optional): Lab name filter.
+        tag (list[str], optional): Tag filter.
+        db (AsyncSession): Read-only database session dependency.
+
+    Returns:
+        dict: Total and the counts per tag, lab and status.
+    """
+    try:
+        return await cached_json_response(request, lambda: get_facet_counts(db, status, lab, tag))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail="Failed to fetch topic facets")
+
+
+@router.get("/thesis_topics/{topic_id}/similar", response_model=SimilarTopics,
+            summary="Get topics similar to a thesis topic")
+async def fetch_similar_topics(
+    request: Request,
+    topic_id: int,
+    limit: int = Query(10, ge=1, le=20),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Fetch the open topics, across all labs, whose titles are most similar
+    to this topic's (TF-IDF cosine similarity). Neighbour lists are
+    precomputed by the sync, so this is a lookup.
+
+    Args:
+        request (Request): Incoming request, used for caching.
+        topic_id (int): ID of an open topic.
+        limit (int): Maximum number of similar topics.
+        db (AsyncSession): Read-only database session dependency.
+
+    Returns:
+        dict: The topic ID and its similar topics with their scores.
+    """
+    async def produce():
+        # Only builds after a restart or a change from another process;
+        # this process's syncs keep the index current
+        await similar_index.refresh(lambda: get_search_rows(db), data_generation.value)
+        similar = similar_index.similar(topic_id, limit)
+        if similar is None:
+            raise TopicNotFound(topic_id)
+        return {"topic_id": topic_id, "similar": similar}
+
+    try:
+        return await cached_json_response(request, produce)
+    except TopicNotFound:
+        raise HTTPException(
+            status_code=404, detail="Topic not found or not open.")
+    except Exception as e:
+        logger.exception("Error fetching similar topics.")
+        raise HTTPException(
+            status_code=500, detail="Failed to fetch similar topics")
+
+
+def _topic_line(row) -> dict:
+    lab_id, lab_name, lab_url, topic_id, title, status, url = row
+    return {
+        "lab_name": lab_name,
+        "lab_url": lab_url,
+        "topic_id": topic_id,
+        "title": title,
+        "status": status.value,
+        "url": url,
+    }
+
+
+async def _ndjson_chunks(status, lab, added_after, tag):
+    """
+    One JSON object per topic and line, written batch by batch as rows
+    arrive from the cursor.
+    """
+    async with get_async_read_session_factory()() as db:
+        async for rows in stream_topic_rows(db, STREAM_BATCH_SIZE, status, lab, added_after,
+                                            tags=tag):
+            yield b"".join(
+                serialize_json(_topic_line(row)) + b"\n" for row in rows)
+
+
+async def _json_array_chunks(status, lab, added_after, tag):
+    """
+    The same nested list of labs as /api/thesis_topics, written lab by
+    lab as chunks of one JSON array.
+    """
+    async with get_async_read_session_factory()() as db:
+        yield b"["
+        current_lab_id = None
+        current_lab = None
+        first = True
+        async for rows in stream_topic_rows(db, STREAM_BATCH_SIZE, status, lab, added_after,
+                                            include_empty_labs=True, tags=tag):
+            chunk = []
+            for lab_id, lab_name, lab_url, topic_id, title, topic_status, url in rows:
+                if lab_id != current_lab_id:
+                    if current_lab is not None:
+                        chunk.append((b"" if first else b",") + serialize_json(current_lab))
+                        first = False
+                    current_lab_id = lab_id
+                    current_lab = {"lab_name": lab_name,
+                                   "lab_url": lab_url, "topics": []}
+                if topic_id is not None:
+                    current_lab["topics"].append(
+                        {"title": title, "status": topic_status.value, "url": url})
+            if chunk:
+                yield b"".join(chunk)
+        if current_lab is not None:
+            yield (b"" if first else b",") + serialize_json(current_lab)
+        yield b"]"
+
+
+@router.get("/thesis_topics/stream", summary="Stream labs with their thesis topics")
+async def stream_labs_with_topics(
+    format: Literal["ndjson", "json"] = Query(
+        "ndjson", description="`ndjson`: one topic per line; `json`: chunked array of labs."),
+    status: Optional[TopicStatus] = Query(
+        None, description="Only topics with this status."),
+    lab: Optional[list[str]] = Query(
+        None, description="Only topics of these labs (repeatable)."),
+    added_after: Optional[datetime] = Query(
+        None, description="Only topics added after this date."),
+    tag: Optional[list[str]] = Query(
+        None, description="Only topics with any of these tags (repeatable)."),
+):
+    """
+    Stream the topic listing straight from a server-side cursor, keeping
+    memory flat and time-to-first-byte short however large the catalog is.
+
+    The session is opened inside the stream rather than as a dependency,
+    since it has to stay open until the last row is written.
+
+    Args:
+        format (str): `ndjson` (default) or `json`.
+        status (TopicStatus, optional): Topic status filter.
+        lab (list[str], optional): Lab name filter.
+        added_after (datetime, optional): Added-date filter.
+        tag (list[str], optional): Tag filter.
+
+    Returns:
+        StreamingResponse: The streamed listing.
+    """
+    if format == "json":
+        return StreamingResponse(
+            _json_array_chunks(status, lab, added_after, tag), media_type="application/json")
+    return StreamingResponse(
+        _ndjson_chunks(status, lab, added_after, tag), media_type="application/x-ndjson")
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from ..config import (
+    ROBOTS_TXT_ENABLED,
+    ROBOTS_TXT_TTL,
+    ROBOTS_USER_AGENT,
+    SCRAPE_HOST_CONCURRENCY,
+    SCRAPE_HOST_DELAY,
+    SCRAPE_MAX_CRAWL_DELAY,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _HostState:
+    def __init__(self, concurrency: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.pacing = asyncio.Lock()
+        self.next_start = 0.0
+
+
+class HostScheduler:
+    """
+    Politeness for outbound fetches, per host: at most `concurrency`
+    requests in flight, and request starts spaced by the larger of
+    `min_delay` and the host's robots.txt Crawl-delay (capped at
+    `max_crawl_delay`). Different hosts do not wait for each other.
+
+    robots.txt files are fetched once per host and cached for
+    `robots_ttl` seconds; a missing or unreadable file means no delay.
+    """
+
+    def __init__(self, concurrency: int = SCRAPE_HOST_CONCURRENCY,
+                 min_delay: float = SCRAPE_HOST_DELAY,
+                 robots_ttl: float = ROBOTS_TXT_TTL,
+                 max_crawl_delay: float = SCRAPE_MAX_CRAWL_DELAY,
+                 user_agent: str = ROBOTS_USER_AGENT,
+                 use_robots: bool = ROBOTS_TXT_ENABLED):
+        self.concurrency = max(concurrency, 1)
+        self.min_delay = min_delay
+        self.robots_ttl = robots_ttl
+        self.max_crawl_delay = max_crawl_delay
+        self.user_agent = user_agent
+        self.use_robots = use_robots
+        self._hosts: dict[str, _HostState] = {}
+        # Host to (expiry, crawl-delay future); the future is shared by
+        # concurrent lookups, so each robots.txt is fetched once
+        self._robots: dict[str, tuple[float, asyncio.Future]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self):
+        # Semaphores, locks and futures belong to one event loop; start
+        # over when used from another (e.g. consecutive asyncio.run calls)
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._hosts.clear()
+            self._robots.clear()
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """
+        Wait for the URL's host to accept another request and hold the
+        slot while the request runs.
+        """
+        self._bind_loop()
+        host = urlsplit(url).netloc.lower()
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.concurrency)
+        delay = max(self.min_delay, await self.crawl_delay(url))
+
+        async with state.semaphore:
+            async with state.pacing:
+                wait = state.next_start - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                state.next_start = time.monotonic() + delay
+            yield
+
+    async def crawl_delay(self, url: str) -> float:
+        """
+        Crawl-delay of the URL's host from its (cached) robots.txt.
+        """
+        if not self.use_robots:
+            return 0.0
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        cached = self._robots.get(host)
+        if cached is None or cached[0] < time.monotonic():
+            future = asyncio.ensure_future(asyncio.to_thread(
+                self._fetch_crawl_delay, f"{parts.scheme}://{parts.netloc}/robots.txt"))
+            cached = self._robots[host] = (time.monotonic() + self.robots_ttl, future)
+        return await asyncio.shield(cached[1])
+
+    def _fetch_crawl_delay(self, robots_url: str) -> float:
+        try:
+            response = requests.get(robots_url, timeout=5)
+        except Exception as exc:
+            logger.warning(f"Could not fetch {robots_url}: {exc}")
+            return 0.0
+        if response.status_code >= 400:
+            return 0.0
+
+        parser = RobotFileParser(robots_url)
+        parser.parse(response.text.splitlines())
+        parser.modified()  # crawl_delay() ignores files never marked as read
+        delay = parser.crawl_delay(self.user_agent)
+        if delay is None:
+            rate = parser.request_rate(self.user_agent)
+            delay = rate.seconds / rate.requests if rate and rate.requests else None
+        if delay is None:
+            return 0.0
+        delay = float(delay)
+        if delay > self.max_crawl_delay:
+            logger.warning(
+                f"{robots_url} asks for a {delay:g} s crawl delay; using {self.max_crawl_delay:g} s.")
+            delay = self.max_crawl_delay
+        logger.info(f"Crawl delay for {robots_url}: {delay:g} s")
+        return delay
+
+
+host_scheduler = HostScheduler()
+
+
+@asynccontextmanager
+async def polite_fetch(url: str, scheduler: Optional[HostScheduler] = None):
+    """
+    Hold a politeness slot for a request to `url` (see HostScheduler).
+    """
+    async with (scheduler or host_scheduler).slot(url):
+        yield
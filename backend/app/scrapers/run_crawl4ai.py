@@ -3,6 +3,8 @@ import asyncio
 from crawl4ai import AsyncWebCrawler, CacheMode
 from playwright.sync_api import sync_playwright
 
+from .politeness import polite_fetch
+
 
 async def run_crawl4ai(url: str, verbose: bool = False):
     """
@@ -11,9 +13,12 @@ async def run_crawl4ai(url: str, verbose: bool = False):
       - result.markdown_v2.raw_markdown
       - result.html_v2
       - etc.
+
+    Waits for a politeness slot for the URL's host first.
     """
-    async with AsyncWebCrawler(verbose=verbose) as crawler:
-        result = await crawler.arun(url=url, cach_mode=CacheMode.ENABLED)
+    async with polite_fetch(url):
+        async with AsyncWebCrawler(verbose=verbose) as crawler:
+            result = await crawler.arun(url=url, cach_mode=CacheMode.ENABLED)
     return result
 
 
@@ -0,0 +1,333 @@
+import asyncio
+import bisect
+import functools
+import heapq
+import logging
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Optional
+
+import snowballstemmer
+
+from .cache import data_generation
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Scoring weights of exact, prefix and fuzzy (typo) term matches
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.7
+FUZZY_WEIGHT = 0.5
+
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 4
+FUZZY_THRESHOLD = 0.3
+MAX_EXPANSIONS = 20
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Function words that would only produce huge posting lists
+STOPWORDS = frozenset("""
+a an and as at by for from in into of on or the to using with via
+der die das den dem des ein eine einer eines einem und oder fur mit von
+zu zur zum im in am an auf aus bei durch uber unter
+""".split())
+
+_english = snowballstemmer.stemmer("english")
+_german = snowballstemmer.stemmer("german")
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase and strip diacritics, so "Prüfung" and "Prufung" index to
+    the same term.
+    """
+    text = text.lower().replace("ß", "ss")
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_PATTERN.findall(fold(text or ""))
+            if token not in STOPWORDS]
+
+
+@functools.lru_cache(maxsize=200_000)
+def stems(token: str) -> frozenset[str]:
+    """
+    English and German stems of a folded token; titles mix both languages.
+    """
+    return frozenset((_english.stemWord(token), _german.stemWord(token)))
+
+
+def index_terms(text: str) -> list[str]:
+    """
+    Terms indexed for a title: every folded token plus its stems.
+    """
+    terms = []
+    for token in tokenize(text):
+        terms.append(token)
+        terms.extend(stems(token) - {token})
+    return terms
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    In-process inverted index over topic titles with BM25 ranking, prefix
+    expansion over a sorted vocabulary and trigram fuzzy matching for typos.
+    Built from the database and updated incrementally by the sync; rebuilt
+    when another process changed the data.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        # Data generation the index reflects
+        self.generation: Optional[int] = None
+        self._lock = asyncio.Lock()
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._doc_terms: dict[int, list[str]] = {}
+        self._doc_length: dict[int, int] = {}
+        self._docs: dict[int, dict] = {}
+        self._vocabulary: list[str] = []
+        self._trigrams: dict[str, set[str]] = defaultdict(set)
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def clear(self):
+        self.loaded = False
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_length.clear()
+        self._docs.clear()
+        self._vocabulary.clear()
+        self._trigrams.clear()
+        self._total_length = 0
+
+    async def ensure_loaded(self, load_rows, generation: int):
+        """
+        Build the index from `load_rows()` (an awaitable returning
+        (topic_id, title, url, status, lab_name) rows) unless it is already
+        built for data `generation`.
+        """
+        if self.loaded and self.generation == generation:
+            return
+        async with self._lock:
+            if self.loaded and self.generation == generation:
+                return
+            rows = await load_rows()
+            # Replaced without yielding, so searches never see a partial index
+            self.clear()
+            for topic_id, title, url, status, lab_name in rows:
+                self.add(topic_id, title, url, status, lab_name)
+            self.loaded = True
+            self.generation = generation
+            logger.info(f"Search index built with {len(self._docs)} topics.")
+
+    def follow_generation(self, previous: int, generation: int, own: bool):
+        """
+        Data generation listener. The sync hooks apply this process's own
+        changes, so the index stays current through those; changes from
+        other processes leave it outdated until the next rebuild.
+        """
+        if own and self.generation == previous:
+            self.generation = generation
+
+    def _add_term(self, term: str):
+        self._vocabulary.insert(bisect.bisect_left(self._vocabulary, term), term)
+        for gram in trigrams(term):
+            self._trigrams[gram].add(term)
+
+    def _remove_term(self, term: str):
+        position = bisect.bisect_left(self._vocabulary, term)
+        if position < len(self._vocabulary) and self._vocabulary[position] == term:
+            del self._vocabulary[position]
+        for gram in trigrams(term):
+            self._trigrams[gram].discard(term)
+
+    def add(self, topic_id: int, title: str, url: str, status, lab_name: str):
+        if topic_id in self._docs:
+            self.remove(topic_id)
+        terms = index_terms(title)
+        for term in terms:
+            postings = self._postings[term]
+            if not postings:
+                self._add_term(term)
+            postings[topic_id] = postings.get(topic_id, 0) + 1
+        self._doc_terms[topic_id] = terms
+        self._doc_length[topic_id] = len(terms)
+        self._total_length += len(terms)
+        self._docs[topic_id] = {
+            "topic_id": topic_id,
+            "title": title,
+            "url": url,
+            "status": status,
+            "lab_name": lab_name,
+        }
+
+    def remove(self, topic_id: int):
+        terms = self._doc_terms.pop(topic_id, None)
+        if terms is None:
+            return
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(topic_id, None)
+            if not postings:
+                del self._postings[term]
+                self._remove_term(term)
+        self._total_length -= self._doc_length.pop(topic_id)
+        del self._docs[topic_id]
+
+    def set_status(self, topic_id: int, status):
+        if topic_id in self._docs:
+            self._docs[topic_id]["status"] = status
+
+    def _prefix_terms(self, token: str) -> list[str]:
+        start = bisect.bisect_left(self._vocabulary, token)
+        matches = []
+        for term in self._vocabulary[start:start + MAX_EXPANSIONS + 1]:
+            if not term.startswith(token):
+                break
+            if term != token:
+                matches.append(term)
+        return matches[:MAX_EXPANSIONS]
+
+    def _fuzzy_terms(self, token: str) -> list[tuple[str, float]]:
+        token_grams = trigrams(token)
+        overlap: dict[str, int] = defaultdict(int)
+        for gram in token_grams:
+            for term in self._trigrams.get(gram, ()):
+                overlap[term] += 1
+        candidates = []
+        for term, shared in overlap.items():
+            similarity = shared / \
+                (len(token_grams) + len(trigrams(term)) - shared)
+            if similarity >= FUZZY_THRESHOLD and term != token:
+                candidates.append((term, similarity))
+        candidates.sort(key=lambda c: c[1], reverse=True)
+        return candidates[:MAX_EXPANSIONS]
+
+    def _expand(self, token: str) -> dict[str, float]:
+        """
+        Map a query token to weighted index terms: its exact forms and
+        stems, vocabulary terms it is a prefix of and, when none of those
+        exist, close spellings by trigram similarity.
+        """
+        expansions = {}
+        for term in {token} | stems(token):
+            if term in self._postings:
+                expansions[term] = EXACT_WEIGHT
+        if len(token) >= MIN_PREFIX_LENGTH:
+            for term in self._prefix_terms(token):
+                expansions.setdefault(term, PREFIX_WEIGHT)
+        if not expansions and len(token) >= MIN_FUZZY_LENGTH:
+            for term, similarity in self._fuzzy_terms(token):
+                expansions[term] = FUZZY_WEIGHT * similarity
+        return expansions
+
+    def search(self, query: str, limit: int = 20,
+               status=None, lab_names: Optional[list[str]] = None) -> list[dict]:
+        """
+        Rank topics against `query` with BM25 over the expanded terms.
+        """
+        tokens = tokenize(query)
+        if not tokens or not self._docs:
+            return []
+
+        doc_count = len(self._docs)
+        average_length = self._total_length / doc_count
+        scores: dict[int, float] = defaultdict(float)
+
+        doc_length = self._doc_length
+        length_scale = BM25_K1 * BM25_B / average_length
+        length_base = BM25_K1 * (1 - BM25_B)
+
+        for token in tokens:
+            token_scores: dict[int, float] = {}
+            for term, weight in self._expand(token).items():
+                postings = self._postings[term]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) /
+                               (len(postings) + 0.5))
+                term_weight = weight * idf * (BM25_K1 + 1)
+                for topic_id, frequency in postings.items():
+                    score = term_weight * frequency / \
+                        (frequency + length_base + length_scale * doc_length[topic_id])
+                    # A token counts once per topic, with its best match
+                    if score > token_scores.get(topic_id, 0):
+                        token_scores[topic_id] = score
+            for topic_id, score in token_scores.items():
+                scores[topic_id] += score
+
+        if status is None and not lab_names:
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda s: s[1])
+        else:
+            ranked = sorted(scores.items(), key=lambda s: s[1], reverse=True)
+
+        results = []
+        for topic_id, score in ranked:
+            doc = self._docs[topic_id]
+            if status is not None and doc["status"] != status:
+                continue
+            if lab_names and doc["lab_name"] not in lab_names:
+                continue
+            results.append({**doc, "score": round(score, 4)})
+            if len(results) >= limit:
+                break
+        return results
+
+
+search_index = SearchIndex()
+data_generation.subscribe(search_index.follow_generation)
+
+
+def index_new_topic(topic, lab_name: str):
+    """
+    Sync hook: add a freshly inserted topic to the index, if it is built.
+    """
+    if search_index.loaded:
+        search_index.add(topic.topic_id, topic.mt_title,
+                         topic.mt_url, topic.status, lab_name)
+
+
+def index_status_change(topic):
+    """
+    Sync hook: record a closed or reopened topic, if the index is built.
+    """
+    if search_index.loaded:
+        search_index.set_status(topic.topic_id, topic.status)
+
+
+def index_rename(topic, lab_name: str):
+    """
+    Sync hook: re-index a renamed topic under its new title, if the index
+    is built.
+    """
+    if search_index.loaded:
+        search_index.remove(topic.topic_id)
+        search_index.add(topic.topic_id, topic.mt_title,
+                         topic.mt_url, topic.status, lab_name)
+
+
+def build_tsquery(query: str) -> Optional[str]:
+    """
+    Turn free text into a prefix-matching tsquery string ("tok:* & tok:*")
+    for the Postgres full-text search. Tokens are not folded, since the
+    tsvector side is not unaccented either.
+    """
+    tokens = TOKEN_PATTERN.findall((query or "").lower())
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
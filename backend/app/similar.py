@@ -0,0 +1,398 @@
+import asyncio
+import logging
+import math
+from collections import Counter, defaultdict
+from typing import Optional
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from database.models import TopicStatus
+from .cache import data_generation
+from .search import tokenize, stems
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per topic; more than are served, so topics closed since
+# the last build can be skipped without running short
+STORED_NEIGHBOURS = 20
+MIN_SIMILARITY = 0.1
+
+# Terms in more than this share of topics carry little signal but make
+# the pairwise work grow quadratically; they are left out of the vectors
+MAX_DF_RATIO = 0.02
+MIN_DOCS_FOR_MAX_DF = 1000
+
+# Upper bound on (topic, candidate) contributions scored per build block
+BLOCK_CONTRIBUTIONS = 4_000_000
+
+# Rebuild from scratch (fresh IDF weights) once this share of topics was
+# added or removed incrementally
+REBUILD_RATIO = 0.2
+
+_EMPTY_TERMS = np.zeros(0, dtype=np.int64)
+_EMPTY_WEIGHTS = np.zeros(0, dtype=np.float32)
+
+
+def similarity_terms(title: str) -> list[str]:
+    """
+    Stems of a title's folded tokens; unlike the search index the tokens
+    themselves are not added, so one word counts once.
+    """
+    terms = []
+    for token in tokenize(title):
+        terms.extend(stems(token))
+    return terms
+
+
+def _expand(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Concatenation of the index ranges [start, start + count).
+    """
+    total = int(counts.sum())
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(total, dtype=np.int64)
+
+
+def _top_per_row(rows: np.ndarray, columns: np.ndarray, scores: np.ndarray, k: int):
+    """
+    The k best (column, score) entries of every row, best first, as three
+    arrays sorted by row.
+    """
+    # One float key orders by row, then by descending score (scores are
+    # cosine similarities in [0, 1]); much faster than a two-key lexsort
+    order = np.argsort(rows + (1 - scores) * 0.5)
+    rows, columns, scores = rows[order], columns[order], scores[order]
+    if len(rows) == 0:
+        return rows, columns, scores
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    counts = np.diff(np.r_[starts, len(rows)])
+    rank = np.arange(len(rows)) - np.repeat(starts, counts)
+    keep = rank < k
+    return rows[keep], columns[keep], scores[keep]
+
+
+class SimilarityIndex:
+    """
+    Precomputed "topics like this one" lists over open topics, from
+    L2-normalized TF-IDF vectors of the title stems.
+
+    A full build scores all pairs of topics sharing a term with vectorized
+    sparse products over a term-major (CSC) layout of the vectors, block by
+    block. Topics the sync adds afterwards are vectorized with the existing
+    IDF weights and merged into the neighbour lists incrementally; closed
+    topics are skipped when the lists are read. Requests only look lists up.
+
+    Neighbour lists hold positions rather than topic IDs. A renamed or
+    reopened topic is added again at a new position, so the entries
+    scored for its old title point at a dead position and are skipped too.
+    """
+
+    def __init__(self):
+        self.loaded = False
+        # Data generation the index reflects
+        self.generation: Optional[int] = None
+        self._lock = asyncio.Lock()
+        # Changes applied while a build is in flight, replayed onto the new
+        # index before it replaces this one (None when no build runs)
+        self._pending: Optional[list[tuple]] = None
+        self._clear()
+
+    def _clear(self):
+        self._term_ids: dict[str, int] = {}
+        self._idf = _EMPTY_WEIGHTS
+        self._positions: dict[int, int] = {}
+        self._topic_ids: list[int] = []
+        self._active = np.zeros(0, dtype=bool)
+        # Weight of each position's worst stored neighbour (0 while its
+        # list is not full), to find lists a new topic enters
+        self._worst = _EMPTY_WEIGHTS
+        self._docs: dict[int, dict] = {}
+        # Term-major postings from the last build, plus lists for topics
+        # added incrementally since
+        self._post_bounds = np.zeros(1, dtype=np.int64)
+        self._post_positions = _EMPTY_TERMS
+        self._post_weights = _EMPTY_WEIGHTS
+        self._added_postings: dict[int, list[tuple[int, float]]] = defaultdict(list)
+        # Topic ID to its (score, position) neighbours, best first
+        self._neighbours: dict[int, list[tuple[float, int]]] = {}
+        self._changes_since_build = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def clear(self):
+        self.loaded = False
+        self._clear()
+
+    @property
+    def stale(self) -> bool:
+        return self._changes_since_build > REBUILD_RATIO * max(len(self._docs), 1)
+
+    def _is_current(self, generation: int) -> bool:
+        return self.loaded and not self.stale and self.generation == generation
+
+    async def refresh(self, load_rows, generation: int, force: bool = False):
+        """
+        Build the index from `load_rows()` (an awaitable returning
+        (topic_id, title, url, status, lab_name) rows) if it is not built
+        yet, is stale, was built for an older data `generation`, or `force`
+        is set. The computation runs in a worker thread.
+        """
+        if not force and self._is_current(generation):
+            return
+        async with self._lock:
+            if not force and self._is_current(generation):
+                return
+            # The rows may predate changes the sync applies while the build
+            # runs (before the index is loaded those are not even kept), so
+            # record them from now on
+            self._pending = []
+            try:
+                rows = await load_rows()
+                # Built off to the side, so requests keep reading the current
+                # index until the new one is complete
+                built = SimilarityIndex()
+                await run_in_threadpool(built._build, rows)
+                for change in self._pending:
+                    built.apply_change(*change)
+                built.generation = generation
+                self._adopt(built)
+            finally:
+                self._pending = None
+
+    def _adopt(self, built: "SimilarityIndex"):
+        # One dict update on the event loop thread: readers see either the
+        # old index or the new one, never a mix
+        vars(self).update({name: value for name, value in vars(built).items()
+                           if name not in ("_lock", "_pending")})
+
+    def follow_generation(self, previous: int, generation: int, own: bool):
+        """
+        Data generation listener, as `SearchIndex.follow_generation`.
+        """
+        if own and self.generation == previous:
+            self.generation = generation
+
+    def apply_change(self, topic_id: int, title: str, url: str, status, lab_name: Optional[str]):
+        """
+        Add an open topic (again, if it was renamed or reopened) or remove
+        a closed one; also recorded for a build in flight.
+        """
+        if self._pending is not None:
+            self._pending.append((topic_id, title, url, status, lab_name))
+        if not self.loaded:
+            return
+        if status == TopicStatus.OPEN:
+            self.add(topic_id, title, url, status, lab_name)
+        else:
+            self.remove(topic_id)
+
+    def _vector(self, terms: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        counts = Counter(term_id for term_id in map(self._term_ids.get, terms)
+                         if term_id is not None)
+        if not counts:
+            return _EMPTY_TERMS, _EMPTY_WEIGHTS
+        term_ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        weights = tf * self._idf[term_ids]
+        return term_ids, (weights / np.linalg.norm(weights)).astype(np.float32)
+
+    def _doc(self, topic_id, title, url, status, lab_name) -> dict:
+        return {
+            "topic_id": topic_id,
+            "title": title,
+            "url": url,
+            "status": status,
+            "lab_name": lab_name,
+        }
+
+    def _build(self, rows):
+        docs = [row for row in rows if row[3] == TopicStatus.OPEN]
+        terms_per_doc = [similarity_terms(row[1]) for row in docs]
+        n = len(docs)
+        self._clear()
+
+        # Vocabulary and IDF
+        df = Counter(term for terms in terms_per_doc for term in set(terms))
+        max_df = MAX_DF_RATIO * n if n >= MIN_DOCS_FOR_MAX_DF else n
+        vocabulary = sorted(term for term, count in df.items() if count <= max_df)
+        self._term_ids = {term: i for i, term in enumerate(vocabulary)}
+        self._idf = np.array(
+            [math.log((1 + n) / (1 + df[term])) + 1 for term in vocabulary], dtype=np.float32)
+
+        # Row-major (CSR) vectors
+        vectors = [self._vector(terms) for terms in terms_per_doc]
+        for position, row in enumerate(docs):
+            self._positions[row[0]] = position
+            self._topic_ids.append(row[0])
+            self._docs[row[0]] = self._doc(*row)
+        self._active = np.ones(n, dtype=bool)
+        self._worst = np.zeros(n, dtype=np.float32)
+        self._neighbours = {topic_id: [] for topic_id in self._topic_ids}
+        lengths = np.array([len(t) for t, _ in vectors], dtype=np.int64)
+        row_bounds = np.r_[0, np.cumsum(lengths)]
+        row_terms = np.concatenate([t for t, _ in vectors] or [_EMPTY_TERMS])
+        row_weights = np.concatenate([w for _, w in vectors] or [_EMPTY_WEIGHTS])
+        row_positions = np.repeat(np.arange(n, dtype=np.int64), lengths)
+
+        # Term-major (CSC) postings
+        order = np.argsort(row_terms, kind="stable")
+        self._post_bounds = np.searchsorted(
+            row_terms[order], np.arange(len(vocabulary) + 1))
+        self._post_positions = row_positions[order]
+        self._post_weights = row_weights[order]
+
+        # Score blocks of rows against all topics sharing a term
+        work = np.r_[0, np.cumsum(np.diff(self._post_bounds)[row_terms])]
+        work_per_row = work[row_bounds[1:]] - work[row_bounds[:-1]]
+        start = 0
+        while start < n:
+            end = start + 1
+            budget = work_per_row[start]
+            while end < n and budget + work_per_row[end] <= BLOCK_CONTRIBUTIONS:
+                budget += work_per_row[end]
+                end += 1
+            self._score_block(row_bounds[start], row_bounds[end], row_positions,
+                              row_terms, row_weights)
+            start = end
+
+        self.loaded = True
+        logger.info(f"Similarity index built with {n} open topics.")
+
+    def _score_block(self, entry_start: int, entry_end: int, row_positions: np.ndarray,
+                     row_terms: np.ndarray, row_weights: np.ndarray):
+        entries = slice(entry_start, entry_end)
+        terms = row_terms[entries]
+        counts = np.diff(self._post_bounds)[terms]
+        index = _expand(self._post_bounds[terms], counts)
+        rows = np.repeat(row_positions[entries], counts)
+        columns = self._post_positions[index]
+        contributions = self._post_weights[index] * np.repeat(row_weights[entries], counts)
+
+        n = len(self._topic_ids)
+        keys, inverse = np.unique(rows * n + columns, return_inverse=True)
+        scores = np.bincount(inverse, weights=contributions)
+        rows, columns = keys // n, keys % n
+        keep = (rows != columns) & (scores >= MIN_SIMILARITY)
+        rows, columns, scores = _top_per_row(
+            rows[keep], columns[keep], scores[keep], STORED_NEIGHBOURS)
+
+        topic_ids = self._topic_ids
+        for row, column, score in zip(rows.tolist(), columns.tolist(), scores.tolist()):
+            self._neighbours[topic_ids[row]].append((round(score, 4), column))
+        for row in np.unique(rows).tolist():
+            neighbours = self._neighbours[topic_ids[row]]
+            if len(neighbours) == STORED_NEIGHBOURS:
+                self._worst[row] = neighbours[-1][0]
+
+    def _scores(self, term_ids: np.ndarray, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Cosine similarity of one vector with every active topic sharing a
+        term: (positions, scores).
+        """
+        counts = np.diff(self._post_bounds)[term_ids]
+        index = _expand(self._post_bounds[term_ids], counts)
+        positions = [self._post_positions[index]]
+        contributions = [self._post_weights[index] * np.repeat(weights, counts)]
+        for term_id, weight in zip(term_ids.tolist(), weights.tolist()):
+            added = self._added_postings.get(term_id)
+            if added:
+                positions.append(np.array([p for p, _ in added], dtype=np.int64))
+                contributions.append(
+                    np.array([w for _, w in added], dtype=np.float32) * weight)
+        candidates, inverse = np.unique(np.concatenate(positions), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions))
+        active = self._active[candidates]
+        return candidates[active], scores[active]
+
+    def add(self, topic_id: int, title: str, url: str, status, lab_name: str):
+        """
+        Add an open topic with the current IDF weights and merge it into
+        the neighbour lists of the topics it is similar to.
+        """
+        if not self.loaded:
+            return
+        if topic_id in self._docs:
+            self.remove(topic_id)
+        position = len(self._topic_ids)
+        if position == len(self._active):
+            # Grow by doubling so repeated adds stay amortized O(1)
+            extra = max(position, 16)
+            self._active = np.r_[self._active, np.zeros(extra, dtype=bool)]
+            self._worst = np.r_[self._worst, np.zeros(extra, dtype=np.float32)]
+        self._positions[topic_id] = position
+        self._topic_ids.append(topic_id)
+        self._active[position] = True
+        self._docs[topic_id] = self._doc(topic_id, title, url, status, lab_name)
+
+        term_ids, weights = self._vector(similarity_terms(title))
+        candidates, scores = self._scores(term_ids, weights)
+        keep = scores >= MIN_SIMILARITY
+        candidates, scores = candidates[keep], scores[keep]
+        _, columns, best = _top_per_row(
+            np.zeros(len(candidates), dtype=np.int64), candidates, scores, STORED_NEIGHBOURS)
+        self._neighbours[topic_id] = [
+            (round(score, 4), column) for column, score in zip(columns.tolist(), best.tolist())]
+        if len(best) == STORED_NEIGHBOURS:
+            self._worst[position] = best[-1]
+        for term_id, weight in zip(term_ids.tolist(), weights.tolist()):
+            self._added_postings[term_id].append((position, weight))
+
+        # Enter the lists of topics the new one beats the worst neighbour of
+        entering = scores > self._worst[candidates]
+        for candidate, score in zip(candidates[entering].tolist(), scores[entering].tolist()):
+            neighbours = self._neighbours.get(self._topic_ids[candidate])
+            if neighbours is None:
+                continue
+            # Drop dead entries (closed topics, old titles) on the way
+            neighbours[:] = [item for item in neighbours if self._active[item[1]]]
+            neighbours.append((round(score, 4), position))
+            neighbours.sort(key=lambda item: -item[0])
+            del neighbours[STORED_NEIGHBOURS:]
+            self._worst[candidate] = (
+                neighbours[-1][0] if len(neighbours) == STORED_NEIGHBOURS else 0)
+        self._changes_since_build += 1
+
+    def remove(self, topic_id: int):
+        """
+        Drop a topic that was closed or renamed; lists that mention it skip
+        its (now inactive) position when read.
+        """
+        position = self._positions.pop(topic_id, None)
+        if position is None:
+            return
+        self._active[position] = False
+        self._docs.pop(topic_id, None)
+        self._neighbours.pop(topic_id, None)
+        self._changes_since_build += 1
+
+    def similar(self, topic_id: int, limit: int = 10) -> Optional[list[dict]]:
+        """
+        The most similar open topics, or None if `topic_id` is not an
+        indexed (open) topic.
+        """
+        neighbours = self._neighbours.get(topic_id)
+        if neighbours is None:
+            return None
+        results = []
+        for score, position in neighbours:
+            if not self._active[position]:
+                continue
+            results.append({**self._docs[self._topic_ids[position]], "score": score})
+            if len(results) == limit:
+                break
+        return results
+
+
+similar_index = SimilarityIndex()
+data_generation.subscribe(similar_index.follow_generation)
+
+
+def similar_topic_changed(topic, lab_name: Optional[str] = None):
+    """
+    Sync hook: keep an inserted, reopened, renamed or closed topic's
+    neighbour lists current, if the index is built or being built.
+    """
+    similar_index.apply_change(topic.topic_id, topic.mt_title,
+                               topic.mt_url, topic.status, lab_name)
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls per key: while a run for a key is in
+    progress, further callers wait for it and get its result (or its
+    exception) instead of starting another run.
+
+    The run is a task of its own, so a caller that disconnects does not
+    cancel it for the others.
+    """
+
+    def __init__(self):
+        self._runs: dict[str, asyncio.Future] = {}
+
+    def in_progress(self, key: str) -> bool:
+        return key in self._runs
+
+    async def run(self, key: str, func: Callable[[], Awaitable]):
+        future = self._runs.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._runs[key] = future
+            future.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            logger.info(f"Joining the {key} already in progress.")
+        return await asyncio.shield(future)
+
+    def _finished(self, key: str, future: asyncio.Future):
+        if self._runs.get(key) is future:
+            del self._runs[key]
+        # Mark the exception as retrieved even if every caller went away
+        if not future.cancelled():
+            future.exception()
+
+
+single_flight = SingleFlight()
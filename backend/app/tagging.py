@@ -0,0 +1,136 @@
+import logging
+
+import numpy as np
+
+from .search import stems, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Research-area tags and the English/German keywords (single words or
+# phrases) that assign them. Keywords are folded and stemmed like titles,
+# so "Robots", "Roboter" and "robotic" all match "robot"; a phrase matches
+# when all of its words occur in the title.
+TAG_KEYWORDS = {
+    "machine-learning": [
+        "machine learning", "deep learning", "neural network", "reinforcement learning",
+        "maschinelles lernen", "neuronale netze", "artificial intelligence",
+        "kunstliche intelligenz", "ml", "ai", "ki", "llm", "language model",
+        "transformer", "classification", "klassifikation",
+    ],
+    "computer-vision": [
+        "computer vision", "image", "images", "bild", "bilder", "object detection",
+        "segmentation", "segmentierung", "camera", "kamera", "point cloud",
+    ],
+    "robotics": [
+        "robot", "robotics", "roboter", "robotik", "manipulator", "grasping",
+        "humanoid", "drone", "drohne", "uav", "mobile robot",
+    ],
+    "control": [
+        "control", "controller", "regelung", "regler", "steuerung", "mpc",
+        "model predictive", "kalman", "optimal control", "trajectory", "trajektorie",
+    ],
+    "materials": [
+        "material", "materials", "werkstoff", "werkstoffe", "composite", "alloy",
+        "legierung", "polymer", "ceramic", "keramik", "fatigue", "additive manufacturing",
+    ],
+    "energy": [
+        "energy", "energie", "battery", "batterie", "solar", "photovoltaic",
+        "photovoltaik", "wind", "hydrogen", "wasserstoff", "fuel cell",
+        "brennstoffzelle", "power grid", "stromnetz",
+    ],
+    "simulation": [
+        "simulation", "simulationen", "finite element", "fem", "cfd",
+        "numerical", "numerische", "modellierung",
+    ],
+    "medical": [
+        "medical", "medizin", "medizinische", "clinical", "klinische", "health",
+        "gesundheit", "patient", "patienten", "biomedical",
+    ],
+    "security": [
+        "security", "cryptography", "kryptographie", "attack", "angriff",
+        "privacy", "datenschutz", "intrusion",
+    ],
+    "communication": [
+        "wireless", "5g", "6g", "communication", "kommunikation", "antenna",
+        "antenne", "signal processing", "signalverarbeitung",
+    ],
+}
+
+
+class TagExtractor:
+    """
+    Assigns tags to many titles at once. Keywords are compiled into a
+    term-by-rule matrix; a batch of titles becomes a title-by-term
+    incidence matrix, and one matrix product gives every rule's matched
+    word count per title.
+    """
+
+    def __init__(self, tag_keywords: dict[str, list[str]]):
+        self.tags = sorted(tag_keywords)
+        self._term_ids: dict[str, int] = {}
+        # Keyword term columns of each title token seen so far
+        self._token_columns: dict[str, tuple[int, ...]] = {}
+        rule_terms, rule_tags = [], []
+        for tag_index, tag in enumerate(self.tags):
+            for keyword in tag_keywords[tag]:
+                # One stem per keyword word; titles are indexed with both
+                # the English and the German stem of every word
+                words = [min(stems(token)) for token in tokenize(keyword)]
+                if not words:
+                    continue
+                rule_terms.append(
+                    {self._term_ids.setdefault(word, len(self._term_ids)) for word in words})
+                rule_tags.append(tag_index)
+
+        self._rules = np.zeros((len(self._term_ids), len(rule_terms)), dtype=np.float32)
+        for rule, terms in enumerate(rule_terms):
+            self._rules[list(terms), rule] = 1
+        self._rule_sizes = self._rules.sum(axis=0)
+        self._rule_tags = np.zeros((len(rule_terms), len(self.tags)), dtype=np.float32)
+        self._rule_tags[np.arange(len(rule_terms)), rule_tags] = 1
+
+    def extract(self, titles: list[str]) -> list[set[str]]:
+        """
+        Tags of each title, in order.
+        """
+        rows, columns = [], []
+        for row, title in enumerate(titles):
+            for token in tokenize(title):
+                token_columns = self._token_columns.get(token)
+                if token_columns is None:
+                    token_columns = self._token_columns[token] = tuple(
+                        self._term_ids[term] for term in stems(token) | {token}
+                        if term in self._term_ids)
+                for column in token_columns:
+                    rows.append(row)
+                    columns.append(column)
+
+        # Only titles with at least one keyword term take part in the
+        # products, in float32 so they run on BLAS
+        rows = np.array(rows, dtype=np.int64)
+        columns = np.array(columns, dtype=np.int64)
+        candidates, rows = np.unique(rows, return_inverse=True)
+        incidence = np.zeros((len(candidates), len(self._term_ids)), dtype=np.float32)
+        incidence[rows, columns] = 1
+        matched_rules = (incidence @ self._rules) >= self._rule_sizes
+        tag_hits = (matched_rules.astype(np.float32) @ self._rule_tags) > 0
+
+        tags = [set() for _ in titles]
+        for row, tag_index in zip(*np.nonzero(tag_hits)):
+            tags[candidates[row]].add(self.tags[tag_index])
+        return tags
+
+
+tag_extractor = TagExtractor(TAG_KEYWORDS)
+
+
+def extract_topic_tags(rows) -> dict[int, set[str]]:
+    """
+    Tag (topic_id, title) rows in one batch.
+
+    Returns:
+        dict: topic_id to its set of tags, for every row.
+    """
+    rows = list(rows)
+    tags = tag_extractor.extract([title for _, title in rows])
+    return {topic_id: topic_tags for (topic_id, _), topic_tags in zip(rows, tags)}
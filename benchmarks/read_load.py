@@ -0,0 +1,293 @@
+"""
+Read-path load benchmark.
+
+Generates a synthetic dataset (see synthetic.py), then drives the read
+endpoints through the ASGI app in process with concurrent clients and
+reports p50/p95/p99 latency per endpoint, throughput and memory.
+
+    python -m benchmarks.read_load --labs 1000 --topics-per-lab 100
+    python -m benchmarks.read_load --save-baseline benchmarks/baselines/read_load.json
+    python -m benchmarks.read_load --compare benchmarks/baselines/read_load.json
+
+By default the benchmark uses a SQLite file that is recreated on every
+run; `--reuse` keeps it. `--database-url` points at another database
+(e.g. Postgres), which must be empty unless `--reuse` is given.
+`--no-cache` disables the response cache, so every request reaches the
+database. With `--compare`, the exit status is 1 when an endpoint's p95
+regressed by more than `--tolerance`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "thesis_topics_read_load.db")
+
+# Relative weights of the endpoints in the request mix
+SCENARIOS = {
+    "thesis_topics": 1,
+    "thesis_topics_open": 1,
+    "thesis_topics_lab": 4,
+    "thesis_topics_page": 8,
+    "insights_summary": 4,
+    "insights_total_open_thesis": 2,
+    "insights_thesis_per_lab": 2,
+    "insights_topics_added": 2,
+    "insights_time_open": 2,
+    "insights_velocity": 2,
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--labs", type=int, default=1000)
+    parser.add_argument("--topics-per-lab", type=int, default=100)
+    parser.add_argument("--closed-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database", default=DEFAULT_SQLITE_PATH,
+                        help="SQLite file for the dataset.")
+    parser.add_argument("--database-url",
+                        help="SQLAlchemy URL of another (empty) database.")
+    parser.add_argument("--reuse", action="store_true",
+                        help="Keep the existing dataset instead of generating one.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Disable the response cache.")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed p95 increase over the baseline (0.2 = 20%%).")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args) -> str:
+    """
+    Point the app at the benchmark database. Must run before the app is
+    imported, since its configuration is read at import time.
+    """
+    if args.database_url:
+        url = args.database_url
+    else:
+        if not args.reuse:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(args.database + suffix):
+                    os.remove(args.database + suffix)
+        url = f"sqlite:///{args.database}"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = url
+    os.environ.pop("DATABASE_REPLICA_URL", None)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.no_cache:
+        os.environ["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+    return url
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def rss_mb() -> dict:
+    """
+    Current and peak resident memory of this process, where available.
+    """
+    memory = {}
+    try:
+        import resource
+        memory["peak_rss_mb"] = round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except ImportError:  # Not available on Windows
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            memory["rss_mb"] = round(
+                int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    return memory
+
+
+class RequestMix:
+    """
+    Picks the next request from the weighted scenarios. Pagination
+    cursors are collected during warm-up, so page requests hit pages
+    throughout the keyset order rather than only the first one.
+    """
+
+    def __init__(self, lab_names: list[str], rng: random.Random):
+        self.lab_names = lab_names
+        self.rng = rng
+        self.cursors: list[str] = []
+        self.names = list(SCENARIOS)
+        self.weights = [SCENARIOS[name] for name in self.names]
+
+    async def collect_cursors(self, client, pages: int = 50):
+        cursor = None
+        for _ in range(pages):
+            params = {"limit": 100}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get("/api/thesis_topics", params=params)
+            cursor = response.json().get("next_cursor")
+            if not cursor:
+                break
+            self.cursors.append(cursor)
+
+    def next(self) -> tuple[str, str, dict]:
+        name = self.rng.choices(self.names, self.weights)[0]
+        if name == "thesis_topics":
+            return name, "/api/thesis_topics", {}
+        if name == "thesis_topics_open":
+            return name, "/api/thesis_topics", {"status": "open"}
+        if name == "thesis_topics_lab":
+            return name, "/api/thesis_topics", {"lab": self.rng.choice(self.lab_names)}
+        if name == "thesis_topics_page":
+            params = {"limit": 100}
+            if self.cursors:
+                params["cursor"] = self.rng.choice(self.cursors)
+            return name, "/api/thesis_topics", params
+        if name == "insights_topics_added":
+            return name, "/api/insights/topics_added", {"period": self.rng.choice(["week", "month"])}
+        return name, "/api/insights/" + name.removeprefix("insights_"), {}
+
+
+async def run_load(app, lab_names: list[str], args) -> dict:
+    import httpx
+
+    mix = RequestMix(lab_names, random.Random(args.seed))
+    latencies: dict[str, list[float]] = {name: [] for name in SCENARIOS}
+    errors: dict[str, int] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark",
+                                     headers={"Accept-Encoding": "gzip"}, timeout=None) as client:
+            await mix.collect_cursors(client)
+            for _ in range(args.warmup):
+                _, path, params = mix.next()
+                await client.get(path, params=params)
+
+            remaining = args.requests
+
+            async def worker():
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    name, path, params = mix.next()
+                    started = time.perf_counter()
+                    response = await client.get(path, params=params)
+                    latencies[name].append(time.perf_counter() - started)
+                    if response.status_code >= 400:
+                        errors[name] = errors.get(name, 0) + 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name, values in latencies.items():
+        if not values:
+            continue
+        values.sort()
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        }
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "endpoints": endpoints,
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Endpoints whose p95 latency exceeds the baseline's by more than
+    `tolerance`, as report lines.
+    """
+    regressions = []
+    if baseline.get("dataset") != result.get("dataset"):
+        print("Warning: the baseline was recorded with a different dataset.")
+    for name, stats in result["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before or not before["p95_ms"]:
+            continue
+        ratio = stats["p95_ms"] / before["p95_ms"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: p95 {before['p95_ms']} ms -> {stats['p95_ms']} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def print_report(result: dict):
+    print(f"{result['requests']} requests, concurrency {result['concurrency']}: "
+          f"{result['throughput_rps']} req/s over {result['seconds']} s")
+    print(f"{'endpoint':32} {'requests':>8} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in result["endpoints"].items():
+        print(f"{name:32} {stats['requests']:>8} {stats['errors']:>6} "
+              f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+    print("memory: " + ", ".join(f"{k}={v}" for k, v in result["memory"].items()))
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_environment(args)
+
+    # Imported only now, so the app picks up the benchmark configuration
+    from sqlalchemy import select
+    from database.engine import init_engines, get_engine
+    from database.models import Lab
+    from backend.app.main import app
+    from benchmarks.synthetic import generate_dataset
+
+    init_engines()
+    dataset = {"labs": args.labs, "topics_per_lab": args.topics_per_lab,
+               "closed_ratio": args.closed_ratio, "seed": args.seed,
+               "no_cache": args.no_cache}
+    if not args.reuse:
+        started = time.perf_counter()
+        counts = generate_dataset(get_engine(), args.labs, args.topics_per_lab,
+                                  args.closed_ratio, args.seed)
+        print(f"Generated {counts['labs']} labs, {counts['topics']} topics and "
+              f"{counts['tags']} tags in {time.perf_counter() - started:.1f} s.")
+
+    with get_engine().connect() as conn:
+        lab_names = list(conn.execute(select(Lab.lab_name)).scalars())
+
+    result = asyncio.run(run_load(app, lab_names, args))
+    result["dataset"] = dataset
+    result["memory"] = rss_mb()
+    print_report(result)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or ".", exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
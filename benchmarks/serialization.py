@@ -0,0 +1,126 @@
+"""
+Read-path serialization benchmark.
+
+Generates a synthetic dataset (see synthetic.py) and times the stages of
+building the `/api/thesis_topics` body, reported per 10k topics:
+
+- loading: ORM objects (labs with their topics relationship) against
+  the row tuples of the listing query grouped with group_topics_by_lab;
+- encoding the grouped result: jsonable_encoder + json.dumps (FastAPI's
+  default path), validating and dumping through the declared pydantic
+  response model, and serialize_json (orjson, as the cache does).
+
+    python -m benchmarks.serialization --labs 100 --topics-per-lab 100
+    python -m benchmarks.serialization --repeat 10
+
+Each stage runs `--repeat` times and the fastest run counts, so the
+figures are the cost of the work rather than of whatever else the
+machine was doing.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.read_load import configure_environment, rss_mb
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "thesis_topics_serialization.db")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--labs", type=int, default=100)
+    parser.add_argument("--topics-per-lab", type=int, default=100)
+    parser.add_argument("--closed-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database", default=DEFAULT_SQLITE_PATH,
+                        help="SQLite file for the dataset.")
+    parser.add_argument("--database-url",
+                        help="SQLAlchemy URL of another (empty) database.")
+    parser.add_argument("--reuse", action="store_true",
+                        help="Keep the existing dataset instead of generating one.")
+    args = parser.parse_args(argv)
+    args.no_cache = False
+    return args
+
+
+def best_of(repeat: int, func):
+    """
+    Fastest of `repeat` runs of `func` in seconds, and its last result.
+    """
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    configure_environment(args)
+
+    # Imported only now, so the app picks up the benchmark configuration
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session, selectinload
+
+    from database.engine import init_engines, get_engine
+    from database.listing import group_topics_by_lab, labs_with_topics_query
+    from database.models import Lab, ThesisTopic
+    from database.schemas import LabWithTopics
+    from backend.app.cache import orjson, serialize_json
+    from benchmarks.synthetic import generate_dataset
+
+    init_engines()
+    engine = get_engine()
+    if not args.reuse:
+        generate_dataset(engine, args.labs, args.topics_per_lab, args.closed_ratio, args.seed)
+    with engine.connect() as conn:
+        topics = conn.execute(select(func.count(ThesisTopic.topic_id))).scalar()
+
+    def load_orm():
+        with Session(engine) as session:
+            labs = session.scalars(
+                select(Lab).options(selectinload(Lab.thesis_topics)).order_by(Lab.lab_id)).all()
+            return [
+                {"lab_name": lab.lab_name, "lab_url": lab.lab_url,
+                 "topics": [{"title": topic.mt_title, "status": topic.status, "url": topic.mt_url}
+                            for topic in sorted(lab.thesis_topics, key=lambda t: t.topic_id)]}
+                for lab in labs]
+
+    def load_rows():
+        with engine.connect() as conn:
+            return group_topics_by_lab(conn.execute(labs_with_topics_query()).all())
+
+    adapter = TypeAdapter(list[LabWithTopics])
+    stages = {}
+    stages["load_orm_objects"], _ = best_of(args.repeat, load_orm)
+    stages["load_row_tuples"], content = best_of(args.repeat, load_rows)
+    stages["encode_jsonable_encoder"], default_body = best_of(args.repeat, lambda: json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    stages["encode_pydantic_model"], _ = best_of(
+        args.repeat, lambda: adapter.dump_json(adapter.validate_python(content)))
+    stages["encode_serialize_json"], body = best_of(args.repeat, lambda: serialize_json(content))
+
+    if json.loads(body) != json.loads(default_body):
+        print("serialize_json output differs from the jsonable_encoder output.")
+        return 1
+
+    scale = 10000 / max(topics, 1)
+    print(f"{topics} topics in {args.labs} labs, body {len(body) / 1024:.0f} KiB, "
+          f"serializer: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'stage':28} {'ms':>9} {'ms per 10k topics':>18}")
+    for name, seconds in stages.items():
+        print(f"{name:28} {seconds * 1000:>9.1f} {seconds * 1000 * scale:>18.2f}")
+    print("memory: " + ", ".join(f"{k}={v}" for k, v in rss_mb().items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
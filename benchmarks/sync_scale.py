@@ -0,0 +1,234 @@
+"""
+Sync pipeline scale benchmark.
+
+Replaces the scraper registry with deterministic in-memory fake labs and
+runs the full `POST /api/insert_thesis_topic` sync through the ASGI app
+against a local database: an initial sync that inserts N labs x M
+topics, then churn rounds in which each lab drops some topics, posts
+new ones and re-posts some it dropped earlier. Reports the time, the
+database statements and the cost per synced topic of every round.
+
+    python -m benchmarks.sync_scale --labs 200 --topics-per-lab 100 --rounds 3
+    python -m benchmarks.sync_scale --new 0.05 --removed 0.05 --reopened 0.02
+    python -m benchmarks.sync_scale --save-baseline benchmarks/baselines/sync_scale.json
+    python -m benchmarks.sync_scale --compare benchmarks/baselines/sync_scale.json
+
+The database must start empty (the default SQLite file is recreated).
+The sync runs in a temporary working directory, so the scrape result
+files it writes do not pile up. With `--compare`, the exit status is 1
+when a round's cost per topic regressed by more than `--tolerance`.
+Synthetic titles share words, so a few new topics may be matched as
+renames of removed ones, as the sync would for real labs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+from benchmarks.read_load import configure_environment, rss_mb
+from benchmarks.synthetic import TITLE_SPACE, lab_name, lab_url, synthetic_title, topic_url
+
+DEFAULT_SQLITE_PATH = os.path.join(tempfile.gettempdir(), "thesis_topics_sync_scale.db")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--labs", type=int, default=200)
+    parser.add_argument("--topics-per-lab", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="Churn rounds after the initial sync.")
+    parser.add_argument("--new", type=float, default=0.05,
+                        help="Share of each lab's listed topics added per round.")
+    parser.add_argument("--removed", type=float, default=0.05,
+                        help="Share of each lab's listed topics removed per round.")
+    parser.add_argument("--reopened", type=float, default=0.02,
+                        help="Share of each lab's listed topics re-posted after removal.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database", default=DEFAULT_SQLITE_PATH,
+                        help="SQLite file for the database.")
+    parser.add_argument("--database-url",
+                        help="SQLAlchemy URL of another (empty) database.")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed cost per topic increase over the baseline.")
+    args = parser.parse_args(argv)
+    args.reuse = False
+    args.no_cache = False
+    return args
+
+
+class FakeLab:
+    """
+    A lab's thesis page: the topics it currently lists, and the ones it
+    removed and may post again.
+    """
+
+    def __init__(self, lab_index: int, topics: int, rng: random.Random):
+        self.lab_index = lab_index
+        self.used: set[int] = set()
+        self.listed: list[int] = [self._new_title(rng) for _ in range(topics)]
+        self.removed: list[int] = []
+
+    def _new_title(self, rng: random.Random) -> int:
+        while True:
+            index = rng.randrange(TITLE_SPACE)
+            if index not in self.used:
+                self.used.add(index)
+                return index
+
+    def churn(self, rng: random.Random, new: float, removed: float, reopened: float):
+        size = len(self.listed)
+        rng.shuffle(self.listed)
+        reposted = self.removed[:round(size * reopened)]
+        self.removed = self.removed[len(reposted):]
+        dropped = round(size * removed)
+        self.removed.extend(self.listed[:dropped])
+        self.listed = (self.listed[dropped:] + reposted
+                       + [self._new_title(rng) for _ in range(round(size * new))])
+
+    async def scrape(self, url: str) -> list[dict]:
+        return [{"title": synthetic_title(index), "link": topic_url(self.lab_index, index)}
+                for index in self.listed]
+
+
+def install_fake_scrapers(labs: list[FakeLab]):
+    """
+    Point the scrape step at the fake labs: config links, registry
+    entries, and link validation that always succeeds.
+    """
+    from backend.app.routers import scrape
+    from backend.app.scrapers import registry
+
+    scrape.LAB_LINKS = {lab_name(lab.lab_index): lab_url(lab.lab_index) for lab in labs}
+    scrape.validate_link = lambda url: True
+    registry.SCRAPER_REGISTRY.clear()
+    registry.SCRAPER_REGISTRY.update(
+        {lab_name(lab.lab_index): lab.scrape for lab in labs})
+
+
+def _server_timing_queries(header: str) -> int:
+    match = re.search(r'db;[^,]*desc="(\d+) queries"', header or "")
+    return int(match.group(1)) if match else 0
+
+
+async def run_rounds(app, labs: list[FakeLab], args) -> list[dict]:
+    import httpx
+
+    rng = random.Random(args.seed + 1)
+    rounds = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark",
+                                     timeout=None) as client:
+            for round_index in range(args.rounds + 1):
+                if round_index:
+                    for lab in labs:
+                        lab.churn(rng, args.new, args.removed, args.reopened)
+                scraped = sum(len(lab.listed) for lab in labs)
+
+                started = time.perf_counter()
+                response = await client.post("/api/insert_thesis_topic")
+                seconds = time.perf_counter() - started
+                response.raise_for_status()
+                summary = response.json()
+
+                rounds.append({
+                    "round": "initial" if round_index == 0 else f"churn_{round_index}",
+                    "scraped_topics": scraped,
+                    "seconds": round(seconds, 3),
+                    "us_per_topic": round(seconds / max(scraped, 1) * 1e6, 1),
+                    "db_queries": _server_timing_queries(response.headers.get("server-timing")),
+                    **{key: summary.get(key) for key in
+                       ("inserted", "skipped", "reopened", "renamed", "closed")},
+                })
+    return rounds
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Rounds whose cost per topic exceeds the baseline's by more than
+    `tolerance`, as report lines.
+    """
+    if baseline.get("dataset") != result.get("dataset"):
+        print("Warning: the baseline was recorded with different parameters.")
+    before = {entry["round"]: entry for entry in baseline.get("rounds", [])}
+    regressions = []
+    for entry in result["rounds"]:
+        previous = before.get(entry["round"])
+        if not previous or not previous["us_per_topic"]:
+            continue
+        ratio = entry["us_per_topic"] / previous["us_per_topic"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{entry['round']}: {previous['us_per_topic']} -> "
+                f"{entry['us_per_topic']} us per topic ({ratio:.2f}x)")
+    return regressions
+
+
+def print_report(result: dict):
+    columns = ("round", "scraped_topics", "seconds", "us_per_topic", "db_queries",
+               "inserted", "skipped", "reopened", "renamed", "closed")
+    print(" ".join(f"{column:>14}" for column in columns))
+    for entry in result["rounds"]:
+        print(" ".join(f"{str(entry[column]):>14}" for column in columns))
+    print("memory: " + ", ".join(f"{k}={v}" for k, v in result["memory"].items()))
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    # The sync runs in another working directory
+    args.database = os.path.abspath(args.database)
+    configure_environment(args)
+    os.environ.setdefault("LOG_DIR", os.path.join(tempfile.gettempdir(), "sync_scale_logs"))
+    # The fake labs are not fetched, so there is nothing to be polite to
+    os.environ["ROBOTS_TXT_ENABLED"] = "false"
+    os.environ["SCRAPE_HOST_DELAY"] = "0"
+
+    from backend.app.main import app
+
+    rng = random.Random(args.seed)
+    labs = [FakeLab(lab_index, args.topics_per_lab, rng) for lab_index in range(args.labs)]
+    install_fake_scrapers(labs)
+
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            rounds = asyncio.run(run_rounds(app, labs, args))
+        finally:
+            os.chdir(working_directory)
+
+    result = {
+        "dataset": {key: getattr(args, key) for key in
+                    ("labs", "topics_per_lab", "rounds", "new", "removed", "reopened", "seed")},
+        "rounds": rounds,
+        "memory": rss_mb(),
+    }
+    print_report(result)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or ".", exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
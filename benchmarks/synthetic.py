@@ -0,0 +1,146 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+
+from database.models import Base, Lab, LabStats, ThesisTopic, TopicStatus, TopicTag
+
+# Building blocks of synthetic titles; every combination is a distinct
+# title, so a lab can draw up to TITLE_SPACE topics without repeats
+_PREFIXES = [
+    "Design of", "Analysis of", "Evaluation of", "Development of", "Towards",
+    "Optimization of", "A Study of", "Benchmarking", "Entwicklung von",
+    "Untersuchung von", "Modellierung von", "Implementation of",
+]
+_METHODS = [
+    "deep learning", "reinforcement learning", "graph neural network", "Kalman filter",
+    "model predictive control", "finite element", "CFD", "transformer",
+    "Bayesian", "evolutionary", "federated", "sparse", "probabilistic", "robust",
+    "adaptive", "distributed", "real-time", "low-power", "self-supervised",
+    "multi-agent", "physics-informed", "data-driven", "hybrid", "explainable",
+    "energy-efficient", "scalable", "privacy-preserving", "event-based",
+    "kunstliche Intelligenz", "numerische", "lightweight", "uncertainty-aware",
+    "online", "embedded", "semantic", "generative", "contrastive", "quantized",
+    "neuronale Netze", "cloud-native",
+]
+_SUBJECTS = [
+    "object detection", "trajectory planning", "battery management", "point cloud",
+    "image segmentation", "fatigue prediction", "grasping", "signal processing",
+    "intrusion detection", "power grid", "wind turbine", "hydrogen storage",
+    "composite materials", "additive manufacturing", "drone navigation",
+    "patient monitoring", "clinical decision support", "antenna arrays",
+    "wireless links", "sensor fusion", "anomaly detection", "digital twins",
+    "language models", "process mining", "supply chains", "traffic flow",
+    "solar forecasting", "fuel cell control", "humanoid locomotion",
+    "medical imaging", "fault diagnosis", "kamera calibration", "regelung",
+    "werkstoffe", "software testing", "code generation", "recommender systems",
+    "knowledge graphs", "time series", "speech recognition",
+]
+_DOMAINS = [
+    "autonomous vehicles", "industrial robots", "smart grids", "healthcare",
+    "manufacturing", "agriculture", "logistics", "aerospace", "smart buildings",
+    "electric vehicles", "mobile devices", "edge computing", "5G networks",
+    "6G networks", "precision medicine", "renewable energy", "construction",
+    "railways", "maritime systems", "sports analytics", "finance", "education",
+    "cybersecurity", "space robotics", "water networks", "Stromnetz",
+    "Medizin", "Batterie systems", "wearables", "automotive testing",
+]
+TITLE_SPACE = len(_PREFIXES) * len(_METHODS) * len(_SUBJECTS) * len(_DOMAINS)
+
+
+def synthetic_title(index: int) -> str:
+    index, domain = divmod(index, len(_DOMAINS))
+    index, subject = divmod(index, len(_SUBJECTS))
+    prefix, method = divmod(index, len(_METHODS))
+    return (f"{_PREFIXES[prefix]} {_METHODS[method]} {_SUBJECTS[subject]} "
+            f"for {_DOMAINS[domain]}")
+
+
+def lab_name(lab_index: int) -> str:
+    return f"Synthetic Lab {lab_index:05d}"
+
+
+def lab_url(lab_index: int) -> str:
+    return f"https://lab{lab_index:05d}.example.org/theses"
+
+
+def topic_url(lab_index: int, title_index: int) -> str:
+    return f"https://lab{lab_index:05d}.example.org/theses/{title_index}"
+
+
+def lab_titles(rng: random.Random, lab_index: int, count: int) -> list[tuple[int, str]]:
+    """
+    `count` distinct (title_index, title) pairs for one lab.
+    """
+    return [(index, synthetic_title(index)) for index in rng.sample(range(TITLE_SPACE), count)]
+
+
+def generate_dataset(engine: Engine, labs: int, topics_per_lab: int,
+                     closed_ratio: float = 0.3, seed: int = 0,
+                     batch_size: int = 5000) -> dict:
+    """
+    Fill an empty database with synthetic labs and topics, plus the
+    lab_stats and topic_tags rows the sync would have written.
+
+    Topics are added over the past two years; closed topics were closed
+    between a day and a year after they were added.
+
+    Raises:
+        ValueError: If the database already has labs.
+    """
+    # Imported here so generating data does not need the app's config
+    from backend.app.tagging import extract_topic_tags
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        if conn.execute(select(func.count(Lab.lab_id))).scalar():
+            raise ValueError("Database already has labs; use an empty database.")
+
+        conn.execute(insert(Lab), [
+            {"lab_id": lab_index + 1, "lab_name": lab_name(lab_index),
+             "lab_url": lab_url(lab_index)}
+            for lab_index in range(labs)])
+
+        topics, stats, change_seq = [], [], 0
+        for lab_index in range(labs):
+            open_count = closed_count = 0
+            for title_index, title in lab_titles(rng, lab_index, topics_per_lab):
+                change_seq += 1
+                added = now - timedelta(days=rng.uniform(0, 730))
+                closed = rng.random() < closed_ratio
+                updated = added + timedelta(days=rng.uniform(1, 365)) if closed else added
+                topics.append({
+                    "topic_id": change_seq,
+                    "mt_title": title,
+                    "mt_url": topic_url(lab_index, title_index),
+                    "added_date": added,
+                    "status": TopicStatus.CLOSED if closed else TopicStatus.OPEN,
+                    "lab_id": lab_index + 1,
+                    "change_seq": change_seq,
+                    "change_type": "closed" if closed else "inserted",
+                    "updated_at": min(updated, now),
+                })
+                closed_count += closed
+                open_count += not closed
+            stats.append({"lab_id": lab_index + 1, "open_count": open_count,
+                          "closed_count": closed_count, "updated_at": now})
+            if len(topics) >= batch_size:
+                conn.execute(insert(ThesisTopic), topics)
+                topics = []
+        if topics:
+            conn.execute(insert(ThesisTopic), topics)
+        conn.execute(insert(LabStats), stats)
+
+        tag_rows = [
+            {"topic_id": topic_id, "tag": tag}
+            for topic_id, tags in extract_topic_tags(
+                conn.execute(select(ThesisTopic.topic_id, ThesisTopic.mt_title))).items()
+            for tag in tags]
+        for start in range(0, len(tag_rows), batch_size):
+            conn.execute(insert(TopicTag), tag_rows[start:start + batch_size])
+
+    return {"labs": labs, "topics": change_seq, "tags": len(tag_rows)}
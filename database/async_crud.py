@@ -0,0 +1,852 @@
+from sqlalchemy import bindparam, case, delete, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from .models import (
+    DataGenerationCounter, Lab, LabStats, ThesisTopic, TopicStatus, TopicTag, TITLE_TSVECTOR_SQL)
+from .schemas import LabCreate
+from .timeseries import (
+    topics_added_query,
+    median_time_open_query,
+    posting_velocity_query,
+)
+from .listing import (
+    topic_filters,
+    labs_with_topics_query,
+    topics_query,
+    topics_page_query,
+    facet_counts_query,
+    group_topics_by_lab,
+    encode_cursor,
+    decode_cursor,
+)
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Database access used by the routers.
+
+
+async def get_lab_id_mapping(session: AsyncSession):
+    """
+    Fetch all labs and return a mapping of lab_name to lab_id.
+    Args:
+        session (AsyncSession): SQLAlchemy async database session.
+
+    Returns:
+        dict: Mapping of lab_name to lab_id.
+    """
+    try:
+        result = await session.execute(select(Lab.lab_name, Lab.lab_id))
+        return {lab_name: lab_id for lab_name, lab_id in result.all()}
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching lab ID mapping.")
+        raise
+
+
+async def get_all_labs(session: AsyncSession):
+    """
+    Retrieve all labs from the database.
+    """
+    try:
+        result = await session.execute(select(Lab))
+        return result.scalars().all()
+    except SQLAlchemyError as e:
+        logger.exception("Error querying all labs.")
+        raise
+
+
+async def add_new_labs(session: AsyncSession,
+                       labs: list[LabCreate]) -> tuple[list[str], Optional[int]]:
+    """
+    Add several labs in one bulk insert and commit, bumping the data
+    generation if any were inserted. A lab whose name or URL is already
+    taken is skipped without failing the others: on SQLite and PostgreSQL
+    the insert ignores conflicting rows, elsewhere each lab is inserted in
+    its own savepoint.
+
+    Returns:
+        tuple: Names of the labs actually inserted, and the new data
+        generation (None if nothing was inserted).
+    """
+    if not labs:
+        return [], None
+    rows = [{"lab_name": lab_data.lab_name, "lab_url": str(lab_data.lab_url)}
+            for lab_data in labs]
+    try:
+        dialect = session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            dialect_insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            result = await session.execute(
+                dialect_insert(Lab).on_conflict_do_nothing().returning(Lab.lab_name), rows)
+            inserted = list(result.scalars())
+        else:
+            inserted = []
+            for row in rows:
+                try:
+                    async with session.begin_nested():
+                        await session.execute(insert(Lab), row)
+                    inserted.append(row["lab_name"])
+                except IntegrityError:
+                    pass
+        generation = await bump_data_generation(session) if inserted else None
+        await session.commit()
+        logger.info(f"Labs added: {len(inserted)}")
+        return inserted, generation
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.exception("Failed to add labs.")
+        raise
+
+# CRUD for thesis topics
+
+
+async def get_all_topics(session: AsyncSession):
+    """
+    Retrieve all thesis topics from the database.
+    """
+    try:
+        result = await session.execute(select(ThesisTopic))
+        return result.scalars().all()
+    except SQLAlchemyError as e:
+        logger.exception("Error querying all thesis topics.")
+        raise
+
+
+async def apply_topic_changes(session: AsyncSession,
+                              status_changes: list,
+                              renames: list,
+                              new_topics: list,
+                              stats_deltas: Optional[dict] = None
+                              ) -> tuple[list[ThesisTopic], Optional[int]]:
+    """
+    Write a sync's topic changes in a single transaction with bulk
+    statements (executemany updates by primary key and one multi-row
+    insert) instead of one commit per topic. The given topic objects are
+    updated in place. The lab_stats changes and the data generation bump
+    go into the same transaction, so neither can drift from the topics.
+
+    Args:
+        session (AsyncSession): Async database session.
+        status_changes (list): (topic, new_status, change_seq) tuples.
+        renames (list): (topic, title, url, change_seq) tuples.
+        new_topics (list): (title, url, lab_id, change_seq) tuples.
+        stats_deltas (dict, optional): Mapping of lab_id to
+            (open_delta, closed_delta), as in `update_lab_stats`.
+
+    Returns:
+        tuple: The inserted ThesisTopic objects, in the order given, and
+        the new data generation (None if there were no changes).
+    """
+    try:
+        now = datetime.now()
+        status_rows = [
+            {"topic_id": topic.topic_id, "status": new_status, "change_seq": change_seq,
+             "change_type": "closed" if new_status == TopicStatus.CLOSED else "reopened",
+             "updated_at": now}
+            for topic, new_status, change_seq in status_changes]
+        rename_rows = [
+            {"topic_id": topic.topic_id, "mt_title": title, "mt_url": url,
+             "status": TopicStatus.OPEN, "change_seq": change_seq,
+             "change_type": "renamed", "updated_at": now}
+            for topic, title, url, change_seq in renames]
+        for rows in (status_rows, rename_rows):
+            if rows:
+                await session.execute(update(ThesisTopic), rows)
+
+        topics = []
+        if new_topics:
+            topics = list((await session.execute(
+                insert(ThesisTopic).returning(ThesisTopic, sort_by_parameter_order=True), [
+                    {"mt_title": title, "mt_url": url, "lab_id": lab_id, "added_date": now,
+                     "status": TopicStatus.OPEN, "change_seq": change_seq,
+                     "change_type": "inserted", "updated_at": now}
+                    for title, url, lab_id, change_seq in new_topics])).scalars())
+        if stats_deltas is not None:
+            await update_lab_stats(session, stats_deltas)
+        generation = None
+        if status_rows or rename_rows or new_topics:
+            generation = await bump_data_generation(session)
+        await session.commit()
+
+        # Mirror the written values on the loaded objects without marking
+        # them dirty
+        for (topic, *_), row in zip(status_changes + renames, status_rows + rename_rows):
+            for key, value in row.items():
+                set_committed_value(topic, key, value)
+        logger.info(
+            f"Topic changes written: {len(new_topics)} inserted, {len(status_changes)} status changes, {len(renames)} renamed.")
+        return topics, generation
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.exception("Failed to write topic changes.")
+        raise
+
+
+async def get_total_labs(session: AsyncSession) -> int:
+    """
+    Get the total number of labs.
+    """
+    try:
+        return await session.scalar(select(func.count(Lab.lab_id)))
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching total number of labs.")
+        raise
+
+
+async def get_total_open_thesis(session: AsyncSession) -> int:
+    """
+    Get the total number of open thesis topics.
+    """
+    try:
+        return await session.scalar(
+            select(func.count(ThesisTopic.topic_id))
+            .filter_by(status=TopicStatus.OPEN))
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching total number of open thesis topics.")
+        raise
+
+
+async def get_total_closed_thesis(session: AsyncSession) -> int:
+    """
+    Get the total number of closed thesis topics.
+    """
+    try:
+        return await session.scalar(
+            select(func.count(ThesisTopic.topic_id))
+            .filter_by(status=TopicStatus.CLOSED))
+    except SQLAlchemyError as e:
+        logger.exception(
+            "Error fetching total number of closed thesis topics.")
+        raise
+
+
+async def get_thesis_per_lab(session: AsyncSession) -> dict:
+    """
+    Get the number of thesis topics per lab.
+
+    Returns:
+        dict: A mapping of lab names to the count of thesis topics in each lab.
+    """
+    try:
+        results = await session.execute(
+            select(Lab.lab_name, func.count(ThesisTopic.topic_id))
+            .join(ThesisTopic, Lab.lab_id == ThesisTopic.lab_id)
+            .group_by(Lab.lab_name)
+        )
+        return {lab_name: count for lab_name, count in results.all()}
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching thesis topics per lab.")
+        raise
+
+
+async def get_labs_with_topics(session: AsyncSession,
+                               status: Optional[TopicStatus] = None,
+                               lab_names: Optional[list[str]] = None,
+                               added_after: Optional[datetime] = None,
+                               tags: Optional[list[str]] = None):
+    """
+    Fetch all labs with their thesis topics in a single joined query.
+
+    Args:
+        session (AsyncSession): Async database session.
+        status (TopicStatus, optional): Only include topics with this status.
+        lab_names (list[str], optional): Only include these labs.
+        added_after (datetime, optional): Only include topics added after this date.
+        tags (list[str], optional): Only include topics with any of these tags.
+
+    Returns:
+        list: Labs with their (filtered) thesis topics.
+    """
+    try:
+        rows = (await session.execute(labs_with_topics_query(
+            status, lab_names, added_after, tags))).all()
+        return group_topics_by_lab(rows)
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching labs with thesis topics.")
+        raise
+
+
+async def get_topics_page(session: AsyncSession,
+                          limit: int,
+                          cursor: Optional[str] = None,
+                          status: Optional[TopicStatus] = None,
+                          lab_names: Optional[list[str]] = None,
+                          added_after: Optional[datetime] = None,
+                          tags: Optional[list[str]] = None):
+    """
+    Fetch one keyset-paginated page of thesis topics grouped by lab.
+
+    Args:
+        session (AsyncSession): Async database session.
+        limit (int): Maximum number of topics in the page.
+        cursor (str, optional): Cursor returned with the previous page.
+        status, lab_names, added_after, tags: Optional filters, as in `get_labs_with_topics`.
+
+    Returns:
+        dict: {"labs": [...], "next_cursor": str or None}
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    try:
+        rows = (await session.execute(topics_page_query(
+            limit, position, status, lab_names, added_after, tags))).all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching page of thesis topics.")
+        raise
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.lab_id, last.topic_id)
+    return {"labs": group_topics_by_lab(rows), "next_cursor": next_cursor}
+
+
+async def stream_topic_rows(session: AsyncSession,
+                            batch_size: int,
+                            status: Optional[TopicStatus] = None,
+                            lab_names: Optional[list[str]] = None,
+                            added_after: Optional[datetime] = None,
+                            include_empty_labs: bool = False,
+                            tags: Optional[list[str]] = None):
+    """
+    Stream (lab, topic) rows in batches from a server-side cursor, so the
+    full result never has to be held in memory.
+
+    Args:
+        session (AsyncSession): Async database session, kept open while iterating.
+        batch_size (int): Rows fetched from the cursor per batch.
+        status, lab_names, added_after: Optional filters, as in `get_labs_with_topics`.
+        include_empty_labs (bool): Also yield labs without matching topics.
+        tags (list[str], optional): Only include topics with any of these tags.
+
+    Yields:
+        list: A batch of rows ordered by (lab_id, topic_id).
+    """
+    if include_empty_labs:
+        query = labs_with_topics_query(status, lab_names, added_after, tags)
+    else:
+        query = topics_query(status, lab_names, added_after, tags)
+    async for partition in stream_query_rows(session, query, batch_size):
+        yield partition
+
+
+async def stream_query_rows(session: AsyncSession, query, batch_size: int):
+    """
+    Stream the rows of any select in batches from a server-side cursor.
+
+    Yields:
+        list: A batch of at most `batch_size` rows.
+    """
+    try:
+        result = await session.stream(
+            query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+    except SQLAlchemyError as e:
+        logger.exception("Error streaming query rows.")
+        raise
+
+
+# Change feed
+
+
+async def get_data_generation(session: AsyncSession) -> int:
+    """
+    Get the data generation stored in the database (0 if none).
+    """
+    try:
+        return await session.scalar(
+            select(DataGenerationCounter.generation).where(DataGenerationCounter.id == 1)) or 0
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching the data generation.")
+        raise
+
+
+async def bump_data_generation(session: AsyncSession) -> int:
+    """
+    Increment the data generation within the current transaction; the
+    caller commits. Every write that changes what the API returns calls
+    this, so other processes notice the change (see `DataGeneration` in
+    backend/app/cache.py).
+
+    Returns:
+        int: The new data generation.
+    """
+    return await session.scalar(
+        update(DataGenerationCounter)
+        .where(DataGenerationCounter.id == 1)
+        .values(generation=DataGenerationCounter.generation + 1)
+        .returning(DataGenerationCounter.generation))
+
+
+async def get_max_change_seq(session: AsyncSession) -> int:
+    """
+    Get the highest change sequence number handed out so far (0 if none).
+    """
+    try:
+        return await session.scalar(
+            select(func.coalesce(func.max(ThesisTopic.change_seq), 0)))
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching the latest change sequence.")
+        raise
+
+
+async def get_topic_changes(session: AsyncSession, since: int, limit: int) -> dict:
+    """
+    Get the topics inserted, closed or reopened after change `since`,
+    oldest change first.
+
+    Args:
+        session (AsyncSession): Async database session.
+        since (int): Cursor returned by the previous call (0 for everything).
+        limit (int): Maximum number of changes to return.
+
+    Returns:
+        dict: {"changes": [...], "next_cursor": int, "has_more": bool}
+    """
+    try:
+        rows = (await session.execute(
+            select(ThesisTopic.change_seq, ThesisTopic.change_type, ThesisTopic.updated_at,
+                   ThesisTopic.topic_id, ThesisTopic.mt_title, ThesisTopic.mt_url,
+                   ThesisTopic.status, ThesisTopic.added_date, Lab.lab_name)
+            .join(Lab, Lab.lab_id == ThesisTopic.lab_id)
+            .where(ThesisTopic.change_seq > since)
+            .order_by(ThesisTopic.change_seq)
+            .limit(limit + 1)
+        )).all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching topic changes.")
+        raise
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "changes": [
+            {
+                "seq": seq,
+                "change": change_type,
+                "changed_at": changed_at,
+                "topic_id": topic_id,
+                "title": title,
+                "url": url,
+                "status": status,
+                "added_date": added_date,
+                "lab_name": lab_name,
+            }
+            for seq, change_type, changed_at, topic_id, title, url, status, added_date, lab_name in rows
+        ],
+        "next_cursor": rows[-1].change_seq if rows else since,
+        "has_more": has_more,
+    }
+
+
+# Materialized per-lab stats
+
+
+def _lab_counts_query(lab_ids):
+    return (
+        select(
+            Lab.lab_id,
+            func.count(case((ThesisTopic.status == TopicStatus.OPEN, 1))),
+            func.count(case((ThesisTopic.status == TopicStatus.CLOSED, 1))),
+        )
+        .outerjoin(ThesisTopic, Lab.lab_id == ThesisTopic.lab_id)
+        .where(Lab.lab_id.in_(lab_ids))
+        .group_by(Lab.lab_id)
+    )
+
+
+async def update_lab_stats(session: AsyncSession, deltas: dict):
+    """
+    Apply per-lab count changes to the lab_stats table in the session's
+    transaction; the caller commits (see `apply_topic_changes`).
+    Labs without a stats row yet (new labs) get theirs computed from the
+    topics table instead.
+
+    Args:
+        session (AsyncSession): Async database session.
+        deltas (dict): Mapping of lab_id to (open_delta, closed_delta).
+    """
+    existing = set((await session.execute(select(LabStats.lab_id))).scalars())
+    all_labs = set((await session.execute(select(Lab.lab_id))).scalars())
+    missing = all_labs - existing
+
+    if missing:
+        counts = await session.execute(_lab_counts_query(missing))
+        for lab_id, open_count, closed_count in counts.all():
+            session.add(LabStats(lab_id=lab_id, open_count=open_count,
+                                 closed_count=closed_count))
+
+    now = datetime.now()
+    rows = [
+        {"b_lab_id": lab_id, "b_open": open_delta, "b_closed": closed_delta, "b_now": now}
+        for lab_id, (open_delta, closed_delta) in deltas.items()
+        if lab_id in existing and (open_delta != 0 or closed_delta != 0)
+    ]
+    if rows:
+        # One executemany for all labs
+        connection = await session.connection()
+        await connection.execute(
+            update(LabStats)
+            .where(LabStats.lab_id == bindparam("b_lab_id"))
+            .values(open_count=LabStats.open_count + bindparam("b_open"),
+                    closed_count=LabStats.closed_count + bindparam("b_closed"),
+                    updated_at=bindparam("b_now")),
+            rows,
+        )
+
+
+async def get_insights_summary(session: AsyncSession) -> dict:
+    """
+    Get all insights counts from the lab_stats table in one query.
+
+    Returns:
+        dict: Totals plus per-lab totals and open/closed splits.
+    """
+    try:
+        rows = (await session.execute(
+            select(Lab.lab_name,
+                   func.coalesce(LabStats.open_count, 0),
+                   func.coalesce(LabStats.closed_count, 0))
+            .outerjoin(LabStats, Lab.lab_id == LabStats.lab_id)
+            .order_by(Lab.lab_name)
+        )).all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching insights summary.")
+        raise
+
+    per_lab = {
+        lab_name: {"open": open_count, "closed": closed_count}
+        for lab_name, open_count, closed_count in rows
+    }
+    return {
+        "total_labs": len(rows),
+        "total_open_thesis": sum(c["open"] for c in per_lab.values()),
+        "total_closed_thesis": sum(c["closed"] for c in per_lab.values()),
+        "thesis_per_lab": {
+            lab_name: c["open"] + c["closed"] for lab_name, c in per_lab.items()
+            if c["open"] + c["closed"] > 0
+        },
+        "per_lab": per_lab,
+    }
+
+
+# Time series
+
+
+def _period_label(value) -> str:
+    # date_trunc gives a timestamp on Postgres, SQLite gives a date string
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return str(value)[:10]
+
+
+async def get_topics_added_series(session: AsyncSession,
+                                  period: str = "week",
+                                  lab_names: Optional[list[str]] = None,
+                                  added_after: Optional[datetime] = None) -> dict:
+    """
+    Count topics added per week or month for each lab.
+
+    Args:
+        session (AsyncSession): Async database session.
+        period (str): "week" (starting Monday) or "month".
+        lab_names (list[str], optional): Only these labs.
+        added_after (datetime, optional): Only topics added after this date.
+
+    Returns:
+        dict: Per lab, the periods with topics added and the running total.
+    """
+    dialect = session.get_bind().dialect.name
+    try:
+        rows = (await session.execute(
+            topics_added_query(period, dialect, lab_names, added_after)
+        )).all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching topics added per period.")
+        raise
+
+    labs = {}
+    for lab_name, start, added, cumulative in rows:
+        labs.setdefault(lab_name, []).append({
+            "period_start": _period_label(start),
+            "added": added,
+            "cumulative": int(cumulative),
+        })
+    return {"period": period, "labs": labs}
+
+
+def _median_days(median_seconds) -> Optional[float]:
+    if median_seconds is None:
+        return None
+    return round(float(median_seconds) / 86400, 2)
+
+
+async def get_median_time_open(session: AsyncSession) -> dict:
+    """
+    Get the median number of days closed topics stayed open, overall and
+    per lab.
+
+    Returns:
+        dict: Overall and per-lab medians with the number of closed topics
+        they are based on.
+    """
+    dialect = session.get_bind().dialect.name
+    try:
+        overall = (await session.execute(
+            median_time_open_query(dialect, per_lab=False))).one()
+        rows = (await session.execute(median_time_open_query(dialect))).all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching median time open.")
+        raise
+
+    return {
+        "overall": {
+            "median_days_open": _median_days(overall[0]),
+            "closed_topics": overall[1] or 0,
+        },
+        "per_lab": {
+            lab_name: {
+                "median_days_open": _median_days(median),
+                "closed_topics": closed,
+            }
+            for lab_name, median, closed in rows
+        },
+    }
+
+
+async def get_posting_velocity(session: AsyncSession, days: int = 90,
+                               through: Optional[date] = None) -> dict:
+    """
+    Get each lab's posting velocity: topics added in the last `days` days,
+    the weekly rate, and the change against the preceding window.
+
+    The window covers whole days and ends with `through` (today by
+    default), so the result only changes with the data and the date.
+
+    Args:
+        session (AsyncSession): Async database session.
+        days (int): Window length in days.
+        through (date, optional): Last day of the window.
+
+    Returns:
+        dict: Window length and end, and per-lab velocity figures.
+    """
+    through = through or date.today()
+    window_end = datetime.combine(through + timedelta(days=1), time())
+    window_start = window_end - timedelta(days=days)
+    previous_start = window_start - timedelta(days=days)
+    try:
+        rows = (await session.execute(
+            posting_velocity_query(window_start, window_end, previous_start))).all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching posting velocity.")
+        raise
+
+    weeks = days / 7
+    return {
+        "window_days": days,
+        "window_end": through,
+        "per_lab": {
+            lab_name: {
+                "added": added,
+                "added_previous_window": previous,
+                "per_week": round(added / weeks, 2),
+                "trend": added - previous,
+                "last_added": last_added,
+            }
+            for lab_name, added, previous, last_added in rows
+        },
+    }
+
+
+# Tags and facets
+
+
+async def get_tagging_rows(session: AsyncSession):
+    """
+    Fetch (topic_id, title) rows of all topics for tag extraction.
+    """
+    try:
+        result = await session.execute(
+            select(ThesisTopic.topic_id, ThesisTopic.mt_title))
+        return result.all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching topics for tagging.")
+        raise
+
+
+async def update_topic_tags(session: AsyncSession,
+                            topic_tags: dict) -> tuple[int, Optional[int]]:
+    """
+    Bring the topic_tags table in line with freshly extracted tags:
+    insert missing (topic, tag) rows in bulk and delete stale ones, and
+    bump the data generation if anything changed.
+
+    Args:
+        session (AsyncSession): Async database session.
+        topic_tags (dict): Mapping of topic_id to its set of tags.
+
+    Returns:
+        tuple: Number of rows inserted or deleted, and the new data
+        generation (None if nothing changed).
+    """
+    try:
+        existing = set((await session.execute(
+            select(TopicTag.topic_id, TopicTag.tag))).tuples())
+        wanted = {(topic_id, tag)
+                  for topic_id, tags in topic_tags.items() for tag in tags}
+        to_insert = wanted - existing
+        to_delete = existing - wanted
+
+        if to_insert:
+            await session.execute(insert(TopicTag), [
+                {"topic_id": topic_id, "tag": tag} for topic_id, tag in to_insert])
+        if to_delete:
+            connection = await session.connection()
+            await connection.execute(
+                delete(TopicTag).where(TopicTag.topic_id == bindparam("b_topic_id"),
+                                       TopicTag.tag == bindparam("b_tag")),
+                [{"b_topic_id": topic_id, "b_tag": tag} for topic_id, tag in to_delete])
+        generation = None
+        if to_insert or to_delete:
+            generation = await bump_data_generation(session)
+        await session.commit()
+        logger.info(
+            f"Topic tags updated: {len(to_insert)} added, {len(to_delete)} removed.")
+        return len(to_insert) + len(to_delete), generation
+    except SQLAlchemyError as e:
+        await session.rollback()
+        logger.exception("Failed to update topic tags.")
+        raise
+
+
+async def get_facet_counts(session: AsyncSession,
+                           status: Optional[TopicStatus] = None,
+                           lab_names: Optional[list[str]] = None,
+                           tags: Optional[list[str]] = None) -> dict:
+    """
+    Get topic counts per tag, lab and status in one aggregate query.
+
+    Args:
+        session (AsyncSession): Async database session.
+        status (TopicStatus, optional): Status filter.
+        lab_names (list[str], optional): Lab filter.
+        tags (list[str], optional): Tag filter (any of the tags).
+
+    Returns:
+        dict: Number of matching topics and the counts per facet value.
+    """
+    try:
+        rows = (await session.execute(
+            facet_counts_query(status, lab_names, tags))).all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching facet counts.")
+        raise
+
+    facets = {"tag": {}, "lab": {}, "status": {}}
+    for facet, value, count in rows:
+        if facet == "status":
+            value = TopicStatus[value].value
+        facets[facet][value] = count
+    total = (facets["status"].get(status.value, 0) if status is not None
+             else sum(facets["status"].values()))
+    return {
+        "total": total,
+        "tags": dict(sorted(facets["tag"].items(), key=lambda item: -item[1])),
+        "labs": dict(sorted(facets["lab"].items())),
+        "status": facets["status"],
+    }
+
+
+# Search
+
+
+async def get_search_rows(session: AsyncSession):
+    """
+    Fetch (topic_id, title, url, status, lab_name) rows for building the
+    in-process search index.
+    """
+    try:
+        result = await session.execute(
+            select(ThesisTopic.topic_id, ThesisTopic.mt_title, ThesisTopic.mt_url,
+                   ThesisTopic.status, Lab.lab_name)
+            .join(Lab, Lab.lab_id == ThesisTopic.lab_id)
+        )
+        return result.all()
+    except SQLAlchemyError as e:
+        logger.exception("Error fetching topics for the search index.")
+        raise
+
+
+def _search_columns(score):
+    return select(ThesisTopic.topic_id, ThesisTopic.mt_title, ThesisTopic.mt_url,
+                  ThesisTopic.status, Lab.lab_name, score.label("score")
+                  ).join(Lab, Lab.lab_id == ThesisTopic.lab_id)
+
+
+def _search_rows_to_dicts(rows) -> list[dict]:
+    return [
+        {"topic_id": topic_id, "title": title, "url": url, "status": status,
+         "lab_name": lab_name, "score": round(float(score), 4)}
+        for topic_id, title, url, status, lab_name, score in rows
+    ]
+
+
+async def search_topics_fulltext(session: AsyncSession, tsquery: str, limit: int,
+                                 status: Optional[TopicStatus] = None,
+                                 lab_names: Optional[list[str]] = None) -> list[dict]:
+    """
+    Ranked Postgres full-text search over titles (English and German
+    configurations), served by the GIN index on the same expression.
+    """
+    document = text(TITLE_TSVECTOR_SQL)
+    query = func.to_tsquery(text("'english'"), tsquery).op("||")(
+        func.to_tsquery(text("'german'"), tsquery))
+    statement = (
+        _search_columns(func.ts_rank_cd(document, query))
+        .where(document.op("@@")(query))
+        .where(*topic_filters(status, lab_names))
+        .order_by(text("score DESC"))
+        .limit(limit)
+    )
+    try:
+        return _search_rows_to_dicts((await session.execute(statement)).all())
+    except SQLAlchemyError as e:
+        logger.exception("Error running full-text search.")
+        raise
+
+
+async def search_topics_trigram(session: AsyncSession, query: str, limit: int,
+                                status: Optional[TopicStatus] = None,
+                                lab_names: Optional[list[str]] = None) -> list[dict]:
+    """
+    Typo-tolerant fallback using pg_trgm word similarity. Returns an empty
+    list when the pg_trgm extension is not installed.
+    """
+    installed = await session.scalar(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+    if not installed:
+        return []
+    similarity = func.word_similarity(query, ThesisTopic.mt_title)
+    statement = (
+        _search_columns(similarity)
+        .where(similarity > 0.3)
+        .where(*topic_filters(status, lab_names))
+        .order_by(text("score DESC"))
+        .limit(limit)
+    )
+    try:
+        return _search_rows_to_dicts((await session.execute(statement)).all())
+    except SQLAlchemyError as e:
+        logger.exception("Error running trigram search.")
+        raise
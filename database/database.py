@@ -1,12 +1,46 @@
-from .models import SessionLocal
+from .engine import (
+    get_session_factory,
+    get_async_session_factory,
+    get_read_session_factory,
+    get_async_read_session_factory,
+)
 
 
 def get_db():
     """
     Dependency for managing database sessions.
     """
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency for managing async database sessions.
+    """
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+def get_read_db():
+    """
+    Dependency for read-only database sessions, bound to the read replica
+    (or the primary when no replica is configured).
+    """
+    db = get_read_session_factory()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """
+    Dependency for read-only async database sessions, bound to the read
+    replica (or the primary when no replica is configured).
+    """
+    async with get_async_read_session_factory()() as db:
+        yield db
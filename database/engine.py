@@ -0,0 +1,380 @@
+from dataclasses import dataclass
+from typing import Optional
+import logging
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from .instrumentation import instrument_engine
+
+
+# Load environment variables
+load_dotenv(dotenv_path="./environment/.env")
+logger = logging.getLogger(__name__)
+
+# Async drivers used for each sync backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# In-memory SQLite database shared by every connection of the process (the
+# sync, async and replica engines alike). A plain ":memory:" database is
+# private to its connection, so each engine would see its own empty one.
+SHARED_MEMORY_URL = "sqlite:///file:thesis_tracker?mode=memory&cache=shared&uri=true"
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return int(value)
+
+
+def build_database_url() -> str:
+    """
+    Build the SQLAlchemy URL from the environment.
+
+    - SQLALCHEMY_DATABASE_URL, if set, is used as is.
+    - DATABASE_BACKEND=sqlite uses SQLITE_PATH (a file path or ":memory:",
+      see SHARED_MEMORY_URL).
+    - Otherwise a Postgres URL is built from DATABASE_USER, DATABASE_PASSWORD,
+      DATABASE_HOST, DATABASE_PORT and DATABASE_NAME.
+
+    Raises:
+        ValueError: If a Postgres variable is missing.
+    """
+    explicit_url = os.getenv("SQLALCHEMY_DATABASE_URL")
+    if explicit_url:
+        return explicit_url
+
+    if os.getenv("DATABASE_BACKEND", "postgresql").lower() == "sqlite":
+        sqlite_path = os.getenv("SQLITE_PATH", "./thesis_tracker.db")
+        if sqlite_path == ":memory:":
+            return SHARED_MEMORY_URL
+        return f"sqlite:///{sqlite_path}"
+
+    database_user = os.getenv("DATABASE_USER")
+    database_password = os.getenv("DATABASE_PASSWORD")
+    database_host = os.getenv("DATABASE_HOST")
+    database_port = os.getenv("DATABASE_PORT")
+    database_name = os.getenv("DATABASE_NAME")
+
+    if None in [database_user, database_password, database_host, database_port, database_name]:
+        raise ValueError(
+            "Database URL construction failed due to environment variable.")
+
+    return f"postgresql://{database_user}:{database_password}@{database_host}:{database_port.strip()}/{database_name}"
+
+
+def build_replica_url() -> Optional[str]:
+    """
+    Build the read replica URL from the environment, if one is configured.
+
+    - DATABASE_REPLICA_URL, if set, is used as is.
+    - With DATABASE_BACKEND=sqlite, SQLITE_REPLICA_PATH points at a second
+      database file, which makes the routing testable locally.
+    """
+    replica_url = os.getenv("DATABASE_REPLICA_URL")
+    if replica_url:
+        return replica_url
+
+    sqlite_replica_path = os.getenv("SQLITE_REPLICA_PATH")
+    if sqlite_replica_path and os.getenv("DATABASE_BACKEND", "postgresql").lower() == "sqlite":
+        return f"sqlite:///{sqlite_replica_path}"
+
+    return None
+
+
+def to_async_url(url: str) -> str:
+    """
+    Swap the driver of a sync URL for its async counterpart
+    (asyncpg for Postgres, aiosqlite for SQLite).
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for backend '{backend}'.")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+@dataclass
+class DatabaseSettings:
+    """
+    Engine configuration, read from the environment by `from_env`.
+    """
+    url: str
+    replica_url: Optional[str] = None
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800
+    pool_timeout: int = 30
+    statement_timeout_ms: Optional[int] = None
+    echo: bool = False
+
+    @classmethod
+    def from_env(cls) -> "DatabaseSettings":
+        return cls(
+            url=build_database_url(),
+            replica_url=build_replica_url(),
+            pool_size=_env_int("DATABASE_POOL_SIZE", 5),
+            max_overflow=_env_int("DATABASE_MAX_OVERFLOW", 10),
+            pool_pre_ping=_env_bool("DATABASE_POOL_PRE_PING", True),
+            pool_recycle=_env_int("DATABASE_POOL_RECYCLE", 1800),
+            pool_timeout=_env_int("DATABASE_POOL_TIMEOUT", 30),
+            statement_timeout_ms=_env_int(
+                "DATABASE_STATEMENT_TIMEOUT_MS", None),
+            echo=_env_bool("DATABASE_ECHO", False),
+        )
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory(url: str) -> bool:
+    parsed = make_url(url)
+    return _is_sqlite(url) and (parsed.database in (None, "", ":memory:")
+                                or parsed.query.get("mode") == "memory")
+
+
+def shared_memory_url(url: str) -> str:
+    """
+    Replace a private in-memory SQLite URL ("sqlite://" or ":memory:") with
+    SHARED_MEMORY_URL, so all engines of the process use the same database.
+    Other URLs are returned unchanged.
+    """
+    if _is_memory(url) and make_url(url).query.get("mode") != "memory":
+        return SHARED_MEMORY_URL
+    return url
+
+
+def _engine_kwargs(settings: DatabaseSettings, url: str, is_async: bool) -> dict:
+    """
+    Translate settings into create_engine keyword arguments for the backend.
+    """
+    kwargs = {"echo": settings.echo}
+
+    if _is_sqlite(url):
+        connect_args = {"check_same_thread": False}
+        if settings.statement_timeout_ms:
+            # SQLite has no statement timeout; the busy timeout is the
+            # closest knob (how long to wait on a locked database).
+            connect_args["timeout"] = settings.statement_timeout_ms / 1000
+        kwargs["connect_args"] = connect_args
+        if _is_memory(url):
+            # A single connection per engine, held until the engine is
+            # disposed: the shared in-memory database only lives while a
+            # connection to it is open.
+            kwargs["poolclass"] = StaticPool
+        return kwargs
+
+    kwargs.update(
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_pre_ping=settings.pool_pre_ping,
+        pool_recycle=settings.pool_recycle,
+        pool_timeout=settings.pool_timeout,
+    )
+    if settings.statement_timeout_ms:
+        if is_async:
+            kwargs["connect_args"] = {"server_settings": {
+                "statement_timeout": str(settings.statement_timeout_ms)}}
+        else:
+            kwargs["connect_args"] = {
+                "options": f"-c statement_timeout={settings.statement_timeout_ms}"}
+    return kwargs
+
+
+def _enable_sqlite_pragmas(engine: Engine):
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+
+def create_db_engine(settings: DatabaseSettings, url: Optional[str] = None) -> Engine:
+    """
+    Create a sync engine from the given settings, for the primary URL
+    unless another one (e.g. the replica) is given.
+    """
+    url = shared_memory_url(url or settings.url)
+    engine = create_engine(url, **_engine_kwargs(settings, url, False))
+    if _is_sqlite(url) and not _is_memory(url):
+        _enable_sqlite_pragmas(engine)
+    instrument_engine(engine)
+    return engine
+
+
+def create_async_db_engine(settings: DatabaseSettings, url: Optional[str] = None) -> AsyncEngine:
+    """
+    Create an async engine from the given settings, for the primary URL
+    unless another one (e.g. the replica) is given.
+    """
+    url = shared_memory_url(url or settings.url)
+    engine = create_async_engine(
+        to_async_url(url), **_engine_kwargs(settings, url, True))
+    if _is_sqlite(url) and not _is_memory(url):
+        _enable_sqlite_pragmas(engine.sync_engine)
+    instrument_engine(engine.sync_engine)
+    return engine
+
+
+# Engines are created lazily, at app startup or on first use, never at import.
+# Reads go to the replica engines, which are the primary ones when no
+# replica is configured.
+_settings: Optional[DatabaseSettings] = None
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_replica_engine: Optional[Engine] = None
+_replica_async_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[sessionmaker] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_read_session_factory: Optional[sessionmaker] = None
+_async_read_session_factory: Optional[async_sessionmaker] = None
+
+
+def init_engines(settings: Optional[DatabaseSettings] = None) -> DatabaseSettings:
+    """
+    Create the primary (and optional replica) engines and their session
+    factories. Called from the app lifespan. Engines that already exist
+    are kept (their connections would leak if replaced here, and async
+    engines can only be disposed of from a coroutine); to switch to other
+    settings, use `reinit_engines`.
+    """
+    global _settings, _engine, _async_engine, _replica_engine, _replica_async_engine
+    global _session_factory, _async_session_factory, _read_session_factory, _async_read_session_factory
+
+    if _settings is not None:
+        if settings is not None and settings != _settings:
+            raise RuntimeError(
+                "Database engines are already initialized; use reinit_engines to reconfigure them.")
+        return _settings
+
+    settings = settings or DatabaseSettings.from_env()
+    _settings = settings
+    _engine = create_db_engine(settings)
+    _async_engine = create_async_db_engine(settings)
+
+    if settings.replica_url:
+        _replica_engine = create_db_engine(settings, settings.replica_url)
+        _replica_async_engine = create_async_db_engine(
+            settings, settings.replica_url)
+    else:
+        _replica_engine = _engine
+        _replica_async_engine = _async_engine
+
+    _session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=_engine)
+    _async_session_factory = async_sessionmaker(
+        bind=_async_engine, autoflush=False, expire_on_commit=False)
+    _read_session_factory = sessionmaker(
+        autocommit=False, autoflush=False, bind=_replica_engine)
+    _async_read_session_factory = async_sessionmaker(
+        bind=_replica_async_engine, autoflush=False, expire_on_commit=False)
+
+    logger.info(
+        f"Database engines initialized for {make_url(settings.url).render_as_string(hide_password=True)}")
+    if settings.replica_url:
+        logger.info(
+            f"Read queries routed to replica {make_url(settings.replica_url).render_as_string(hide_password=True)}")
+    return settings
+
+
+async def reinit_engines(settings: Optional[DatabaseSettings] = None) -> DatabaseSettings:
+    """
+    Dispose of the current engines (see `dispose_engines`) and create new
+    ones from `settings`, or from the environment.
+    """
+    await dispose_engines()
+    return init_engines(settings)
+
+
+def get_settings() -> DatabaseSettings:
+    if _settings is None:
+        init_engines()
+    return _settings
+
+
+def get_engine() -> Engine:
+    if _engine is None:
+        init_engines()
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    if _async_engine is None:
+        init_engines()
+    return _async_engine
+
+
+def get_replica_engine() -> Engine:
+    if _replica_engine is None:
+        init_engines()
+    return _replica_engine
+
+
+def get_replica_async_engine() -> AsyncEngine:
+    if _replica_async_engine is None:
+        init_engines()
+    return _replica_async_engine
+
+
+def get_session_factory() -> sessionmaker:
+    if _session_factory is None:
+        init_engines()
+    return _session_factory
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    if _async_session_factory is None:
+        init_engines()
+    return _async_session_factory
+
+
+def get_read_session_factory() -> sessionmaker:
+    if _read_session_factory is None:
+        init_engines()
+    return _read_session_factory
+
+
+def get_async_read_session_factory() -> async_sessionmaker:
+    if _async_read_session_factory is None:
+        init_engines()
+    return _async_read_session_factory
+
+
+async def dispose_engines():
+    """
+    Close all pooled connections. Called on app shutdown.
+    """
+    global _settings, _engine, _async_engine, _replica_engine, _replica_async_engine
+    global _session_factory, _async_session_factory, _read_session_factory, _async_read_session_factory
+
+    if _replica_async_engine is not None and _replica_async_engine is not _async_engine:
+        await _replica_async_engine.dispose()
+    if _replica_engine is not None and _replica_engine is not _engine:
+        _replica_engine.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+    _settings = _engine = _async_engine = None
+    _replica_engine = _replica_async_engine = None
+    _session_factory = _async_session_factory = None
+    _read_session_factory = _async_read_session_factory = None
@@ -0,0 +1,47 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements executed and time spent in the database, for one request.
+    """
+    queries: int = 0
+    seconds: float = 0.0
+
+
+# Set by the request instrumentation middleware; engine events add to the
+# stats of the request they run for. Async sessions run their statements
+# in greenlets that share the calling task's context, and threadpool
+# calls copy it, so both end up here.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_query_stats.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is None or started is None:
+        return
+    stats.queries += 1
+    stats.seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine: Engine):
+    """
+    Count statements and database time per request on a sync engine (for
+    an async engine, pass its `sync_engine`).
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,201 @@
+import base64
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import String, and_, cast, exists, func, literal, or_, select, union_all
+
+from .models import Lab, ThesisTopic, TopicStatus, TopicTag
+
+
+# Shared query building for the lab/topic listings in async_crud.py
+
+
+def topic_filters(status: Optional[TopicStatus] = None,
+                  lab_names: Optional[list[str]] = None,
+                  added_after: Optional[datetime] = None,
+                  tags: Optional[list[str]] = None) -> list:
+    """
+    Build the WHERE clauses for the optional listing filters. A topic
+    passes the tag filter if it has any of the tags.
+    """
+    clauses = []
+    if status is not None:
+        clauses.append(ThesisTopic.status == status)
+    if lab_names:
+        clauses.append(Lab.lab_name.in_(lab_names))
+    if added_after is not None:
+        clauses.append(ThesisTopic.added_date > added_after)
+    if tags:
+        clauses.append(exists().where(TopicTag.topic_id == ThesisTopic.topic_id,
+                                      TopicTag.tag.in_(tags)))
+    return clauses
+
+
+def labs_with_topics_query(status: Optional[TopicStatus] = None,
+                           lab_names: Optional[list[str]] = None,
+                           added_after: Optional[datetime] = None,
+                           tags: Optional[list[str]] = None):
+    """
+    Single query returning every lab joined with its (filtered) topics.
+    Topic filters go into the join condition so labs without matching
+    topics are still listed.
+    """
+    topic_clauses = topic_filters(
+        status=status, added_after=added_after, tags=tags)
+    query = (
+        select(
+            Lab.lab_id, Lab.lab_name, Lab.lab_url,
+            ThesisTopic.topic_id, ThesisTopic.mt_title,
+            ThesisTopic.status, ThesisTopic.mt_url,
+        )
+        .outerjoin(ThesisTopic, and_(Lab.lab_id == ThesisTopic.lab_id, *topic_clauses))
+        .order_by(Lab.lab_id, ThesisTopic.topic_id)
+    )
+    if lab_names:
+        query = query.where(Lab.lab_name.in_(lab_names))
+    return query
+
+
+def topics_query(status: Optional[TopicStatus] = None,
+                 lab_names: Optional[list[str]] = None,
+                 added_after: Optional[datetime] = None,
+                 tags: Optional[list[str]] = None):
+    """
+    Filtered (lab, topic) rows ordered by (lab_id, topic_id).
+    """
+    return (
+        select(
+            Lab.lab_id, Lab.lab_name, Lab.lab_url,
+            ThesisTopic.topic_id, ThesisTopic.mt_title,
+            ThesisTopic.status, ThesisTopic.mt_url,
+        )
+        .join(ThesisTopic, Lab.lab_id == ThesisTopic.lab_id)
+        .where(*topic_filters(status, lab_names, added_after, tags))
+        .order_by(ThesisTopic.lab_id, ThesisTopic.topic_id)
+    )
+
+
+def topics_page_query(limit: int,
+                      cursor: Optional[tuple[int, int]] = None,
+                      status: Optional[TopicStatus] = None,
+                      lab_names: Optional[list[str]] = None,
+                      added_after: Optional[datetime] = None,
+                      tags: Optional[list[str]] = None):
+    """
+    Keyset-paginated topics ordered by (lab_id, topic_id), fetching one
+    extra row to tell whether there is a next page.
+    """
+    query = topics_query(status, lab_names, added_after, tags).limit(limit + 1)
+    if cursor is not None:
+        last_lab_id, last_topic_id = cursor
+        query = query.where(or_(
+            ThesisTopic.lab_id > last_lab_id,
+            and_(ThesisTopic.lab_id == last_lab_id,
+                 ThesisTopic.topic_id > last_topic_id),
+        ))
+    return query
+
+
+def topics_export_query(status: Optional[TopicStatus] = None,
+                        lab_names: Optional[list[str]] = None,
+                        added_after: Optional[datetime] = None,
+                        added_before: Optional[datetime] = None,
+                        tags: Optional[list[str]] = None):
+    """
+    Flat topic rows for bulk export, ordered by topic_id.
+    """
+    query = (
+        select(
+            ThesisTopic.topic_id, ThesisTopic.lab_id, Lab.lab_name,
+            ThesisTopic.mt_title, ThesisTopic.mt_url,
+            ThesisTopic.status, ThesisTopic.added_date,
+        )
+        .join(Lab, Lab.lab_id == ThesisTopic.lab_id)
+        .where(*topic_filters(status, lab_names, added_after, tags))
+        .order_by(ThesisTopic.topic_id)
+    )
+    if added_before is not None:
+        query = query.where(ThesisTopic.added_date < added_before)
+    return query
+
+
+def labs_export_query(lab_names: Optional[list[str]] = None):
+    """
+    Lab rows for bulk export, ordered by lab_id.
+    """
+    query = select(Lab.lab_id, Lab.lab_name, Lab.lab_url).order_by(Lab.lab_id)
+    if lab_names:
+        query = query.where(Lab.lab_name.in_(lab_names))
+    return query
+
+
+def facet_counts_query(status: Optional[TopicStatus] = None,
+                       lab_names: Optional[list[str]] = None,
+                       tags: Optional[list[str]] = None):
+    """
+    Topic counts per tag, lab and status as (facet, value, count) rows,
+    from one UNION ALL statement. Each facet is counted under the other
+    facets' filters but not its own, so the alternatives to a selected
+    value keep their counts.
+    """
+    def counts(name: str, value, filters: list, *joins):
+        query = select(literal(name, String), cast(value, String), func.count()).select_from(ThesisTopic)
+        for target, on in joins:
+            query = query.join(target, on)
+        return query.where(*filters).group_by(value)
+
+    lab_join = (Lab, Lab.lab_id == ThesisTopic.lab_id)
+    tag_join = (TopicTag, TopicTag.topic_id == ThesisTopic.topic_id)
+    return union_all(
+        counts("tag", TopicTag.tag, topic_filters(status, lab_names), lab_join, tag_join),
+        counts("lab", Lab.lab_name, topic_filters(status, tags=tags), lab_join),
+        counts("status", ThesisTopic.status, topic_filters(
+            lab_names=lab_names, tags=tags), lab_join),
+    )
+
+
+def encode_cursor(lab_id: int, topic_id: int) -> str:
+    """
+    Encode the position of the last returned topic as an opaque cursor.
+    """
+    return base64.urlsafe_b64encode(f"{lab_id}:{topic_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        lab_id, topic_id = base64.urlsafe_b64decode(
+            padded.encode()).decode().split(":")
+        return int(lab_id), int(topic_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def group_topics_by_lab(rows: Iterable) -> list[dict]:
+    """
+    Group ordered (lab, topic) rows into the nested lab/topics structure
+    returned by the API. Rows with no topic (outer join) give empty labs.
+    """
+    result = []
+    current_lab_id = None
+    for lab_id, lab_name, lab_url, topic_id, title, status, url in rows:
+        if lab_id != current_lab_id:
+            current_lab_id = lab_id
+            result.append({
+                "lab_name": lab_name,
+                "lab_url": lab_url,
+                "topics": [],
+            })
+        if topic_id is not None:
+            result[-1]["topics"].append({
+                "title": title,
+                "status": status,
+                "url": url,
+            })
+    return result
@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import logging
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to take a lock held by another process
+LOCK_POLL_INTERVAL = 0.5
+
+
+def advisory_lock_key(name: str) -> int:
+    """
+    Stable signed 64-bit key for a Postgres advisory lock name.
+    """
+    digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@asynccontextmanager
+async def writer_lock(engine: AsyncEngine, name: str):
+    """
+    Hold a lock named `name` across all processes using the database,
+    waiting for it if another process holds it.
+
+    Postgres uses a session-level advisory lock on a dedicated connection.
+    SQLite has no advisory locks, so a lock file next to the database
+    file stands in (in-memory databases are private to the process and
+    need none).
+    """
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        async with _advisory_lock(engine, name):
+            yield
+    elif (dialect == "sqlite" and engine.url.database not in (None, "", ":memory:")
+          and engine.url.query.get("mode") != "memory"):
+        async with _file_lock(f"{engine.url.database}.{name}.lock", name):
+            yield
+    else:
+        yield
+
+
+@asynccontextmanager
+async def _advisory_lock(engine: AsyncEngine, name: str):
+    key = advisory_lock_key(name)
+    async with engine.connect() as conn:
+        # No transaction left open on the lock connection while it waits
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        waiting = False
+        while not await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": key}):
+            if not waiting:
+                logger.info(f"Waiting for the {name} lock held by another process.")
+                waiting = True
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+
+
+@asynccontextmanager
+async def _file_lock(path: str, name: str):
+    from filelock import FileLock, Timeout
+
+    # Polled without blocking, so waiting never ties up a thread and
+    # cancelling the wait cannot leave the lock taken
+    lock = FileLock(path, thread_local=False)
+    waiting = False
+    while True:
+        try:
+            lock.acquire(timeout=0)
+            break
+        except Timeout:
+            if not waiting:
+                logger.info(f"Waiting for the {name} lock held by another process.")
+                waiting = True
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        lock.release()
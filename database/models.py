@@ -1,38 +1,26 @@
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, ForeignKey, Enum
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, Index, text
+from sqlalchemy import case, exists, func, insert, literal, select
+from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 from sqlalchemy import inspect
 import logging
-import os
-from dotenv import load_dotenv
 from sqlalchemy.exc import SQLAlchemyError
 import enum
 
+from .engine import get_engine, get_async_engine, get_replica_engine, get_replica_async_engine
 
-# Load environment variables
-load_dotenv(dotenv_path="./environment/.env")
-logger = logging.getLogger(__name__)
 
+logger = logging.getLogger(__name__)
 
-# Dynamically construct the DATABASE_URL
-DATABASE_USER = os.getenv("DATABASE_USER")
-DATABASE_PASSWORD = os.getenv("DATABASE_PASSWORD")
-DATABASE_HOST = os.getenv("DATABASE_HOST")
-DATABASE_PORT = os.getenv("DATABASE_PORT")
-DATABASE_NAME = os.getenv("DATABASE_NAME")
 
-DATABASE_URL = f"postgresql://{DATABASE_USER}:{DATABASE_PASSWORD}@{DATABASE_HOST}:{DATABASE_PORT}/{DATABASE_NAME}"
+# SQLAlchemy setup; engines are created lazily in engine.py
+Base = declarative_base()
 
-if None in [DATABASE_USER, DATABASE_PASSWORD, DATABASE_HOST, DATABASE_PORT, DATABASE_NAME]:
-    raise ValueError(
-        "Database URL construction failed due to environment variable.")
 
-
-# SQLAlchemy setup
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+# Title document for Postgres full-text search; queries must use the same
+# expression for the GIN index to apply.
+TITLE_TSVECTOR_SQL = "(to_tsvector('english', mt_title) || to_tsvector('german', mt_title))"
 
 
 class TopicStatus(enum.Enum):
@@ -63,18 +51,130 @@ class ThesisTopic(Base):
     added_date = Column(DateTime, default=datetime.now)
     status = Column(Enum(TopicStatus), default=TopicStatus.OPEN)
     lab_id = Column(Integer, ForeignKey("labs.lab_id"), nullable=False)
+    # Change feed: sequence number and kind ("inserted", "closed",
+    # "reopened") of the last change the sync made to this topic
+    change_seq = Column(Integer, index=True)
+    change_type = Column(String, default="inserted")
+    updated_at = Column(DateTime, default=datetime.now)
 
     lab = relationship("Lab", back_populates="thesis_topics")
 
+    __table_args__ = (
+        # Keyset pagination order of /api/thesis_topics
+        Index("ix_mt_thesis_topic_lab_id_topic_id", "lab_id", "topic_id"),
+        Index("ix_mt_thesis_topic_status", "status"),
+        Index("ix_mt_thesis_topic_added_date", "added_date"),
+        # Full-text search over titles in both languages (Postgres only)
+        Index("ix_mt_thesis_topic_title_fts", text(TITLE_TSVECTOR_SQL),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
+
+# Define the lab_stats table
+
+
+class LabStats(Base):
+    """
+    Per-lab topic counts, maintained incrementally by the sync so insights
+    can be read in O(labs) instead of counting topics.
+    """
+    __tablename__ = "lab_stats"
+
+    lab_id = Column(Integer, ForeignKey("labs.lab_id"), primary_key=True)
+    open_count = Column(Integer, nullable=False, default=0)
+    closed_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now,
+                        onupdate=datetime.now)
+
+# Define the topic_tags table
+
+
+class TopicTag(Base):
+    """
+    Research-area tags of a topic, extracted from its title by the sync.
+    """
+    __tablename__ = "topic_tags"
+
+    topic_id = Column(Integer, ForeignKey("mt_thesis_topic.topic_id"), primary_key=True)
+    tag = Column(String, primary_key=True)
+
+    __table_args__ = (
+        # Tag filters and facet counts
+        Index("ix_topic_tags_tag_topic_id", "tag", "topic_id"),
+    )
+
+# Define the data_generation table
+
+
+class DataGenerationCounter(Base):
+    """
+    Single-row counter incremented in the transaction of every write that
+    changes what the API returns, so each process can tell with one
+    primary-key read whether anything changed since it last looked,
+    including writes made by other processes.
+    """
+    __tablename__ = "data_generation"
+
+    id = Column(Integer, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+
 # Create the database tables
 
 
+def _upgrade_existing_tables(sync_conn, existing_tables):
+    """
+    `create_all` skips tables that already exist, so columns and indexes
+    added to the models later are created here for those tables.
+    New columns are added as nullable.
+    """
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {
+            column["name"] for column in inspect(sync_conn).get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(dialect=sync_conn.dialect)
+                sync_conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"Column added: {table.name}.{column.name}")
+        for index in table.indexes:
+            index.create(bind=sync_conn, checkfirst=True)
+
+    # Topics from before the change feed enter it as inserts, in id order
+    sync_conn.execute(text(
+        "UPDATE mt_thesis_topic SET change_seq = topic_id, change_type = 'inserted', "
+        "updated_at = added_date WHERE change_seq IS NULL"))
+
+    # Labs without a lab_stats row (all of them when the table was just
+    # added) get their counts from the topics table
+    counts = (
+        select(
+            Lab.lab_id,
+            func.count(case((ThesisTopic.status == TopicStatus.OPEN, 1))),
+            func.count(case((ThesisTopic.status == TopicStatus.CLOSED, 1))),
+            literal(datetime.now(), DateTime),
+        )
+        .outerjoin(ThesisTopic, Lab.lab_id == ThesisTopic.lab_id)
+        .where(~exists().where(LabStats.lab_id == Lab.lab_id))
+        .group_by(Lab.lab_id)
+    )
+    backfilled = sync_conn.execute(insert(LabStats).from_select(
+        ["lab_id", "open_count", "closed_count", "updated_at"], counts)).rowcount
+    if backfilled:
+        logger.info(f"Lab stats backfilled for {backfilled} labs.")
+
+    if sync_conn.execute(select(DataGenerationCounter.id)).first() is None:
+        sync_conn.execute(insert(DataGenerationCounter).values(id=1, generation=0))
+
+
 def init_db():
     """
     Initialize the database by creating tables if they do not already exist.
     Logs the status of table creation.
     """
     try:
+        engine = get_engine()
+
         # Inspect the existing tables
         inspector = inspect(engine)
         existing_tables = inspector.get_table_names()
@@ -86,6 +186,14 @@ def init_db():
 
         # Create tables if they do not exist
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            _upgrade_existing_tables(conn, existing_tables)
+
+        replica_engine = get_replica_engine()
+        if replica_engine is not engine and replica_engine.dialect.name == "sqlite":
+            # Local two-file setups have no real replication; make sure the
+            # replica at least has the schema so reads don't fail.
+            Base.metadata.create_all(bind=replica_engine)
 
         # Log which tables were created
         for table_name in Base.metadata.tables:
@@ -97,3 +205,39 @@ def init_db():
     except SQLAlchemyError as e:
         logger.exception(f"Error initializing database tables: {e}")
         raise
+
+
+async def async_init_db():
+    """
+    Async counterpart of `init_db`, creating missing tables through the
+    async engine without blocking the event loop.
+    """
+    try:
+        async with get_async_engine().begin() as conn:
+            existing_tables = await conn.run_sync(
+                lambda sync_conn: inspect(sync_conn).get_table_names())
+
+            if existing_tables:
+                logger.info(f"Existing tables: {existing_tables}")
+            else:
+                logger.info("No existing tables found. Creating tables...")
+
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(_upgrade_existing_tables, existing_tables)
+
+        replica_engine = get_replica_async_engine()
+        if replica_engine is not get_async_engine() and replica_engine.dialect.name == "sqlite":
+            # Local two-file setups have no real replication; make sure the
+            # replica at least has the schema so reads don't fail.
+            async with replica_engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        for table_name in Base.metadata.tables:
+            if table_name not in existing_tables:
+                logger.info(f"Table created: {table_name}")
+            else:
+                logger.info(f"Table already exists: {table_name}")
+
+    except SQLAlchemyError as e:
+        logger.exception(f"Error initializing database tables: {e}")
+        raise
@@ -1,6 +1,8 @@
-from pydantic import BaseModel, HttpUrl, Field
-from typing import List, Optional, Union
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, HttpUrl, Field
+from typing import Dict, List, Optional, Union
+from datetime import date, datetime
+
+from .models import TopicStatus
 
 
 class LabCreate(BaseModel):
@@ -20,8 +22,7 @@ class LabResponse(BaseModel):
     lab_name: str
     lab_url: Union[HttpUrl, str]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ThesisTopicResponse(BaseModel):
@@ -31,5 +32,118 @@ class ThesisTopicResponse(BaseModel):
     added_date: datetime
     lab_id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Read API responses. Routes declare these as their response models; the
+# data itself is built from row tuples and serialized without validation
+# (see backend/app/cache.py), so they must describe what the queries return.
+
+
+class TopicItem(BaseModel):
+    title: str
+    status: TopicStatus
+    url: str
+
+
+class LabWithTopics(BaseModel):
+    lab_name: str
+    lab_url: str
+    topics: List[TopicItem]
+
+
+class TopicsPage(BaseModel):
+    labs: List[LabWithTopics]
+    next_cursor: Optional[str]
+
+
+class TopicChange(BaseModel):
+    seq: int
+    change: str
+    changed_at: datetime
+    topic_id: int
+    title: str
+    url: str
+    status: TopicStatus
+    added_date: datetime
+    lab_name: str
+
+
+class TopicChanges(BaseModel):
+    changes: List[TopicChange]
+    next_cursor: int
+    has_more: bool
+
+
+class FacetCounts(BaseModel):
+    total: int
+    tags: Dict[str, int]
+    labs: Dict[str, int]
+    status: Dict[str, int]
+
+
+class ScoredTopic(BaseModel):
+    topic_id: int
+    title: str
+    url: str
+    status: TopicStatus
+    lab_name: str
+    score: float
+
+
+class SimilarTopics(BaseModel):
+    topic_id: int
+    similar: List[ScoredTopic]
+
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[ScoredTopic]
+
+
+class LabCounts(BaseModel):
+    open: int
+    closed: int
+
+
+class InsightsSummary(BaseModel):
+    total_labs: int
+    total_open_thesis: int
+    total_closed_thesis: int
+    thesis_per_lab: Dict[str, int]
+    per_lab: Dict[str, LabCounts]
+
+
+class PeriodCount(BaseModel):
+    period_start: str
+    added: int
+    cumulative: int
+
+
+class TopicsAddedSeries(BaseModel):
+    period: str
+    labs: Dict[str, List[PeriodCount]]
+
+
+class TimeOpen(BaseModel):
+    median_days_open: Optional[float]
+    closed_topics: int
+
+
+class MedianTimeOpen(BaseModel):
+    overall: TimeOpen
+    per_lab: Dict[str, TimeOpen]
+
+
+class LabVelocity(BaseModel):
+    added: int
+    added_previous_window: int
+    per_week: float
+    trend: int
+    last_added: Optional[datetime]
+
+
+class PostingVelocity(BaseModel):
+    window_days: int
+    window_end: date
+    per_lab: Dict[str, LabVelocity]
@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from sqlalchemy import Integer, and_, case, cast, extract, func, select
+
+from .models import Lab, ThesisTopic, TopicStatus
+
+
+# Query building for the time-series insights in async_crud.py. Date
+# arithmetic differs between Postgres and SQLite, so builders take the
+# dialect name of the session they will run on.
+
+Period = Literal["week", "month"]
+
+
+def period_start(period: Period, dialect: str):
+    """
+    Start of the week (Monday) or month containing `added_date`.
+    """
+    if dialect == "postgresql":
+        return func.date_trunc(period, ThesisTopic.added_date)
+    if period == "month":
+        return func.strftime("%Y-%m-01", ThesisTopic.added_date)
+    # strftime('%w') is 0 for Sunday; step back to the Monday
+    weekday = (cast(func.strftime("%w", ThesisTopic.added_date), Integer) + 6) % 7
+    return func.date(ThesisTopic.added_date, func.printf("-%d days", weekday))
+
+
+def seconds_between(start, end, dialect: str):
+    """
+    Seconds elapsed from `start` to `end`.
+    """
+    if dialect == "postgresql":
+        return extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400.0
+
+
+def topics_added_query(period: Period, dialect: str,
+                       lab_names: Optional[list[str]] = None,
+                       added_after: Optional[datetime] = None):
+    """
+    Topics added per period and lab, with a running total per lab (a
+    window over the grouped counts), ordered by lab and period.
+    """
+    # Bucket in a subquery so grouping and the window refer to one column
+    # rather than repeating an expression with bound parameters
+    topics = (
+        select(Lab.lab_name,
+               period_start(period, dialect).label("period_start"),
+               ThesisTopic.topic_id)
+        .join(ThesisTopic, Lab.lab_id == ThesisTopic.lab_id)
+    )
+    if lab_names:
+        topics = topics.where(Lab.lab_name.in_(lab_names))
+    if added_after is not None:
+        topics = topics.where(ThesisTopic.added_date > added_after)
+    topics = topics.subquery()
+
+    added = func.count(topics.c.topic_id)
+    return (
+        select(
+            topics.c.lab_name,
+            topics.c.period_start,
+            added.label("added"),
+            func.sum(added).over(
+                partition_by=topics.c.lab_name,
+                order_by=topics.c.period_start).label("cumulative"),
+        )
+        .group_by(topics.c.lab_name, topics.c.period_start)
+        .order_by(topics.c.lab_name, topics.c.period_start)
+    )
+
+
+def median_time_open_query(dialect: str, per_lab: bool = True):
+    """
+    Median seconds closed topics stayed open, overall or per lab.
+
+    Time open runs from `added_date` to the last change (`updated_at`),
+    which for a closed topic is its closing. Rows whose `updated_at` was
+    backfilled to `added_date` carry no closing time and are left out.
+    The median is taken from the middle row(s) of each partition, ranked
+    with window functions, which works on both Postgres and SQLite.
+    """
+    duration = seconds_between(
+        ThesisTopic.added_date, ThesisTopic.updated_at, dialect)
+    partition = [ThesisTopic.lab_id] if per_lab else []
+    ranked = (
+        select(
+            ThesisTopic.lab_id,
+            duration.label("duration"),
+            func.row_number().over(
+                partition_by=partition or None, order_by=duration).label("rn"),
+            func.count().over(partition_by=partition or None).label("cnt"),
+        )
+        .where(ThesisTopic.status == TopicStatus.CLOSED,
+               ThesisTopic.updated_at > ThesisTopic.added_date)
+        .subquery()
+    )
+    middle = ranked.c.rn.in_([(ranked.c.cnt + 1) // 2, (ranked.c.cnt + 2) // 2])
+    columns = [func.avg(ranked.c.duration), func.max(ranked.c.cnt)]
+    if not per_lab:
+        return select(*columns).where(middle)
+    return (
+        select(Lab.lab_name, *columns)
+        .join(ranked, Lab.lab_id == ranked.c.lab_id)
+        .where(middle)
+        .group_by(Lab.lab_name)
+        .order_by(Lab.lab_name)
+    )
+
+
+def posting_velocity_query(window_start: datetime, window_end: datetime,
+                           previous_start: datetime):
+    """
+    Per lab: topics added from `window_start` up to `window_end`, topics
+    added in the preceding window of the same length, and the latest
+    added date.
+    """
+    in_window = and_(ThesisTopic.added_date >= window_start,
+                     ThesisTopic.added_date < window_end)
+    in_previous = and_(ThesisTopic.added_date >= previous_start,
+                       ThesisTopic.added_date < window_start)
+    return (
+        select(
+            Lab.lab_name,
+            func.count(case((in_window, 1))),
+            func.count(case((in_previous, 1))),
+            func.max(ThesisTopic.added_date),
+        )
+        .outerjoin(ThesisTopic, Lab.lab_id == ThesisTopic.lab_id)
+        .group_by(Lab.lab_name)
+        .order_by(Lab.lab_name)
+    )
@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+
+# The app reads its configuration at import time, so point it at a
+# throwaway SQLite database before any test imports it
+_scratch = tempfile.mkdtemp(prefix="thesis_tracker_tests_")
+os.environ["DATABASE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(_scratch, "test.db")
+os.environ["LOG_DIR"] = os.path.join(_scratch, "logs")
+os.environ.pop("SQLALCHEMY_DATABASE_URL", None)
+os.environ.pop("DATABASE_REPLICA_URL", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import pytest
+
+
+def scraped_topics(lab: dict, titles: list[str]) -> list[dict]:
+    """
+    Scraper output for `lab` (lab_name, lab_url) listing `titles`, each
+    under its own URL.
+    """
+    return [{"lab_name": lab["lab_name"], "lab_url": lab["lab_url"],
+             "thesis_title": title,
+             "thesis_url": lab["lab_url"] + "/" + title.lower().replace(" ", "-")}
+            for title in titles]
+
+
+@pytest.fixture
+def run_with_database():
+    """
+    Run a coroutine function against freshly created engines, with the
+    schema set up as at app startup, and dispose the engines afterwards.
+    Everything runs on one event loop, as async connections require.
+    """
+    from database.engine import dispose_engines, init_engines
+    from database.models import async_init_db
+
+    def run(main):
+        async def run_main():
+            init_engines()
+            try:
+                await async_init_db()
+                return await main()
+            finally:
+                await dispose_engines()
+        return asyncio.run(run_main())
+    return run
+
+
+@pytest.fixture
+def sync_lab():
+    """
+    Sync `titles` as the complete scrape of one lab, in a session of its
+    own; further keyword arguments go to `sync_scraped_topics`. The sync
+    is scoped to that lab, so tests sharing the database do not close
+    each other's topics.
+    """
+    from database.engine import get_async_session_factory
+    from backend.app.routers.insert_thesis_topic import sync_scraped_topics
+
+    async def sync(lab: dict, titles: list[str], **options) -> dict:
+        async with get_async_session_factory()() as db:
+            return await sync_scraped_topics(db, [lab], scraped_topics(lab, titles),
+                                             lab_scope={lab["lab_name"]}, **options)
+    return sync
+
+
+@pytest.fixture
+def client():
+    """
+    TestClient for the app, started up (engines and schema) for the
+    duration of the test. Coroutines that use the database, like the ones
+    `sync_lab` returns, must run on the app's event loop:
+    `client.portal.call(sync_lab, lab, titles)`.
+    """
+    from fastapi.testclient import TestClient
+    from backend.app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
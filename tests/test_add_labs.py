@@ -0,0 +1,23 @@
+from database.async_crud import add_new_labs, get_all_labs
+from database.engine import get_async_session_factory
+from database.schemas import LabCreate
+
+
+def test_a_conflicting_lab_does_not_fail_the_batch(run_with_database):
+    async def run():
+        async with get_async_session_factory()() as db:
+            first, _ = await add_new_labs(db, [
+                LabCreate(lab_name="Batch Lab A", lab_url="https://batch-a.example.org")])
+            # Same name as A under another URL, as a concurrent insert
+            # could leave it
+            second, _ = await add_new_labs(db, [
+                LabCreate(lab_name="Batch Lab A", lab_url="https://batch-a2.example.org"),
+                LabCreate(lab_name="Batch Lab B", lab_url="https://batch-b.example.org")])
+            names = {lab.lab_name for lab in await get_all_labs(db)}
+        return first, second, names
+
+    first, second, names = run_with_database(run)
+
+    assert first == ["Batch Lab A"]
+    assert second == ["Batch Lab B"]
+    assert {"Batch Lab A", "Batch Lab B"} <= names
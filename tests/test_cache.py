@@ -0,0 +1,97 @@
+from functools import partial
+
+from database.async_crud import bump_data_generation, get_data_generation
+from database.engine import get_async_session_factory
+from backend.app.cache import data_generation
+from backend.app.routers import insert_thesis_topic
+from backend.app.search import search_index
+
+LAB = {"lab_name": "Cache Lab", "lab_url": "https://cache.example.org/theses"}
+
+
+def listed_titles(response) -> list[str]:
+    return sorted(topic["title"] for lab in response.json() for topic in lab["topics"])
+
+
+def test_listing_is_not_modified_until_a_sync_changes_it(client, sync_lab):
+    client.portal.call(sync_lab, LAB, ["Battery ageing models"])
+    client.get("/api/search", params={"q": "battery"})
+    first = client.get("/api/thesis_topics", params={"lab": LAB["lab_name"]})
+    etag = first.headers["etag"]
+
+    unchanged = client.get("/api/thesis_topics", params={"lab": LAB["lab_name"]},
+                           headers={"If-None-Match": etag})
+    client.portal.call(sync_lab, LAB, ["Battery ageing models", "Battery recycling"])
+    changed = client.get("/api/thesis_topics", params={"lab": LAB["lab_name"]},
+                         headers={"If-None-Match": etag})
+
+    assert first.status_code == 200 and listed_titles(first) == ["Battery ageing models"]
+    assert unchanged.status_code == 304 and not unchanged.content
+    assert changed.status_code == 200
+    assert listed_titles(changed) == ["Battery ageing models", "Battery recycling"]
+    # The sync updated the built index incrementally, so it stays current
+    assert search_index.generation == data_generation.value
+
+
+def test_sync_from_another_process_invalidates_responses_and_indexes(client, sync_lab, monkeypatch):
+    lab = {"lab_name": "Other Process Lab", "lab_url": "https://other.example.org/theses"}
+    client.portal.call(sync_lab, lab, ["Hydrogen storage in salt caverns"])
+    listing = client.get("/api/thesis_topics", params={"lab": lab["lab_name"]})
+    search = client.get("/api/search", params={"q": "hydrogen", "lab": lab["lab_name"]})
+    [found] = search.json()["results"]
+    assert client.get(f"/api/thesis_topics/{found['topic_id']}/similar").status_code == 200
+
+    # As the CLI does: it writes and bumps the stored generation, but this
+    # process neither bumps its own nor updates its indexes
+    before = data_generation.value
+    with monkeypatch.context() as patch:
+        patch.setattr(data_generation, "advance_to", lambda generation: data_generation.value)
+        client.portal.call(partial(sync_lab, update_indexes=False), lab,
+                           ["Hydrogen storage in salt caverns", "Electrolyser degradation"])
+    assert data_generation.value == before
+
+    relisted = client.get("/api/thesis_topics", params={"lab": lab["lab_name"]},
+                          headers={"If-None-Match": listing.headers["etag"]})
+    research = client.get("/api/search", params={"q": "electrolyser", "lab": lab["lab_name"]})
+    [added] = research.json()["results"]
+    similar = client.get(f"/api/thesis_topics/{added['topic_id']}/similar")
+
+    assert relisted.status_code == 200
+    assert listed_titles(relisted) == ["Electrolyser degradation", "Hydrogen storage in salt caverns"]
+    assert added["title"] == "Electrolyser degradation"
+    assert similar.status_code == 200
+
+
+async def stored_generation() -> int:
+    async with get_async_session_factory()() as db:
+        return await get_data_generation(db)
+
+
+async def bump_from_another_process() -> int:
+    async with get_async_session_factory()() as db:
+        generation = await bump_data_generation(db)
+        await db.commit()
+        return generation
+
+
+def test_refresh_between_a_commit_and_its_advance_keeps_the_generation_in_step(
+        client, sync_lab, monkeypatch):
+    lab = {"lab_name": "Interleaved Lab", "lab_url": "https://interleaved.example.org/theses"}
+    apply_topic_changes = insert_thesis_topic.apply_topic_changes
+
+    async def apply_then_refresh(*args, **kwargs):
+        result = await apply_topic_changes(*args, **kwargs)
+        # A concurrent request refreshes after the commit, before the sync
+        # advances the generation itself
+        async with get_async_session_factory()() as db:
+            await data_generation.refresh(db)
+        return result
+
+    monkeypatch.setattr(insert_thesis_topic, "apply_topic_changes", apply_then_refresh)
+    client.portal.call(sync_lab, lab, ["Tidal energy converters"])
+    assert data_generation.value == client.portal.call(stored_generation)
+
+    # The next write from another process is still noticed
+    elsewhere = client.portal.call(bump_from_another_process)
+    client.get("/api/thesis_topics", params={"lab": lab["lab_name"]})
+    assert data_generation.value == elsewhere
@@ -0,0 +1,55 @@
+from database.async_crud import get_max_change_seq
+from database.engine import get_async_session_factory
+
+LAB = {"lab_name": "Changes Lab", "lab_url": "https://changes.example.org/theses"}
+
+
+async def latest_change_seq() -> int:
+    async with get_async_session_factory()() as db:
+        return await get_max_change_seq(db)
+
+
+def test_change_feed_lists_the_latest_change_of_each_topic_in_order(client, sync_lab):
+    since = client.portal.call(latest_change_seq)
+    client.portal.call(sync_lab, LAB, [
+        "Battery ageing models for electric buses", "Wind turbine blade monitoring",
+        "Coral reef acoustics", "Quantum error correction codes"])
+    # Renames the first topic, inserts one, closes the last two
+    client.portal.call(sync_lab, LAB, [
+        "Battery ageing models for electric busses", "Wind turbine blade monitoring",
+        "Soil moisture estimation from satellites"])
+    # Reopens one of the closed topics
+    client.portal.call(sync_lab, LAB, [
+        "Battery ageing models for electric busses", "Wind turbine blade monitoring",
+        "Soil moisture estimation from satellites", "Coral reef acoustics"])
+
+    response = client.get("/api/thesis_topics/changes", params={"since": since})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert not body["has_more"]
+    seqs = [change["seq"] for change in body["changes"]]
+    assert seqs == sorted(seqs) and seqs[0] > since
+    assert body["next_cursor"] == seqs[-1]
+    assert [(change["change"], change["title"], change["status"])
+            for change in body["changes"]] == [
+        ("inserted", "Wind turbine blade monitoring", "open"),
+        ("renamed", "Battery ageing models for electric busses", "open"),
+        ("inserted", "Soil moisture estimation from satellites", "open"),
+        ("closed", "Quantum error correction codes", "closed"),
+        ("reopened", "Coral reef acoustics", "open"),
+    ]
+
+    # Only what came after the cursor, a page at a time
+    after_rename = seqs[1]
+    first_page = client.get("/api/thesis_topics/changes",
+                            params={"since": after_rename, "limit": 2}).json()
+    assert [change["seq"] for change in first_page["changes"]] == seqs[2:4]
+    assert first_page["has_more"] and first_page["next_cursor"] == seqs[3]
+    second_page = client.get("/api/thesis_topics/changes",
+                             params={"since": first_page["next_cursor"], "limit": 2}).json()
+    assert [change["seq"] for change in second_page["changes"]] == seqs[4:]
+    assert not second_page["has_more"]
+
+    caught_up = client.get("/api/thesis_topics/changes", params={"since": seqs[-1]}).json()
+    assert caught_up == {"changes": [], "next_cursor": seqs[-1], "has_more": False}
@@ -0,0 +1,112 @@
+import json
+import sqlite3
+
+import pytest
+
+from backend.app import cli
+from backend.app.cache import DataGeneration
+from backend.app.cli import load_scrape_results, main
+from backend.app.routers import insert_lab, insert_thesis_topic
+
+MAD = {"lab_name": "CLI MAD Lab", "lab_url": "https://mad.example.org/theses"}
+PR = {"lab_name": "CLI PR Lab", "lab_url": "https://pr.example.org/theses"}
+
+
+@pytest.fixture(autouse=True)
+def cli_process(monkeypatch):
+    """
+    Run the CLI as if in a process of its own: its syncs go to other
+    databases, so they must not move the data generation the other tests
+    see, and its logs must not mix into the printed summary.
+    """
+    generation = DataGeneration()
+    monkeypatch.setattr(insert_thesis_topic, "data_generation", generation)
+    monkeypatch.setattr(insert_lab, "data_generation", generation)
+    monkeypatch.setattr(cli, "configure_logging", lambda: None)
+
+
+def topic(lab: dict, title: str) -> dict:
+    return {"lab_name": lab["lab_name"], "lab_url": lab["lab_url"], "thesis_title": title,
+            "thesis_url": lab["lab_url"] + "/" + title.lower().replace(" ", "-")}
+
+
+def save_results(path, labs: list[dict], topics: list[dict], api_response: bool = False) -> str:
+    keys = ("all_labs", "all_thesis_topics") if api_response else ("labs", "thesis_topics")
+    path.write_text(json.dumps(dict(zip(keys, (labs, topics)))), encoding="utf-8")
+    return str(path)
+
+
+def stored_topics(database: str) -> set[tuple[str, str, str]]:
+    with sqlite3.connect(database) as connection:
+        return set(connection.execute(
+            "SELECT labs.lab_name, mt_thesis_topic.mt_title, mt_thesis_topic.status "
+            "FROM mt_thesis_topic JOIN labs USING (lab_id)"))
+
+
+def run_cli(capsys, *argv) -> dict:
+    assert main(list(argv)) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def test_load_scrape_results_reads_both_file_layouts_and_filters_labs(tmp_path):
+    labs = [MAD, PR]
+    topics = [topic(MAD, "Sparse matrix kernels"), topic(PR, "Speech emotion recognition")]
+
+    saved = save_results(tmp_path / "scrape_results.json", labs, topics)
+    response = save_results(tmp_path / "response.json", labs, topics, api_response=True)
+
+    assert load_scrape_results(saved) == (labs, topics)
+    assert load_scrape_results(response) == (labs, topics)
+    assert load_scrape_results(saved, [PR["lab_name"]]) == ([PR], [topics[1]])
+
+
+def test_replay_syncs_a_results_file_into_the_database(monkeypatch, tmp_path, capsys):
+    database = str(tmp_path / "replay.db")
+    monkeypatch.setenv("SQLITE_PATH", database)
+    first = save_results(tmp_path / "first.json", [MAD, PR], [
+        topic(MAD, "Sparse matrix kernels"), topic(MAD, "GPU graph analytics"),
+        topic(PR, "Speech emotion recognition")])
+    second = save_results(tmp_path / "second.json", [MAD, PR], [
+        topic(MAD, "Sparse matrix kernels"), topic(PR, "Speech emotion recognition"),
+        topic(PR, "Handwriting synthesis")])
+
+    assert run_cli(capsys, "replay", first)["inserted"] == 3
+
+    # A dry run reports the changes and writes none of them
+    summary = run_cli(capsys, "replay", second, "--dry-run")
+    assert (summary["inserted"], summary["closed"]) == (1, 1)
+    assert stored_topics(database) == {
+        ("CLI MAD Lab", "Sparse matrix kernels", "OPEN"),
+        ("CLI MAD Lab", "GPU graph analytics", "OPEN"),
+        ("CLI PR Lab", "Speech emotion recognition", "OPEN")}
+
+    summary = run_cli(capsys, "replay", second)
+    assert (summary["inserted"], summary["closed"]) == (1, 1)
+    assert stored_topics(database) == {
+        ("CLI MAD Lab", "Sparse matrix kernels", "OPEN"),
+        ("CLI MAD Lab", "GPU graph analytics", "CLOSED"),
+        ("CLI PR Lab", "Speech emotion recognition", "OPEN"),
+        ("CLI PR Lab", "Handwriting synthesis", "OPEN")}
+
+
+def test_replay_of_some_labs_leaves_the_others_alone(monkeypatch, tmp_path, capsys):
+    database = str(tmp_path / "labs.db")
+    monkeypatch.setenv("SQLITE_PATH", database)
+    run_cli(capsys, "replay", save_results(tmp_path / "first.json", [MAD, PR], [
+        topic(MAD, "Sparse matrix kernels"), topic(PR, "Speech emotion recognition")]))
+
+    # PR's topic is missing from this file, but only MAD is replayed
+    summary = run_cli(capsys, "replay", save_results(tmp_path / "second.json", [MAD, PR], [
+        topic(MAD, "Sparse matrix kernels"), topic(MAD, "Cache coherence protocols")]),
+        "--labs", MAD["lab_name"])
+
+    assert (summary["inserted"], summary["closed"]) == (1, 0)
+    assert stored_topics(database) == {
+        ("CLI MAD Lab", "Sparse matrix kernels", "OPEN"),
+        ("CLI MAD Lab", "Cache coherence protocols", "OPEN"),
+        ("CLI PR Lab", "Speech emotion recognition", "OPEN")}
+
+
+def test_replay_of_a_missing_file_fails(tmp_path, capsys):
+    assert main(["replay", str(tmp_path / "missing.json")]) == 1
+    assert "replay failed" in capsys.readouterr().err
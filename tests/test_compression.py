@@ -0,0 +1,89 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.app import compression
+from backend.app.compression import CompressionMiddleware, supported_encodings
+
+LAB = {"lab_name": "Compression Lab", "lab_url": "https://compression.example.org/theses"}
+TITLES = [f"Long descriptive thesis topic title number {index} about compression" for index in range(20)]
+
+
+@pytest.fixture
+def listing_url(client, sync_lab):
+    client.portal.call(sync_lab, LAB, TITLES)
+    return f"/api/thesis_topics?lab={LAB['lab_name']}"
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_cached_response_is_sent_in_the_negotiated_encoding(client, listing_url, encoding):
+    if encoding not in supported_encodings():
+        pytest.skip(f"{encoding} is not installed")
+
+    plain = client.get(listing_url, headers={"Accept-Encoding": "identity"})
+    encoded = client.get(listing_url, headers={"Accept-Encoding": encoding})
+    # Served from the cached variant the second time
+    again = client.get(listing_url, headers={"Accept-Encoding": encoding})
+
+    assert "content-encoding" not in plain.headers
+    assert encoded.headers["content-encoding"] == again.headers["content-encoding"] == encoding
+    assert encoded.headers["etag"] == plain.headers["etag"][:-1] + f'-{encoding}"'
+    assert again.headers["etag"] == encoded.headers["etag"]
+    assert encoded.headers["vary"] == "Accept-Encoding"
+    assert encoded.json() == plain.json()
+
+
+def test_any_variant_etag_revalidates(client, listing_url):
+    gzip_etag = client.get(listing_url, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+
+    response = client.get(listing_url, headers={"Accept-Encoding": "identity",
+                                                 "If-None-Match": gzip_etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == gzip_etag[:-len('-gzip"')] + '"'
+
+
+def test_streamed_response_is_compressed_on_the_fly(client, listing_url):
+    response = client.get("/api/thesis_topics/stream", params={"lab": LAB["lab_name"]},
+                          headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.text.splitlines()) == len(TITLES)
+
+
+def test_large_bodies_are_compressed_off_the_event_loop(monkeypatch):
+    offloaded = []
+    run_in_threadpool = compression.run_in_threadpool
+
+    async def recording_run_in_threadpool(func, *args):
+        offloaded.append(len(args[0]))
+        return await run_in_threadpool(func, *args)
+
+    monkeypatch.setattr(compression, "run_in_threadpool", recording_run_in_threadpool)
+    app = FastAPI()
+    large, small = "thesis topic " * 1000, "thesis topic " * 100
+
+    @app.get("/body/{size}")
+    def body(size: str):
+        return PlainTextResponse(large if size == "large" else small)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([small, large]), media_type="text/plain")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=500, thread_size=10_000)
+    client = TestClient(app)
+    headers = {"Accept-Encoding": "gzip"}
+
+    assert client.get("/body/small", headers=headers).text == small
+    assert offloaded == []
+    response = client.get("/body/large", headers=headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == large
+    assert offloaded == [len(large)]
+
+    offloaded.clear()
+    response = client.get("/stream", headers=headers)
+    assert response.text == small + large
+    assert offloaded == [len(large)]
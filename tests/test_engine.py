@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from database.engine import (
+    SHARED_MEMORY_URL,
+    DatabaseSettings,
+    dispose_engines,
+    get_async_engine,
+    get_async_session_factory,
+    get_engine,
+    get_session_factory,
+    init_engines,
+    reinit_engines,
+)
+from database.models import Lab, async_init_db, init_db
+
+
+def test_memory_database_is_shared_by_the_sync_and_async_engines():
+    async def run():
+        init_engines(DatabaseSettings(url="sqlite://"))
+        try:
+            # Schema and a row through the async engine, read back through
+            # the sync one (as init_db and the benchmark generators do)
+            await async_init_db()
+            async with get_async_session_factory()() as db:
+                db.add(Lab(lab_name="Async Lab", lab_url="https://async.example.org"))
+                await db.commit()
+
+            init_db()
+            with get_session_factory()() as db:
+                seen_by_sync = set(db.execute(select(Lab.lab_name)).scalars())
+                db.add(Lab(lab_name="Sync Lab", lab_url="https://sync.example.org"))
+                db.commit()
+
+            async with get_async_session_factory()() as db:
+                seen_by_async = set((await db.execute(select(Lab.lab_name))).scalars())
+            return seen_by_sync, seen_by_async
+        finally:
+            await dispose_engines()
+
+    seen_by_sync, seen_by_async = asyncio.run(run())
+
+    assert seen_by_sync == {"Async Lab"}
+    assert seen_by_async == {"Async Lab", "Sync Lab"}
+
+
+def test_memory_path_builds_the_shared_url(monkeypatch):
+    monkeypatch.delenv("SQLALCHEMY_DATABASE_URL", raising=False)
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", ":memory:")
+
+    assert DatabaseSettings.from_env().url == SHARED_MEMORY_URL
+
+
+def test_engines_are_replaced_only_through_reinit(tmp_path):
+    first = DatabaseSettings(url=f"sqlite:///{tmp_path / 'first.db'}")
+    second = DatabaseSettings(url=f"sqlite:///{tmp_path / 'second.db'}")
+
+    async def run():
+        init_engines(first)
+        try:
+            engine, async_engine = get_engine(), get_async_engine()
+            # Again with the same or no settings, as the app lifespan does
+            # after a benchmark created the engines
+            assert init_engines(first) is first and init_engines() is first
+            assert get_engine() is engine and get_async_engine() is async_engine
+            with pytest.raises(RuntimeError):
+                init_engines(second)
+
+            assert await reinit_engines(second) is second
+            return engine, get_engine()
+        finally:
+            await dispose_engines()
+
+    replaced, replacement = asyncio.run(run())
+
+    assert replacement is not replaced
+    assert replacement.url.database.endswith("second.db")
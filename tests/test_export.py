@@ -0,0 +1,17 @@
+import csv
+import io
+
+LAB = {"lab_name": "Export Lab", "lab_url": "https://export.example.org/theses"}
+
+
+def test_topic_export_filters_by_tag(client, sync_lab):
+    client.portal.call(sync_lab, LAB, ["Battery state of health estimation",
+                                       "Compiler fuzzing", "Solar forecasting with satellites"])
+
+    response = client.get("/api/export/topics",
+                          params={"lab": LAB["lab_name"], "tag": "energy"})
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert sorted(row["title"] for row in rows) == [
+        "Battery state of health estimation", "Solar forecasting with satellites"]
@@ -0,0 +1,42 @@
+from sqlalchemy import select, text
+
+from database.async_crud import _lab_counts_query
+from database.engine import get_async_engine, get_async_session_factory
+from database.models import Lab, LabStats, async_init_db
+
+LAB = {"lab_name": "Stats Lab", "lab_url": "https://stats.example.org/theses"}
+
+
+async def stats_and_counts() -> tuple[dict, dict]:
+    async with get_async_session_factory()() as db:
+        lab_id = (await db.execute(
+            select(Lab.lab_id).where(Lab.lab_name == LAB["lab_name"]))).scalar_one()
+        stats = (await db.execute(
+            select(LabStats.open_count, LabStats.closed_count)
+            .where(LabStats.lab_id == lab_id))).one_or_none()
+        counts = (await db.execute(_lab_counts_query({lab_id}))).one()
+        return stats and tuple(stats), tuple(counts[1:])
+
+
+def test_lab_stats_are_backfilled_and_follow_syncs(run_with_database, sync_lab):
+    async def run():
+        await sync_lab(LAB, ["Graph neural networks", "Sparse matrix formats",
+                             "Edge caching policies"])
+        await sync_lab(LAB, ["Graph neural networks", "Compiler fuzzing"])
+
+        # A database from before the table existed
+        async with get_async_engine().begin() as conn:
+            await conn.execute(text("DROP TABLE lab_stats"))
+        await async_init_db()
+        backfilled = await stats_and_counts()
+
+        await sync_lab(LAB, ["Graph neural networks", "Sparse matrix formats",
+                             "Cache coherence protocols"])
+        after_sync = await stats_and_counts()
+        return backfilled, after_sync
+
+    backfilled, after_sync = run_with_database(run)
+
+    assert backfilled == ((2, 2), (2, 2))
+    stats, counts = after_sync
+    assert stats == counts == (3, 2)
@@ -0,0 +1,49 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database import locks
+from database.locks import writer_lock
+
+
+def test_writer_lock_serializes_holders_of_the_same_sqlite_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(locks, "LOCK_POLL_INTERVAL", 0.01)
+    url = f"sqlite+aiosqlite:///{tmp_path / 'locked.db'}"
+    timeline = []
+
+    async def hold(engine, name):
+        async with writer_lock(engine, "sync"):
+            timeline.append(f"{name} in")
+            await asyncio.sleep(0.05)
+            timeline.append(f"{name} out")
+
+    async def run():
+        # One engine each, as two processes would have
+        first, second = create_async_engine(url), create_async_engine(url)
+        try:
+            await asyncio.gather(hold(first, "first"), hold(second, "second"))
+        finally:
+            await first.dispose()
+            await second.dispose()
+
+    asyncio.run(run())
+
+    assert timeline in (["first in", "first out", "second in", "second out"],
+                        ["second in", "second out", "first in", "first out"])
+    assert (tmp_path / "locked.db.sync.lock").exists()
+
+
+def test_writer_lock_takes_a_lock_per_name(monkeypatch, tmp_path):
+    monkeypatch.setattr(locks, "LOCK_POLL_INTERVAL", 0.01)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'locked.db'}")
+
+    async def run():
+        try:
+            async with writer_lock(engine, "sync"):
+                # Would wait forever if the names shared a lock
+                async with writer_lock(engine, "scrape"):
+                    return True
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5))
@@ -0,0 +1,65 @@
+import json
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+
+from backend.app import logging_config
+from backend.app.logging_config import configure_logging, shutdown_logging
+
+
+def queue_handlers() -> list[logging.Handler]:
+    return [handler for handler in logging.getLogger().handlers
+            if isinstance(handler, QueueHandler)]
+
+
+@pytest.fixture
+def fresh_logging(monkeypatch, tmp_path):
+    """
+    Take down the logging the app set up, so the test configures it
+    itself (as JSON, into `tmp_path`), and restore it afterwards.
+    """
+    was_configured = logging_config._listener is not None
+    shutdown_logging()
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+    monkeypatch.setattr(logging_config, "LOG_FORMAT", "json")
+    yield tmp_path
+    shutdown_logging()
+    monkeypatch.undo()
+    if was_configured:
+        configure_logging()
+
+
+def test_configuring_twice_installs_one_queue_handler(fresh_logging):
+    configure_logging()
+    listener = logging_config._listener
+    configure_logging()
+
+    assert logging_config._listener is listener
+    assert len(queue_handlers()) == 1
+    assert len(list(fresh_logging.glob("MTA_*.log"))) == 1
+
+
+def test_shutdown_writes_queued_records_as_json_lines(fresh_logging):
+    configure_logging()
+    listener = logging_config._listener
+    logger = logging.getLogger("tests.logging")
+    logger.info("Synced %d topics", 3, extra={"lab": "Log Lab"})
+    try:
+        raise ValueError("bad row")
+    except ValueError:
+        logger.exception("Sync failed")
+
+    shutdown_logging()
+
+    assert queue_handlers() == []
+    assert listener._thread is None
+    (log_file,) = fresh_logging.glob("MTA_*.log")
+    entries = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    ours = [entry for entry in entries if entry["logger"] == "tests.logging"]
+    assert ours[0]["message"] == "Synced 3 topics" and ours[0]["lab"] == "Log Lab"
+    assert ours[1]["level"] == "ERROR" and "ValueError: bad row" in ours[1]["exception"]
+
+    # Set up anew after a shutdown
+    configure_logging()
+    assert len(queue_handlers()) == 1
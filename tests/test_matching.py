@@ -0,0 +1,29 @@
+from backend.app.matching import match_renames
+
+LISTING = "https://lab.example.org/theses"
+
+
+def test_shared_listing_url_does_not_pair_unrelated_titles():
+    # Every topic of the lab links to the listing page; only one title on
+    # each side is left unmatched
+    scraped = [("new", "Reinforcement learning for drone swarms", LISTING)]
+    existing = [("old", "Finite element analysis of composite beams", LISTING)]
+
+    assert match_renames(scraped, existing,
+                         scraped_urls=[LISTING] * 5, existing_urls=[LISTING] * 5) == []
+
+
+def test_unique_url_needs_similar_titles():
+    url = "https://lab.example.org/theses/42"
+    assert match_renames([("new", "Reinforcement learning for drone swarms", url)],
+                         [("old", "Finite element analysis of composite beams", url)]) == []
+    assert match_renames([("new", "Reinforcement learning for drone swarm control", url)],
+                         [("old", "Deep reinforcement learning for drone swarms", url)]
+                         ) == [("new", "old", "url")]
+
+
+def test_similar_titles_match_without_url():
+    assert match_renames(
+        [("new", "Battery ageing models for electric buses", "https://a.example/1")],
+        [("old", "Battery ageing models for electric busses", "https://a.example/2")],
+    ) == [("new", "old", "similar")]
@@ -0,0 +1,58 @@
+import re
+
+from backend.app.routers import metrics as metrics_router
+
+LAB = {"lab_name": "Metrics Lab", "lab_url": "https://metrics.example.org/theses"}
+TOKEN = "metrics-test-token"
+
+
+def test_server_timing_reports_the_database_time_of_buffered_responses(client, sync_lab):
+    client.portal.call(sync_lab, LAB, ["Lidar point cloud compression"])
+
+    response = client.get("/api/thesis_topics", params={"lab": LAB["lab_name"]})
+
+    assert response.status_code == 200
+    timing = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries", app;dur=([\d.]+)',
+                          response.headers["server-timing"])
+    assert timing is not None
+    assert int(timing.group(2)) > 0
+
+
+def test_streamed_responses_get_no_server_timing(client, sync_lab):
+    client.portal.call(sync_lab, LAB, ["Lidar point cloud compression"])
+
+    response = client.get("/api/export/topics", params={"lab": LAB["lab_name"]})
+
+    assert response.status_code == 200
+    assert "content-length" not in response.headers
+    assert "server-timing" not in response.headers
+
+
+def test_metrics_need_the_admin_token(monkeypatch, client):
+    monkeypatch.setattr(metrics_router, "PROFILE_TOKEN", None)
+    assert client.get("/api/metrics").status_code == 404
+
+    monkeypatch.setattr(metrics_router, "PROFILE_TOKEN", TOKEN)
+    assert client.get("/api/metrics").status_code == 401
+    assert client.get("/api/metrics",
+                      headers={"Authorization": "Bearer wrong-token"}).status_code == 401
+    assert client.get("/api/metrics", headers={"X-Profile": TOKEN}).status_code == 200
+
+
+def test_metrics_count_requests_per_route_template(monkeypatch, client):
+    monkeypatch.setattr(metrics_router, "PROFILE_TOKEN", TOKEN)
+    client.get("/api/thesis_topics", params={"lab": LAB["lab_name"]})
+    client.get("/api/no/such/route")
+
+    response = client.get("/api/metrics", headers={"Authorization": f"Bearer {TOKEN}"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert re.search(
+        r'^http_requests_total\{method="GET",route="/api/thesis_topics",status="200"\} [1-9]',
+        body, re.MULTILINE)
+    assert 'route="<unmatched>",status="404"' in body
+    assert re.search(
+        r'^db_queries_total\{method="GET",route="/api/thesis_topics"\} [1-9]', body, re.MULTILINE)
+    assert "/api/no/such/route" not in body
@@ -0,0 +1,32 @@
+LAB = {"lab_name": "Paging Lab", "lab_url": "https://paging.example.org/theses"}
+TITLES = [f"Paged topic {index}" for index in range(7)]
+
+
+def page_titles(page: dict) -> list[str]:
+    return [topic["title"] for lab in page["labs"] for topic in lab["topics"]]
+
+
+def test_cursor_pages_cover_the_listing_once_in_order(client, sync_lab):
+    client.portal.call(sync_lab, LAB, TITLES)
+    params = {"lab": LAB["lab_name"]}
+    full = client.get("/api/thesis_topics", params=params).json()
+
+    pages, cursor = [], None
+    while True:
+        page = client.get("/api/thesis_topics",
+                          params={**params, "limit": 3, **({"cursor": cursor} if cursor else {})}).json()
+        pages.append(page_titles(page))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [len(titles) for titles in pages] == [3, 3, 1]
+    assert sum(pages, []) == [topic["title"] for topic in full[0]["topics"]]
+    assert sorted(sum(pages, [])) == sorted(TITLES)
+
+
+def test_malformed_cursor_is_rejected(client):
+    response = client.get("/api/thesis_topics", params={"limit": 3, "cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor."}
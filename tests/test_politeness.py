@@ -0,0 +1,163 @@
+import asyncio
+
+from backend.app.routers import scrape
+from backend.app.scrapers import politeness
+from backend.app.scrapers.politeness import HostScheduler, polite_fetch
+
+ROBOTS_TXT = """\
+User-agent: *
+Disallow: /private
+
+User-agent: ThesisTracker
+Crawl-delay: 3
+"""
+
+
+class FakeClock:
+    """
+    Stands in for time.monotonic and asyncio.sleep in the politeness
+    module: sleeping advances the clock instead of waiting.
+    """
+
+    def __init__(self, monkeypatch):
+        self.now = 1000.0
+        self._sleep = asyncio.sleep
+        monkeypatch.setattr(politeness.time, "monotonic", lambda: self.now)
+        monkeypatch.setattr(politeness.asyncio, "sleep", self.sleep)
+
+    async def sleep(self, seconds: float):
+        self.now += max(seconds, 0)
+        await self._sleep(0)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str = ""):
+        self.status_code = status_code
+        self.text = text
+
+
+def serve_robots_txt(monkeypatch, status_code: int, text: str = "") -> list[str]:
+    fetched = []
+
+    def get(url, timeout):
+        fetched.append(url)
+        return FakeResponse(status_code, text)
+
+    monkeypatch.setattr(politeness.requests, "get", get)
+    return fetched
+
+
+def test_requests_to_one_host_are_spaced_by_the_minimum_delay(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    scheduler = HostScheduler(concurrency=2, min_delay=2.0, use_robots=False)
+    started = []
+
+    async def fetch(url):
+        async with polite_fetch(url, scheduler):
+            started.append((url, clock.now))
+
+    async def run():
+        await asyncio.gather(*(fetch(f"https://a.example.org/page{index}") for index in range(3)),
+                             fetch("https://b.example.org/page"))
+
+    asyncio.run(run())
+
+    assert [at - 1000.0 for url, at in started if "a.example.org" in url] == [0.0, 2.0, 4.0]
+    # Another host does not wait behind the first
+    assert [url for url, _ in started][:2] == [
+        "https://a.example.org/page0", "https://b.example.org/page"]
+
+
+def test_requests_in_flight_per_host_are_bounded(monkeypatch):
+    scheduler = HostScheduler(concurrency=2, min_delay=0.0, use_robots=False)
+    in_flight, peak = 0, 0
+
+    async def fetch(url):
+        nonlocal in_flight, peak
+        async with polite_fetch(url, scheduler):
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    async def run():
+        await asyncio.gather(*(fetch(f"https://a.example.org/page{index}") for index in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+
+
+def test_labs_scraped_at_once_are_bounded(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "LAB_LINKS", {
+        f"Lab {index}": f"https://lab{index}.example.org" for index in range(7)})
+    in_flight, peak = 0, 0
+
+    async def scrape_lab(lab_name, url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return lab_name, url, f"{lab_name}: extracted 0 items.", []
+
+    monkeypatch.setattr(scrape, "_scrape_lab", scrape_lab)
+
+    result = asyncio.run(scrape.scrape_labs(concurrency=3))
+
+    assert peak == 3
+    assert [lab["lab_name"] for lab in result["all_labs"]] == [f"Lab {index}" for index in range(7)]
+
+
+def test_crawl_delay_is_read_for_the_user_agent_and_capped(monkeypatch):
+    scheduler = HostScheduler(user_agent="ThesisTracker", max_crawl_delay=10.0)
+    robots_url = "https://a.example.org/robots.txt"
+
+    serve_robots_txt(monkeypatch, 200, ROBOTS_TXT)
+    assert scheduler._fetch_crawl_delay(robots_url) == 3.0
+
+    serve_robots_txt(monkeypatch, 200, "User-agent: *\nCrawl-delay: 60\n")
+    assert scheduler._fetch_crawl_delay(robots_url) == 10.0
+
+    serve_robots_txt(monkeypatch, 200, "User-agent: *\nRequest-rate: 1/5\n")
+    assert scheduler._fetch_crawl_delay(robots_url) == 5.0
+
+    serve_robots_txt(monkeypatch, 404)
+    assert scheduler._fetch_crawl_delay(robots_url) == 0.0
+
+
+def test_crawl_delay_spaces_requests_beyond_the_minimum(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    serve_robots_txt(monkeypatch, 200, ROBOTS_TXT)
+    scheduler = HostScheduler(min_delay=1.0, user_agent="ThesisTracker")
+    started = []
+
+    async def run():
+        for index in range(2):
+            async with polite_fetch(f"https://a.example.org/page{index}", scheduler):
+                started.append(clock.now - 1000.0)
+
+    asyncio.run(run())
+    assert started == [0.0, 3.0]
+
+
+def test_robots_txt_is_cached_until_its_ttl_expires(monkeypatch):
+    clock = FakeClock(monkeypatch)
+    fetched = serve_robots_txt(monkeypatch, 200, ROBOTS_TXT)
+    scheduler = HostScheduler(robots_ttl=60.0, user_agent="ThesisTracker")
+
+    async def run():
+        delays = await asyncio.gather(*(scheduler.crawl_delay(f"https://a.example.org/page{index}")
+                                        for index in range(3)))
+        clock.now += 59.0
+        delays.append(await scheduler.crawl_delay("https://a.example.org/later"))
+        fetched_within_ttl = len(fetched)
+        clock.now += 2.0
+        delays.append(await scheduler.crawl_delay("https://a.example.org/expired"))
+        return delays, fetched_within_ttl
+
+    delays, fetched_within_ttl = asyncio.run(run())
+
+    assert delays == [3.0] * 5
+    assert fetched_within_ttl == 1
+    assert fetched == ["https://a.example.org/robots.txt"] * 2
@@ -0,0 +1,70 @@
+import pstats
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app import profiling
+from backend.app.profiling import ProfilingMiddleware
+
+TOKEN = "profile-test-token"
+
+
+def profiled_client(monkeypatch, tmp_path) -> TestClient:
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        return {"total": sum(index * index for index in range(10_000))}
+
+    @app.get("/fail")
+    async def fail():
+        raise RuntimeError("handler failed")
+
+    app.add_middleware(ProfilingMiddleware, token=TOKEN)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_requests_without_the_token_are_not_profiled(monkeypatch, tmp_path):
+    client = profiled_client(monkeypatch, tmp_path)
+
+    for response in (client.get("/work"),
+                     client.get("/work", headers={"X-Profile": "wrong-token"}),
+                     client.get("/work", params={"profile": "wrong-token"})):
+        assert response.status_code == 200
+        assert "x-profile-file" not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiled_request_names_the_written_file(monkeypatch, tmp_path):
+    client = profiled_client(monkeypatch, tmp_path)
+
+    response = client.get("/work", headers={"X-Profile": TOKEN, "X-Profile-Mode": "cprofile"})
+
+    assert response.status_code == 200
+    name = response.headers["x-profile-file"]
+    assert name.endswith("_GET__work.prof")
+    assert [path.name for path in tmp_path.iterdir()] == [name]
+    functions = {function for _, _, function in pstats.Stats(str(tmp_path / name)).stats}
+    assert "work" in functions
+
+
+def test_token_and_mode_can_come_from_the_query(monkeypatch, tmp_path):
+    client = profiled_client(monkeypatch, tmp_path)
+
+    response = client.get("/work", params={"profile": TOKEN, "profile_mode": "sample"})
+
+    assert response.headers["x-profile-file"].endswith("_GET__work.collapsed")
+    assert (tmp_path / response.headers["x-profile-file"]).exists()
+
+
+def test_profile_of_a_failing_request_is_still_written(monkeypatch, tmp_path):
+    client = profiled_client(monkeypatch, tmp_path)
+
+    response = client.get("/fail", headers={"X-Profile": TOKEN, "X-Profile-Mode": "cprofile"})
+
+    assert response.status_code == 500
+    written = [path.name for path in tmp_path.iterdir()]
+    assert len(written) == 1 and written[0].endswith("_GET__fail.prof")
+    # The next profile is not skipped as overlapping
+    assert "x-profile-file" in client.get("/work", headers={"X-Profile": TOKEN}).headers
@@ -0,0 +1,81 @@
+from functools import partial
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from database.async_crud import get_max_change_seq
+from database.engine import get_async_read_session_factory, get_async_session_factory
+from database.models import Lab, ThesisTopic
+from backend.app.main import app
+from backend.app.routers import events as events_router
+from backend.app.events import BroadcastHub
+
+LAB = {"lab_name": "Primary Lab", "lab_url": "https://primary.example.org/theses"}
+REPLICA_LAB = {"lab_name": "Replica Lab", "lab_url": "https://replica.example.org/theses"}
+TITLES = ["Glacier melt forecasting", "Avalanche risk mapping"]
+
+
+class ConnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+async def titles_in(session_factory) -> set[str]:
+    async with session_factory()() as db:
+        return set((await db.execute(
+            select(ThesisTopic.mt_title).join(Lab).where(
+                Lab.lab_name.in_([LAB["lab_name"], REPLICA_LAB["lab_name"]])))).scalars())
+
+
+async def add_to_replica():
+    # There is no replication between the two files: a row only the
+    # replica holds shows which database a read went to
+    async with get_async_read_session_factory()() as db:
+        lab = Lab(**REPLICA_LAB)
+        db.add(lab)
+        await db.flush()
+        db.add(ThesisTopic(mt_title="Replica only topic", mt_url=REPLICA_LAB["lab_url"] + "/only",
+                           lab_id=lab.lab_id))
+        await db.commit()
+
+
+async def resume(last_event_id: int) -> list[str]:
+    stream = events_router._event_stream(ConnectedRequest(), last_event_id)
+    messages = [await anext(stream) for _ in range(1 + len(TITLES))]
+    await stream.aclose()
+    return messages
+
+
+async def primary_change_seq() -> int:
+    async with get_async_session_factory()() as db:
+        return await get_max_change_seq(db)
+
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary(monkeypatch, tmp_path, sync_lab):
+    monkeypatch.setenv("SQLITE_REPLICA_PATH", str(tmp_path / "replica.db"))
+
+    with TestClient(app) as client:
+        last_event_id = client.portal.call(primary_change_seq)
+        client.portal.call(sync_lab, LAB, TITLES)
+        client.portal.call(add_to_replica)
+
+        on_primary = client.portal.call(titles_in, get_async_session_factory)
+        on_replica = client.portal.call(titles_in, get_async_read_session_factory)
+        response = client.get("/api/thesis_topics",
+                              params={"lab": [LAB["lab_name"], REPLICA_LAB["lab_name"]]})
+
+        # A fresh process holds no history, so the resume depends on the
+        # latest change_seq read from the primary; the replica has none
+        monkeypatch.setattr(events_router, "topic_events", BroadcastHub(10, 10))
+        messages = client.portal.call(resume, last_event_id)
+
+    assert on_primary == set(TITLES)
+    assert on_replica == {"Replica only topic"}
+
+    assert response.status_code == 200
+    assert [lab["lab_name"] for lab in response.json()] == [REPLICA_LAB["lab_name"]]
+
+    replayed = [dict(line.split(": ", 1) for line in message.strip().split("\n"))
+                for message in messages[1:]]
+    assert [int(event["id"]) for event in replayed] == list(
+        range(last_event_id + 1, last_event_id + 1 + len(TITLES)))
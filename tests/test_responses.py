@@ -0,0 +1,71 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+
+from database.models import TopicStatus
+from backend.app import cache
+from backend.app.cache import serialize_json
+
+LAB = {"lab_name": "Schema Lab", "lab_url": "https://schema.example.org/theses"}
+
+
+def test_orjson_and_the_json_fallback_write_the_same_document(monkeypatch):
+    content = {
+        "status": TopicStatus.OPEN,
+        "added_date": datetime(2024, 1, 2, 3, 4, 5),
+        "window_end": date(2024, 1, 2),
+        "median_days_open": Decimal("7.25"),
+        "title": "Prüfung von Windkraftanlagen",
+        "counts": [1, 2, None],
+    }
+
+    with_orjson = serialize_json(content)
+    monkeypatch.setattr(cache, "orjson", None)
+    with_json = serialize_json(content)
+
+    assert json.loads(with_orjson) == json.loads(with_json) == {
+        "status": "open",
+        "added_date": "2024-01-02T03:04:05",
+        "window_end": "2024-01-02",
+        "median_days_open": 7.25,
+        "title": "Prüfung von Windkraftanlagen",
+        "counts": [1, 2, None],
+    }
+
+
+def test_orjson_serializes_numpy_scalars():
+    assert json.loads(serialize_json({"score": np.float32(0.5), "count": np.int64(3)})) == {
+        "score": 0.5, "count": 3}
+
+
+def test_read_endpoints_match_their_response_models(client, sync_lab, monkeypatch):
+    # Every body below is produced fresh after the sync and checked
+    # against its route's model; a mismatch would surface as a 500
+    monkeypatch.setattr(cache, "RESPONSE_VALIDATION", True)
+    client.portal.call(sync_lab, LAB, ["Battery ageing models", "Battery recycling",
+                                       "Wind turbine blade monitoring"])
+    client.portal.call(sync_lab, LAB, ["Battery ageing models", "Battery recycling"])
+    topic_id = client.get("/api/search", params={"q": "battery", "lab": LAB["lab_name"]}
+                          ).json()["results"][0]["topic_id"]
+
+    urls = [
+        "/api/thesis_topics",
+        "/api/thesis_topics?limit=2",
+        "/api/thesis_topics/changes?since=0",
+        "/api/thesis_topics/facets",
+        f"/api/thesis_topics/{topic_id}/similar",
+        "/api/search?q=batery",
+        "/api/insights/total_labs",
+        "/api/insights/total_open_thesis",
+        "/api/insights/total_closed_thesis",
+        "/api/insights/thesis_per_lab",
+        "/api/insights/summary",
+        "/api/insights/topics_added?period=month",
+        "/api/insights/time_open",
+        "/api/insights/velocity",
+    ]
+    statuses = {url: client.get(url).status_code for url in urls}
+
+    assert statuses == {url: 200 for url in urls}
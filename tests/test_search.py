@@ -0,0 +1,45 @@
+import asyncio
+
+from database.models import TopicStatus
+from backend.app.search import SearchIndex
+
+TITLES = [
+    "Battery ageing models for electric buses",
+    "Wind turbine blade crack detection",
+    "Reinforcement learning for robot grasping",
+    "Prüfung von Windkraftanlagen mit Drohnen",
+]
+
+
+def built_index() -> SearchIndex:
+    index = SearchIndex()
+    rows = [(topic_id, title, f"https://lab.example.org/{topic_id}", TopicStatus.OPEN, "Lab")
+            for topic_id, title in enumerate(TITLES, start=1)]
+    asyncio.run(index.ensure_loaded(lambda: asyncio.sleep(0, rows), 0))
+    return index
+
+
+def test_query_with_one_typo_finds_the_topic():
+    index = built_index()
+    expected = {"baterry": 1, "turbien blade": 2, "reinforcment learning": 3}
+
+    assert {query: index.search(query)[0]["topic_id"] for query in expected} == expected
+
+
+def test_prefix_and_folded_query_match():
+    index = built_index()
+
+    assert [result["topic_id"] for result in index.search("grasp")] == [3]
+    assert [result["topic_id"] for result in index.search("prufung")] == [4]
+
+
+def test_search_endpoint_tolerates_a_typo(client, sync_lab):
+    lab = {"lab_name": "Search Lab", "lab_url": "https://search.example.org/theses"}
+    client.portal.call(sync_lab, lab, ["Photonic neural network accelerators",
+                                       "Soil moisture estimation from satellites"])
+
+    response = client.get("/api/search", params={"q": "photnic", "lab": lab["lab_name"]})
+
+    assert response.status_code == 200
+    assert [result["title"] for result in response.json()["results"]] == [
+        "Photonic neural network accelerators"]
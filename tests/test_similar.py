@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+from database.models import TopicStatus
+from backend.app.similar import SimilarityIndex
+
+TITLES = [
+    "Battery ageing models for electric buses",
+    "Battery ageing estimation for electric vehicles",
+    "Battery state of health models for buses",
+    "Wind turbine blade crack detection",
+]
+
+
+def rows(titles):
+    return [(topic_id, title, f"https://lab.example.org/{topic_id}", TopicStatus.OPEN, "Lab")
+            for topic_id, title in enumerate(titles, start=1)]
+
+
+def test_rebuild_keeps_serving_the_previous_index_until_done(monkeypatch):
+    index = SimilarityIndex()
+    seen_during_build = []
+    original_build = SimilarityIndex._build
+
+    def observing_build(built, new_rows):
+        # Runs in the worker thread while requests may read the live index
+        seen_during_build.append((index.loaded, index.similar(1)))
+        original_build(built, new_rows)
+        seen_during_build.append((index.loaded, index.similar(1)))
+
+    async def run():
+        await index.refresh(lambda: asyncio.sleep(0, rows(TITLES)), 0)
+        before = index.similar(1)
+        monkeypatch.setattr(SimilarityIndex, "_build", observing_build)
+        await index.refresh(lambda: asyncio.sleep(0, rows(TITLES[:3])), 0, force=True)
+        return before
+
+    before = asyncio.run(run())
+    assert before
+    assert seen_during_build == [(True, before), (True, before)]
+    assert len(index) == 3
+
+
+def test_changes_applied_during_a_build_are_kept(monkeypatch):
+    index = SimilarityIndex()
+    started, proceed = threading.Event(), threading.Event()
+    original_build = SimilarityIndex._build
+
+    def held_build(built, new_rows):
+        started.set()
+        proceed.wait(5)
+        original_build(built, new_rows)
+
+    monkeypatch.setattr(SimilarityIndex, "_build", held_build)
+
+    async def run():
+        # A request starts the first build from rows loaded before a sync
+        refresh = asyncio.ensure_future(index.refresh(lambda: asyncio.sleep(0, rows(TITLES)), 0))
+        await asyncio.to_thread(started.wait, 5)
+
+        # The sync's hooks run while that build is in flight
+        index.apply_change(5, "Battery ageing models for electric trams",
+                           "https://lab.example.org/5", TopicStatus.OPEN, "Lab")
+        index.apply_change(3, TITLES[2], "https://lab.example.org/3", TopicStatus.CLOSED, None)
+        proceed.set()
+        await refresh
+
+    asyncio.run(run())
+    assert index.loaded
+    assert [topic["topic_id"] for topic in index.similar(5)][:1] == [1]
+    assert index.similar(3) is None
+    assert 3 not in [topic["topic_id"] for topic in index.similar(1)]
+
+
+def test_renamed_topic_is_not_ranked_by_its_old_title():
+    index = SimilarityIndex()
+    asyncio.run(index.refresh(lambda: asyncio.sleep(0, rows(TITLES)), 0))
+    assert 2 in [topic["topic_id"] for topic in index.similar(1)]
+
+    # Renamed to a title unrelated to topic 1
+    index.apply_change(2, "Wind turbine gearbox fault detection",
+                       "https://lab.example.org/2", TopicStatus.OPEN, "Lab")
+
+    assert 2 not in [topic["topic_id"] for topic in index.similar(1)]
+    assert [topic["topic_id"] for topic in index.similar(2)] == [4]
+    assert [topic["title"] for topic in index.similar(4)] == ["Wind turbine gearbox fault detection"]
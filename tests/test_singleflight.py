@@ -0,0 +1,60 @@
+import asyncio
+
+from backend.app.routers import insert_thesis_topic
+from backend.app.singleflight import single_flight
+
+
+def blocking_sync(monkeypatch) -> tuple[list, asyncio.Event]:
+    """
+    Replace the scrape and sync behind `sync_thesis_topics` with one that
+    counts its runs and returns once the returned event is set.
+    """
+    runs, release = [], asyncio.Event()
+
+    async def run_sync(db):
+        runs.append(db)
+        await release.wait()
+        return {"inserted": len(runs), "skipped": 0, "closed": 0}
+
+    monkeypatch.setattr(insert_thesis_topic, "run_sync", run_sync)
+    return runs, release
+
+
+def test_concurrent_syncs_share_one_run(monkeypatch, run_with_database):
+    async def run():
+        runs, release = blocking_sync(monkeypatch)
+        callers = [asyncio.create_task(insert_thesis_topic.sync_thesis_topics())
+                   for _ in range(3)]
+        await asyncio.sleep(0)
+        in_progress = single_flight.in_progress("sync")
+        release.set()
+        results = await asyncio.gather(*callers)
+        return runs, in_progress, results
+
+    runs, in_progress, results = run_with_database(run)
+
+    assert in_progress
+    assert len(runs) == 1
+    assert results == [{"inserted": 1, "skipped": 0, "closed": 0}] * 3
+    assert not single_flight.in_progress("sync")
+
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_run(monkeypatch, run_with_database):
+    async def run():
+        runs, release = blocking_sync(monkeypatch)
+        leaving = asyncio.create_task(insert_thesis_topic.sync_thesis_topics())
+        staying = asyncio.create_task(insert_thesis_topic.sync_thesis_topics())
+        await asyncio.sleep(0)
+
+        # The client that started the sync disconnects
+        leaving.cancel()
+        await asyncio.gather(leaving, return_exceptions=True)
+        release.set()
+        return runs, leaving.cancelled(), await staying
+
+    runs, cancelled, result = run_with_database(run)
+
+    assert cancelled
+    assert len(runs) == 1
+    assert result == {"inserted": 1, "skipped": 0, "closed": 0}
+    assert not single_flight.in_progress("sync")
@@ -0,0 +1,37 @@
+import json
+
+from backend.app.routers import thesis_topics_with_lab
+
+LABS = [
+    {"lab_name": "Stream Lab A", "lab_url": "https://stream-a.example.org/theses"},
+    {"lab_name": "Stream Lab B", "lab_url": "https://stream-b.example.org/theses"},
+]
+
+
+def test_streamed_formats_match_the_listing(client, sync_lab, monkeypatch):
+    # Labs and topics spread over several cursor batches
+    monkeypatch.setattr(thesis_topics_with_lab, "STREAM_BATCH_SIZE", 2)
+    client.portal.call(sync_lab, LABS[0], [f"Stream topic A{index}" for index in range(3)])
+    client.portal.call(sync_lab, LABS[1], [f"Stream topic B{index}" for index in range(2)])
+    params = {"lab": [lab["lab_name"] for lab in LABS]}
+
+    listing = client.get("/api/thesis_topics", params=params).json()
+    ndjson = client.get("/api/thesis_topics/stream", params=params)
+    chunked = client.get("/api/thesis_topics/stream", params={**params, "format": "json"})
+
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [(line["lab_name"], line["title"], line["status"]) for line in lines] == [
+        (lab["lab_name"], topic["title"], topic["status"])
+        for lab in listing for topic in lab["topics"]]
+    assert all(isinstance(line["topic_id"], int) for line in lines)
+
+    assert chunked.headers["content-type"] == "application/json"
+    assert chunked.json() == listing
+
+
+def test_chunked_json_stream_of_nothing_is_an_empty_array(client):
+    response = client.get("/api/thesis_topics/stream",
+                          params={"format": "json", "lab": "No Such Lab"})
+
+    assert response.json() == []
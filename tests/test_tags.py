@@ -0,0 +1,44 @@
+from backend.app.tagging import extract_topic_tags
+
+LAB_A = {"lab_name": "Facet Lab A", "lab_url": "https://facet-a.example.org/theses"}
+LAB_B = {"lab_name": "Facet Lab B", "lab_url": "https://facet-b.example.org/theses"}
+
+
+def test_tags_match_stemmed_english_and_german_keywords():
+    tags = extract_topic_tags([
+        (1, "Robot grasping with reinforcement learning"),
+        (2, "Maschinelles Lernen für Roboter"),
+        (3, "Solar forecasting with satellite images"),
+        (4, "Compiler fuzzing"),
+    ])
+
+    assert tags == {
+        1: {"robotics", "machine-learning"},
+        2: {"robotics", "machine-learning"},
+        3: {"energy", "computer-vision"},
+        4: set(),
+    }
+
+
+def test_facet_counts_under_combined_filters(client, sync_lab):
+    titles = ["Battery ageing models", "Solar forecasting with satellite images",
+              "Robot grasping with reinforcement learning", "Wind farm control"]
+    client.portal.call(sync_lab, LAB_A, titles)
+    client.portal.call(sync_lab, LAB_A, titles[:3])  # closes the wind farm topic
+    client.portal.call(sync_lab, LAB_B, ["Battery recycling processes"])
+
+    facets = client.get("/api/thesis_topics/facets", params={
+        "status": "open", "lab": LAB_A["lab_name"], "tag": "energy"}).json()
+
+    assert facets["total"] == 2
+    # Each facet ignores its own filter, so the alternatives keep their counts
+    assert facets["tags"] == {"energy": 2, "computer-vision": 1,
+                              "machine-learning": 1, "robotics": 1}
+    assert facets["status"] == {"open": 2, "closed": 1}
+    assert facets["labs"][LAB_A["lab_name"]] == 2
+    assert facets["labs"][LAB_B["lab_name"]] == 1
+
+    listed = client.get("/api/thesis_topics", params={
+        "status": "open", "lab": LAB_A["lab_name"], "tag": "energy"}).json()
+    assert sorted(topic["title"] for lab in listed for topic in lab["topics"]) == [
+        "Battery ageing models", "Solar forecasting with satellite images"]
@@ -0,0 +1,72 @@
+from datetime import date, datetime
+
+from sqlalchemy import update
+
+from database.async_crud import (
+    get_median_time_open,
+    get_posting_velocity,
+    get_topics_added_series,
+)
+from database.engine import get_async_session_factory
+from database.models import ThesisTopic
+
+LAB = {"lab_name": "Series Lab", "lab_url": "https://series.example.org/theses"}
+
+# Title: (added, closed)
+TOPICS = {
+    "Series topic Monday": (datetime(2024, 1, 1, 9), datetime(2024, 1, 11, 9)),
+    "Series topic Wednesday": (datetime(2024, 1, 3, 18), datetime(2024, 1, 7, 18)),
+    "Series topic next week": (datetime(2024, 1, 10, 12), None),
+    "Series topic February": (datetime(2024, 2, 5, 8), None),
+}
+
+
+async def backdate():
+    async with get_async_session_factory()() as db:
+        for title, (added, closed) in TOPICS.items():
+            values = {"added_date": added}
+            if closed is not None:
+                values["updated_at"] = closed
+            await db.execute(update(ThesisTopic).where(ThesisTopic.mt_title == title)
+                             .values(**values))
+        await db.commit()
+
+
+def test_series_windows_and_medians(run_with_database, sync_lab):
+    async def run():
+        await sync_lab(LAB, list(TOPICS))
+        # Closes the two topics that were closed
+        await sync_lab(LAB, [title for title, (_, closed) in TOPICS.items() if closed is None])
+        await backdate()
+        async with get_async_session_factory()() as db:
+            return (
+                await get_topics_added_series(db, "week", [LAB["lab_name"]]),
+                await get_topics_added_series(db, "month", [LAB["lab_name"]],
+                                              added_after=datetime(2024, 1, 2)),
+                await get_median_time_open(db),
+                await get_posting_velocity(db, 14, through=date(2024, 1, 14)),
+            )
+
+    weekly, monthly, time_open, velocity = run_with_database(run)
+
+    assert weekly == {"period": "week", "labs": {LAB["lab_name"]: [
+        {"period_start": "2024-01-01", "added": 2, "cumulative": 2},
+        {"period_start": "2024-01-08", "added": 1, "cumulative": 3},
+        {"period_start": "2024-02-05", "added": 1, "cumulative": 4},
+    ]}}
+    assert monthly["labs"][LAB["lab_name"]] == [
+        {"period_start": "2024-01-01", "added": 2, "cumulative": 2},
+        {"period_start": "2024-02-01", "added": 1, "cumulative": 3},
+    ]
+    # Open for 10 and 4 days
+    assert time_open["per_lab"][LAB["lab_name"]] == {"median_days_open": 7.0, "closed_topics": 2}
+
+    # Window 2024-01-01 through 2024-01-14, previous window the two weeks before
+    assert velocity["window_days"] == 14 and velocity["window_end"] == date(2024, 1, 14)
+    assert velocity["per_lab"][LAB["lab_name"]] == {
+        "added": 3,
+        "added_previous_window": 0,
+        "per_week": 1.5,
+        "trend": 3,
+        "last_added": datetime(2024, 2, 5, 8),
+    }
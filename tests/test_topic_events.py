@@ -0,0 +1,143 @@
+import json
+
+from database.async_crud import get_max_change_seq
+from database.engine import get_async_session_factory
+from backend.app.config import EVENT_SUBSCRIBER_BUFFER
+from backend.app.routers import events as events_router
+from backend.app.cache import data_generation
+from backend.app.events import BroadcastHub, topic_events
+
+LAB = {"lab_name": "Event Lab", "lab_url": "https://events.example.org/theses"}
+
+
+def test_live_subscriber_gets_closed_and_inserted_topics_in_id_order(run_with_database, sync_lab):
+    async def run():
+        await sync_lab(LAB, ["Battery ageing models", "Wind turbine blade monitoring",
+                             "Radar based gesture recognition"])
+
+        subscription = topic_events.subscribe()
+        try:
+            # Closes two topics and inserts two unrelated ones
+            summary = await sync_lab(LAB, ["Battery ageing models", "Quantum error correction codes",
+                                           "Soil moisture estimation from satellites"])
+            events = []
+            while not subscription.queue.empty():
+                events.extend(subscription.queue.get_nowait())
+        finally:
+            topic_events.unsubscribe(subscription)
+        return summary, events
+
+    summary, events = run_with_database(run)
+
+    assert summary["closed"] == 2 and summary["inserted"] == 2
+    ids = [event["id"] for event in events]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+
+    # What the live stream in routers/events.py forwards: events with an
+    # ID above the last one sent
+    delivered, sent_up_to = [], 0
+    for event in events:
+        if event["id"] > sent_up_to:
+            sent_up_to = event["id"]
+            delivered.append(event["event"])
+    assert sorted(delivered) == ["closed", "closed", "inserted", "inserted"]
+
+
+def test_subscriber_survives_a_sync_larger_than_its_buffer(run_with_database, sync_lab):
+    lab = {"lab_name": "Big Event Lab", "lab_url": "https://big-events.example.org/theses"}
+    titles = [f"Topic number {index}" for index in range(EVENT_SUBSCRIBER_BUFFER + 50)]
+
+    async def run():
+        subscription = topic_events.subscribe()
+        try:
+            summary = await sync_lab(lab, titles)
+            subscribed = topic_events.subscriber_count > 0 and not subscription.overflowed
+            events = []
+            while not subscription.queue.empty():
+                events.extend(subscription.queue.get_nowait())
+        finally:
+            topic_events.unsubscribe(subscription)
+        return summary, subscribed, events
+
+    summary, subscribed, events = run_with_database(run)
+
+    assert summary["inserted"] == len(titles)
+    assert subscribed
+    assert [event["event"] for event in events] == ["inserted"] * len(titles)
+
+
+def test_cache_generation_moves_before_events_are_published(monkeypatch, run_with_database, sync_lab):
+    lab = {"lab_name": "Cache Event Lab", "lab_url": "https://cache-events.example.org/theses"}
+    published_at = []
+    publish = topic_events.publish
+
+    def recording_publish(events):
+        published_at.append(data_generation.value)
+        publish(events)
+
+    monkeypatch.setattr(topic_events, "publish", recording_publish)
+
+    async def run():
+        await sync_lab(lab, ["Tactile sensing for grippers"])
+        published_at.clear()
+        before = data_generation.value
+        await sync_lab(lab, ["Tactile sensing for grippers", "Soft robotic fingertips"])
+        return before
+
+    before = run_with_database(run)
+    assert published_at and published_at[0] > before
+
+
+def events_with_ids(*ids: int) -> list[dict]:
+    return [{"id": event_id, "event": "inserted", "data": {}} for event_id in ids]
+
+
+def test_replay_needs_every_change_up_to_the_latest_sequence_number():
+    hub = BroadcastHub(history_size=100, buffer_size=10)
+
+    # Nothing to replay for a current client, even with no history
+    assert hub.replay_since(7, latest_seq=7) == []
+
+    hub.publish(events_with_ids(8, 9))
+    # 10 and 11 were written by another process, 12 by this one
+    hub.publish(events_with_ids(12))
+
+    assert [event["id"] for event in hub.replay_since(7, latest_seq=9)] == [8, 9, 12]
+    assert hub.replay_since(7, latest_seq=12) is None
+    assert hub.replay_since(11, latest_seq=12) == events_with_ids(12)
+    assert hub.replay_since(12, latest_seq=12) == []
+    # Older than the history
+    assert hub.replay_since(3, latest_seq=9) is None
+
+
+class ConnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def test_resume_older_than_the_history_replays_from_the_change_feed(
+        monkeypatch, run_with_database, sync_lab):
+    lab = {"lab_name": "Resume Lab", "lab_url": "https://resume.example.org/theses"}
+    titles = ["Ocean current mapping", "Kelp forest monitoring", "Coral reef acoustics"]
+
+    async def run():
+        async with get_async_session_factory()() as db:
+            last_event_id = await get_max_change_seq(db)
+        await sync_lab(lab, titles)
+        # A process that started after the sync holds no history
+        monkeypatch.setattr(events_router, "topic_events", BroadcastHub(10, 10))
+
+        stream = events_router._event_stream(ConnectedRequest(), last_event_id)
+        messages = [await anext(stream) for _ in range(1 + len(titles))]
+        await stream.aclose()
+        return last_event_id, messages
+
+    last_event_id, messages = run_with_database(run)
+
+    assert messages[0] == "retry: 3000\n\n"
+    replayed = [dict(line.split(": ", 1) for line in message.strip().split("\n"))
+                for message in messages[1:]]
+    assert [int(event["id"]) for event in replayed] == list(
+        range(last_event_id + 1, last_event_id + 1 + len(titles)))
+    assert {event["event"] for event in replayed} == {"inserted"}
+    assert sorted(json.loads(event["data"])["title"] for event in replayed) == sorted(titles)